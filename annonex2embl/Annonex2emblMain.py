@@ -6,12 +6,10 @@
 # IMPORT OPERATIONS #
 #####################
 
-from Bio import SeqIO
+# Note: Biopython is only imported by the functions that require it, 
+# so that the start-up of the program remains fast
 #from Bio.Alphabet import generic_dna
 #from Bio.Seq import Seq
-from Bio import SeqFeature
-from collections import OrderedDict
-from copy import copy
 
 # Add specific directory to sys.path in order to import its modules
 # NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
@@ -20,11 +18,17 @@ import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
 
 import MyExceptions as ME
+import CachingOps as CaOps
+import CheckpointOps as CpOps
 import CheckingOps as CkOps
 import DegappingOps as DgOps
+import EntrezOps as EnOps
 import GenerationOps as GnOps
 import GlobalVariables as GlobVars
+import IntervalOps as IvOps
 import ParsingOps as PrOps
+import ProfilingOps as PfOps
+import TaxonomyOps as TxOps
 import IOOps as IOOps
 
 ###############
@@ -40,119 +44,166 @@ __version__ = '2017.02.01.1800'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ###########
 # CLASSES #
 ###########
 
-#############
-# FUNCTIONS #
-#############
-
-def annonex2embl(path_to_nex,
-                 path_to_csv,
-                 descr_DEline,
-                 email_addr,
-                 path_to_outfile,
-                 
-                 tax_check='False',
-                 checklist_mode='False',
-                 checklist_type=None,
-                 linemask='False',
-                 topology='linear',
-                 tax_division='PLN',
-                 uniq_seqid_col='isolate',
-                 transl_table='11',
-                 seq_version='1'):
+class ProcessSeqRecord:
+    ''' This class contains functions to generate, check and format the 
+        seq_record of a single sequence of the alignment (i.e., steps 
+        6.1 to 6.10 of function `annonex2embl`). The attributes of 
+        the class are only read, never modified, so that different 
+        sequences can be processed independently of each other (e.g., 
+        by different worker processes). Sequences are processed in 
+        batches, so that the coding regions of all sequences of a 
+        batch can be translated together (step 6.8.1).
+    Args:
+        charsets_global (dict): the charsets of the alignment (as 
+                                IntervalLists, which are immutable); the 
+                                charsets of each seq_record are derived 
+                                from them without copying them
+        alignm_global (obj):    the sequences of the alignment (i.e., 
+                                an AlignmentStore or NexusStream object)
+        qualifier_index (obj):  the qualifiers of each sequence, 
+                                indexed by sequence name (i.e., a 
+                                CsvStream object)
+        charset_dict (dict):    the charset symbol, type and product 
+                                of each charset
+        entrez_cache (obj):     an optional EntrezCache object
+        taxdump_index (obj):    an optional TaxdumpIndex object
+        [all other args as in function `annonex2embl`]
+    '''
+
+    # The number of sequences processed as a batch
+    batch_size = 64
+
+    def __init__(self, charsets_global, alignm_global, qualifier_index,
+                 charset_dict, descr_DEline, email_addr, taxcheck_bool,
+                 checklist_bool, checklist_type, linemask_bool, topology,
+                 tax_division, uniq_seqid_col, transl_table, seq_version,
+                 entrez_cache=None, taxdump_index=None):
+        self.charsets_global = charsets_global
+        self.alignm_global = alignm_global
+        self.qualifier_index = qualifier_index
+        self.charset_dict = charset_dict
+        self.descr_DEline = descr_DEline
+        self.email_addr = email_addr
+        self.taxcheck_bool = taxcheck_bool
+        self.checklist_bool = checklist_bool
+        self.checklist_type = checklist_type
+        self.linemask_bool = linemask_bool
+        self.topology = topology
+        self.tax_division = tax_division
+        self.uniq_seqid_col = uniq_seqid_col
+        self.transl_table = transl_table
+        self.seq_version = seq_version
+        self.entrez_cache = entrez_cache
+        self.taxdump_index = taxdump_index
+
+    def go(self, task):
+        ''' This function generates the seq_record of a sequence and 
+            returns it formatted as output string.
+        Args:
+            task (tupl): the position of the sequence in the sorted 
+                         list of sequence names and the sequence name; 
+                         example: (0, "taxon_A")
+        Returns:
+            record_str (str): the formatted seq_record
+        '''
+        for record_str in self.go_batch([task]):
+            return record_str
+
+    def go_batch(self, tasks, outp_handle=None):
+        ''' This function generates the seq_records of a batch of 
+            sequences and yields them formatted as output strings, one 
+            at a time and in the order of the tasks. If an output handle 
+            is given, each seq_record is instead written to it directly 
+            and None is yielded. The sequences of 
+            all seq_records are first cleaned up (steps 6.1 to 6.3), so 
+            that their coding regions can be translated together (step 
+            6.8.1); the seq_records are then completed one by one 
+            (steps 6.4 to 6.10). Errors of the first steps are only 
+            raised once the preceding seq_records have been yielded; 
+            interruptions (e.g., KeyboardInterrupt) are not delayed.
+        Args:
+            tasks (list): a list of tasks as specified in function `go`
+            outp_handle (obj): an output handle (optional)
+        '''
+        prepared = []
+        for task in tasks:
+            try:
+                prepared.append((self._prepare(task), None))
+            except Exception:
+                prepared.append((None, sys.exc_info()))
+        transl_outcomes = self._scan_coding_regions([item for item, 
+            exc_info in prepared if exc_info is None])
+        for item, exc_info in prepared:
+            if exc_info is not None:
+                raise exc_info[0], exc_info[1], exc_info[2]
+            yield self._complete(item, transl_outcomes, outp_handle)
+
+    def _scan_coding_regions(self, prepared):
+        ''' An internal function to translate the coding regions of a 
+            batch of seq_records. The distinct sequences of each coding 
+            region (i.e., charset) that are not yet in the cache of 
+            translation outcomes are translated together, and their 
+            outcomes are added to the cache.
+        Returns:
+            dict.   The outcomes computed (see function `cache_outcomes` 
+                    of class `TranslCheck`), indexed by the translated 
+                    sequence
+        '''
+        profiler = PfOps.profiler
 
-########################################################################
-
-# 0. MAKE SPECIFIC VARIABLES BOOLEAN
-    from distutils.util import strtobool
-    taxcheck_bool = strtobool(tax_check)
-    checklist_bool = strtobool(checklist_mode)
-    linemask_bool = strtobool(linemask)
-
-########################################################################
-
-# 1. OPEN OUTFILE
-    outp_handle = open(path_to_outfile, 'a')
-
-########################################################################
-
-# 2. PARSE DATA FROM .NEX-FILE
-    try:
-        charsets_global, alignm_global = IOOps.Inp().\
-            parse_nexus_file(path_to_nex)
-    except ME.MyException as e:
-        sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
-
-########################################################################
-
-# 3. PARSE DATA FROM .CSV-FILE
-    try:
-        raw_qualifiers = IOOps.Inp().parse_csv_file(path_to_csv)
-    except ME.MyException as e:
-        sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
-
-########################################################################
-
-# 4. CHECK QUALIFIERS
-# 4. Perform quality checks on qualifiers
-    try:
-        CkOps.QualifierCheck(raw_qualifiers, uniq_seqid_col).\
-            quality_of_qualifiers()
-    except ME.MyException as e:
-        sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
-# 4.2. Remove qualifiers without content (i.e. empty qualifiers)
-    nonempty_qualifiers = CkOps.QualifierCheck.\
-        _rm_empty_qual(raw_qualifiers)
-# 4.3. Enforce that all qualifier values consist of ASCII characters
-    filtered_qualifiers = CkOps.QualifierCheck.\
-        _enforce_ASCII(nonempty_qualifiers)
-
-########################################################################
-
-# 5. PARSE OUT FEATURE KEY, OBTAIN OFFICIAL GENE NAME AND GENE PRODUCT 
-    charset_dict = {}
-    for charset_name in charsets_global.keys():
-        try:
-            charset_sym, charset_type, charset_product = PrOps.\
-                ParseCharsetName(charset_name, email_addr).parse()
-        except ME.MyException as e:
-            sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
-        
-        charset_dict[charset_name] = (charset_sym, charset_type,
-            charset_product)
+####################################
 
-########################################################################
+# 6.8.1. TRANSLATE THE CODING REGIONS OF ALL SEQ_RECORDS OF THE BATCH
+        profiler.lap('6.8.1. Translate coding regions of batch')
+        coding_seqs = {}
+        alphabet = None
+        for counter, current_quals, seq_record, charsets_degapped in \
+            prepared:
+            alphabet = seq_record.seq.alphabet
+            for charset_name, charset_range in charsets_degapped.items():
+                if self.charset_dict[charset_name][1] in ['CDS', 'gene']:
+                    coding_seqs.setdefault(charset_name, set()).add(
+                        charset_range.extract(seq_record.seq))
+        transl_outcomes = {}
+        for charset_name in sorted(coding_seqs.keys()):
+            transl_outcomes.update(CkOps.TranslCheck.cache_outcomes(
+                coding_seqs[charset_name], self.transl_table, alphabet))
+        profiler.lap(None)
+        return transl_outcomes
+
+    def _prepare(self, task):
+        ''' An internal function to generate the basic seq_record of a 
+            sequence and to clean up its sequence (steps 6.1 to 6.3). '''
+        counter, seq_name = task
+        profiler = PfOps.profiler
 
-# 6. GENERATING SEQ_RECORDS BY LOOPING THROUGH EACH SEQUENCE OF THE ALIGNMENT
-#    Work off the sequences alphabetically.
-    sorted_seqnames = sorted(alignm_global.keys())
-    for counter, seq_name in enumerate(sorted_seqnames):
-        #TFLs generate safe copies of charset and alignment for every
-        #loop iteration
-        charsets_withgaps = copy(charsets_global)
-        alignm = copy(alignm_global)
-        
 ####################################
 
 # 6.1. SELECT CURRENT SEQUENCES AND CURRENT QUALIFIERS
-        current_seq = alignm[seq_name]
-        current_quals = [d for d in filtered_qualifiers\
-            if d[uniq_seqid_col] == seq_name][0]
+        profiler.lap('6.1. Select sequence and qualifiers')
+        current_seq = self.alignm_global[seq_name]
+        # Note: The qualifier index hands out a new dictionary upon each 
+        # request, as the qualifiers of the SeqFeature 'source' are 
+        # modified later on
+        current_quals = self.qualifier_index[seq_name]
 
 ####################################
 
 # 6.2. GENERATE THE BASIC SEQ_RECORD (I.E., WITHOUT FEATURES)
 
 # 6.2.1. Generate the basic SeqRecord
+        profiler.lap('6.2. Generate basic seq_record')
         seq_record = GnOps.GenerateSeqRecord().base_record(
-            current_seq, current_quals, uniq_seqid_col, seq_version, 
-            descr_DEline, topology, tax_division)
+            current_seq, current_quals, self.uniq_seqid_col, 
+            self.seq_version, self.descr_DEline, self.topology, 
+            self.tax_division)
 
 ####################################
 
@@ -164,34 +215,31 @@ def annonex2embl(path_to_nex,
 #      the full sequence length.
 #      Note 2: Charsets are identical across all sequences.
 
-# 6.3.1. Replace question marks in DNA sequence with 'N'
-        seq_record.seq._data = seq_record.seq._data.replace('?', 'N')
-        # TFL generates a safe copy of sequence to work on
-        seq_withgaps = copy(seq_record.seq)
-
-# 6.3.2. Remove leading ambiguities while maintaining 
-#        correct annotations
-        seq_noleadambigs, charsets_noleadambigs = DgOps.\
-            RmAmbigsButMaintainAnno().rm_leadambig(seq_withgaps, 'N', \
-            charsets_withgaps)
-
-# 6.3.3. Remove trailing ambiguities while maintaining 
-#        correct annotations
-        seq_notrailambigs, charsets_notrailambigs = DgOps.\
-            RmAmbigsButMaintainAnno().rm_trailambig(seq_noleadambigs, \
-            'N', charsets_noleadambigs)
-
-# 6.3.4. (FUTURE) Give note that leading or trailing ambiguities were 
+# 6.3.1. Replace question marks in DNA sequence with 'N', remove leading 
+#        and trailing ambiguities and degap the sequence while 
+#        maintaining correct annotations
+#        Note: These clean-up steps are fused into a single step, which 
+#        rewrites the sequence only once and does not modify the 
+#        charsets.
+        profiler.lap('6.3. Clean up sequence')
+        seq_record.seq, charsets_degapped = DgOps.CleanupButMaintainAnno(
+            seq_record.seq, self.charsets_global, '?', 'N', '-').cleanup()
+
+# 6.3.2. (FUTURE) Give note that leading or trailing ambiguities were 
 #        removed; for future association with of fuzzy ends
 #        if seq_noltambigs != seq_record.seq:
 #            ltambigs_removed = True
 
-# 6.3.5. Degap the sequence while maintaining correct annotations
-        seq_nogaps, charsets_degapped = DgOps.\
-            DegapButMaintainAnno(seq_notrailambigs, '-', \
-            charsets_notrailambigs).degap()
-        # TFL assigns the deambiged and degapped sequence back
-        seq_record.seq = seq_nogaps
+        return (counter, current_quals, seq_record, charsets_degapped)
+
+    def _complete(self, prepared, transl_outcomes, outp_handle=None):
+        ''' An internal function to complete the seq_record of a 
+            sequence (steps 6.4 to 6.10) and to write it to the output 
+            handle or, if none is given, to return it formatted as 
+            output string. '''
+        from StringIO import StringIO
+        counter, current_quals, seq_record, charsets_degapped = prepared
+        profiler = PfOps.profiler
 
 ####################################
 
@@ -199,10 +247,11 @@ def annonex2embl(path_to_nex,
 #      NCBI TAXONOMY
 
 # 6.4.1. Generate SeqFeature 'source' and append to features list
+        profiler.lap('6.4. Generate source feature')
         charset_names = charsets_degapped.keys()
         source_feature = GnOps.GenerateSeqFeature().\
             source_feat(len(seq_record), current_quals, charset_names, 
-            transl_table)
+            self.transl_table)
         seq_record.features.append(source_feature)
 
 ####################################
@@ -211,22 +260,25 @@ def annonex2embl(path_to_nex,
 
 # 6.5.1. Test taxon name against NCBI taxonomy; if not listed, adjust
 #        taxon name and append ecotype info
-        if taxcheck_bool:
+        profiler.lap('6.5. Validate taxon name')
+        if self.taxcheck_bool:
             seq_record = PrOps.ConfirmAdjustTaxonName().go(seq_record, 
-                email_addr)
+                self.email_addr, self.entrez_cache, self.taxdump_index)
 
 ####################################
 
 # 6.6. POPULATE THE FEATURE KEYS WITH THE CHARSET INFORMATION
 #      Note: Each charset represents a dictionary that must be added in 
 #      full to the list "SeqRecord.features"
+        profiler.lap('6.6. Populate feature keys')
         for charset_name, charset_range in charsets_degapped.items():
 
 # 6.6.1. Convert charset_range into Location Object
             location_object = GnOps.GenerateFeatLoc().make_location(charset_range)
 
 # 6.6.2. Assign a gene product to a gene name
-            charset_sym, charset_type, charset_product = charset_dict[charset_name]
+            charset_sym, charset_type, charset_product = \
+                self.charset_dict[charset_name]
 
 # 6.6.3. Generate a regular SeqFeature and append to seq_record.features
 #        Note: The position indices for the stop codon are truncated in 
@@ -240,6 +292,7 @@ def annonex2embl(path_to_nex,
 # 6.7. SORT ALL SEQ_RECORD.FEATURES EXCEPT THE FIRST ONE (WHICH 
 #      CONSTITUTES THE SOURCE FEATURE) BY THEIR RELATIVE START 
 #      POSITIONS
+        profiler.lap('6.7. Sort features')
         sorted_features = sorted(seq_record.features[1:],
             key=lambda x: x.location.start.position)
         seq_record.features = [seq_record.features[0]] + sorted_features
@@ -247,6 +300,7 @@ def annonex2embl(path_to_nex,
 ####################################
 
 # 6.8. TRANSLATE AND CHECK QUALITY OF TRANSLATION
+        profiler.lap('6.8. Translate and check translation')
         removal_list = []
         for indx, feature in enumerate(seq_record.features):
             # Check if feature is a coding region
@@ -254,7 +308,7 @@ def annonex2embl(path_to_nex,
                 try:
                     feature = CkOps.TranslCheck().\
                         transl_and_quality_of_transl(seq_record, 
-                        feature, transl_table)
+                        feature, self.transl_table, transl_outcomes)
                 except ME.MyException as e:
                     print('%s annonex2embl WARNING: %s Feature `%s` '\
                         '(type: `%s`) of sequence `%s` is not saved to '\
@@ -269,13 +323,14 @@ def annonex2embl(path_to_nex,
 ####################################
 
 # 6.9. INTRODUCE FUZZY ENDS
+        profiler.lap('6.9. Introduce fuzzy ends')
         for feature in seq_record.features:
             # Check if feature is a coding region
             if feature.type == 'CDS' or feature.type == 'gene':
                 # Note: Don't use "feature.extract(seq_record.seq)" in TFL,
                 #       as stop codon was truncated from feature under 
                 #       Step 6.5.3.
-                coding_seq = ''.join([seq_record.seq[i] for i in charset_range])
+                coding_seq = charset_range.extract(seq_record.seq)
                 if not coding_seq.startswith(GlobVars.nex2ena_start_codon):
                     feature.location = GnOps.GenerateFeatLoc(
                         ).make_start_fuzzy(feature.location)
@@ -287,18 +342,383 @@ def annonex2embl(path_to_nex,
 ####################################
 
 # 6.10. DECISION OF WHICH OUTPUT FORMAT TO EMPLOY
-        if checklist_bool:
-            if checklist_type == 'trnK_matK':
+#       Note: Worker processes cannot write to the outfile, as the 
+#       records must be written in order; they format each record as 
+#       string, which is returned to the parent process.
+        profiler.lap('6.10. Format output')
+        record_handle = outp_handle if outp_handle else StringIO()
+        if self.checklist_bool:
+            if self.checklist_type == 'trnK_matK':
                 IOOps.ENAchecklist().matK_trnK(seq_record, counter,
-                    outp_handle)
+                    record_handle)
             else:
                 sys.exit('%s annonex2embl ERROR: Checklist type `%s` \
-                    not recognized.' % ('\n', checklist_type))
+                    not recognized.' % ('\n', self.checklist_type))
         else:
-            IOOps.Outp().write_EntryUpload(seq_record, outp_handle,
-                linemask_bool)
+            IOOps.Outp().write_EntryUpload(seq_record, record_handle,
+                self.linemask_bool)
+        profiler.lap(None)
+        if not outp_handle:
+            record_str = record_handle.getvalue()
+            record_handle.close()
+            return record_str
+
+#############
+# FUNCTIONS #
+#############
+
+def _init_worker(record_processor, n_workers=1):
+    ''' An internal function to hand the ProcessSeqRecord object to a 
+        worker process upon its start. Since worker processes cannot 
+        share the rate limit of Entrez requests, each worker process 
+        receives an equal share of it. '''
+    global _record_processor
+    _record_processor = record_processor
+    if record_processor.entrez_cache:
+        record_processor.entrez_cache = record_processor.entrez_cache.reopen()
+    if record_processor.taxdump_index:
+        record_processor.taxdump_index = record_processor.taxdump_index.\
+            reopen()
+    EnOps.set_client(EnOps.client().share(n_workers))
+    # The data recorded by the parent process before the start of the 
+    # worker must not be reported twice
+    if PfOps.profiler.enabled:
+        PfOps.profiler.snapshot()
+
+def _run_worker(batch):
+    ''' An internal function to process a batch of sequences in a 
+        worker process. Since a worker process must not exit, any call 
+        of sys.exit is converted into an error message that is returned 
+        to the parent process.
+    Returns:
+        list.   The results for the sequences of the batch, each 
+                consisting of the error message (or None), the formatted 
+                seq_record (or None) and the profiling data of the 
+                worker (or None); the results end with the first error
+    '''
+    results = []
+    try:
+        for record_str in _record_processor.go_batch(batch):
+            results.append((None, record_str, None))
+    except SystemExit as e:
+        results.append((e.code, None, None))
+    finally:
+        # Warnings must reach the output before the pool is terminated
+        sys.stdout.flush()
+    if PfOps.profiler.enabled:
+        error, record_str, _ = results[-1]
+        results[-1] = (error, record_str, PfOps.profiler.snapshot())
+    return results
+
+def annonex2embl(path_to_nex,
+                 path_to_csv,
+                 descr_DEline,
+                 email_addr,
+                 path_to_outfile,
+                 
+                 tax_check='False',
+                 checklist_mode='False',
+                 checklist_type=None,
+                 linemask='False',
+                 topology='linear',
+                 tax_division='PLN',
+                 uniq_seqid_col='isolate',
+                 transl_table='11',
+                 seq_version='1',
+                 cache_dir=None,
+                 cache_ttl='30',
+                 offline='False',
+                 jobs='1',
+                 taxdump=None,
+                 profile_report=None,
+                 api_key=None,
+                 low_memory='False',
+                 resume='False',
+                 checkpoint_every='100',
+                 path_to_taxdump_index=None):
+
+########################################################################
+
+# 0. MAKE SPECIFIC VARIABLES BOOLEAN
+    from distutils.util import strtobool
+    taxcheck_bool = strtobool(tax_check)
+    checklist_bool = strtobool(checklist_mode)
+    linemask_bool = strtobool(linemask)
+    offline_bool = strtobool(offline)
+    jobs_int = int(jobs)
+    lowmem_bool = strtobool(low_memory)
+    resume_bool = strtobool(resume)
+    if profile_report:
+        profiler = PfOps.enable()
+    else:
+        profiler = PfOps.profiler
+
+    # Note: The outfile, the Entrez cache and the taxdump index are 
+    # closed and profiling is deactivated even if the conversion 
+    # fails (e.g., via sys.exit), as several conversions may run in 
+    # the same process (see module `BatchOps`)
+    outp_handle = None
+    entrez_cache = None
+    taxdump_index = None
+    try:
+
+########################################################################
+
+# 1. OPEN OUTFILE
+#    Note: The progress of the conversion is recorded in a checkpoint 
+#    file next to the outfile. Upon resumption of an interrupted 
+#    conversion, the outfile is truncated to the last checkpoint 
+#    (which removes any partial trailing record), and the conversion 
+#    continues with the next sequence name in sorted order. The 
+#    Entrez cache (if any) persists across the restart.
+        checkpoint = CpOps.Checkpoint(path_to_outfile, [path_to_nex, 
+            path_to_csv], checkpoint_every)
+        resume_after = None
+        if resume_bool:
+            try:
+                resume_after = checkpoint.restore()
+            except ME.MyException as e:
+                sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        outp_handle = open(path_to_outfile, 'a')
+
+########################################################################
+
+# 2. PARSE DATA FROM .NEX-FILE
+#    Note: The alignment is held in a compact store with one byte per 
+#    alignment position. Upon request, the alignment is only indexed, 
+#    not read into memory; each sequence is then read from the file 
+#    when its record is generated.
+        profiler.start('2. Parse NEXUS file')
+        try:
+            if lowmem_bool:
+                charset_ranges, alignm_global = IOOps.Inp().\
+                    stream_nexus_file(path_to_nex)
+            else:
+                charset_ranges, alignm_global = IOOps.Inp().\
+                    load_nexus_file(path_to_nex)
+        except ME.MyException as e:
+            sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        charsets_global = {}
+        for charset_name, ranges in charset_ranges.items():
+            charsets_global[charset_name] = IvOps.IntervalList(ranges)
+        profiler.stop('2. Parse NEXUS file')
+
+########################################################################
+
+# 3. PARSE DATA FROM .CSV-FILE
+#    The csv-file is read in a single pass; only the rows of the 
+#    sequences of the alignment are stored. The column labels are 
+#    checked once for all rows (i.e., if a column labelled 
+#    <uniq_seqid_col> is present and if all column labels are valid 
+#    INSDC qualifiers), and each sequence name must occur exactly once.
+        profiler.start('3. Parse CSV file')
+        try:
+            qualifier_index = IOOps.Inp().stream_csv_file(path_to_csv, 
+                uniq_seqid_col, alignm_global.keys())
+        except ME.MyException as e:
+            sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        profiler.stop('3. Parse CSV file')
+
+########################################################################
+
+# 4. CHECK QUALIFIERS
+# 4. Confirm that each sequence of the alignment has a set of 
+#    qualifiers. Empty qualifiers are removed and qualifier values 
+#    converted to ASCII characters when the qualifiers of a sequence 
+#    are requested from the index (step 6.1).
+        profiler.start('4. Check qualifiers')
+        try:
+            CkOps.QualifierCheck._seqnames_present(qualifier_index,
+                alignm_global.keys(), uniq_seqid_col)
+        except ME.MyException as e:
+            sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        profiler.stop('4. Check qualifiers')
 
 ########################################################################
 
-# 7. CLOSE OUTFILE
-    outp_handle.close()
+# 5. PARSE OUT FEATURE KEY, OBTAIN OFFICIAL GENE NAME AND GENE PRODUCT 
+# 5.1. Open the persistent cache of Entrez lookups, if requested
+        profiler.start('5.1. Open cache and taxdump index')
+        if cache_dir:
+            try:
+                entrez_cache = CaOps.EntrezCache(cache_dir, cache_ttl, 
+                    offline_bool)
+            except ME.MyException as e:
+                sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        elif offline_bool:
+            sys.exit('%s annonex2embl ERROR: Offline mode requires a cache '\
+                'directory.' % ('\n'))
+
+# 5.1.1. Set up the client for Entrez requests, which honours the rate 
+#        limit of NCBI
+        EnOps.configure(api_key)
+
+# 5.1.2. Open the local copy of NCBI Taxonomy, if requested
+        if taxdump:
+            try:
+                taxdump_index = TxOps.TaxdumpIndex(taxdump, 
+                    path_to_taxdump_index, cache_dir)
+            except ME.MyException as e:
+                sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+
+        profiler.stop('5.1. Open cache and taxdump index')
+
+# 5.2. Parse charset names
+        profiler.start('5.2. Parse charset names')
+        charset_names = {}
+        for charset_name in charsets_global.keys():
+            try:
+                charset_names[charset_name] = PrOps.ParseCharsetName(
+                    charset_name, email_addr).parse_name()
+            except ME.MyException as e:
+                sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+
+        profiler.stop('5.2. Parse charset names')
+
+# 5.3. Look up the gene products of all gene symbols in a single batch
+        profiler.start('5.3. Look up gene products')
+        gene_syms = sorted(set([charset_sym for charset_sym, charset_type in 
+            charset_names.values() if charset_type in ['CDS', 'gene']]))
+        try:
+            gene_products = PrOps.GetEntrezInfo(email_addr, entrez_cache).\
+                obtain_gene_products(gene_syms)
+        except ME.MyException as e:
+            sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        charset_dict = {}
+        for charset_name in charsets_global.keys():
+            charset_sym, charset_type = charset_names[charset_name]
+            charset_product = gene_products.get(charset_sym) if charset_type \
+                in ['CDS', 'gene'] else None
+            charset_dict[charset_name] = (charset_sym, charset_type,
+                charset_product)
+        profiler.stop('5.3. Look up gene products')
+
+# 5.4. Obtain the Entrez hit counts of the distinct organism names (and, 
+#      where required, of their genus names) in advance, so that the 
+#      individual taxon checks of step 6.5 are memoized
+        profiler.start('5.4. Confirm taxon names')
+        if taxcheck_bool:
+            organism_names = [qualifier_index[seq_name]['organism'] for 
+                seq_name in alignm_global.keys() if 'organism' in 
+                qualifier_index[seq_name]]
+            try:
+                PrOps.GetEntrezInfo(email_addr, entrez_cache, taxdump_index).\
+                    prefetch_taxon_names(organism_names)
+            except ME.MyException as e:
+                sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        profiler.stop('5.4. Confirm taxon names')
+
+########################################################################
+
+# 6. GENERATING SEQ_RECORDS BY LOOPING THROUGH EACH SEQUENCE OF THE ALIGNMENT
+#    Work off the sequences alphabetically. Upon request, the sequences 
+#    are distributed across a pool of worker processes; the records 
+#    are nonetheless written in alphabetical order.
+        profiler.start('6. Generate records')
+        record_processor = ProcessSeqRecord(charsets_global, alignm_global,
+            qualifier_index, charset_dict, descr_DEline, email_addr, 
+            taxcheck_bool, checklist_bool, checklist_type, linemask_bool, 
+            topology, tax_division, uniq_seqid_col, transl_table, seq_version,
+            entrez_cache, taxdump_index)
+        sorted_seqnames = sorted(alignm_global.keys())
+        tasks = list(enumerate(sorted_seqnames))
+        if resume_after is not None:
+            # Note: The counter of each sequence remains unaltered
+            tasks = [task for task in tasks if task[1] > resume_after]
+        batch_size = ProcessSeqRecord.batch_size
+        if jobs_int > 1:
+            batch_size = max(1, min(batch_size, len(tasks) // (jobs_int * 8)))
+        batches = [tasks[i:i+batch_size] for i in range(0, len(tasks), 
+            batch_size)]
+        # Note: An initial checkpoint records the size of the outfile before 
+        # the first record, so that a conversion interrupted before its 
+        # first regular checkpoint can be resumed as well
+        try:
+            checkpoint.start(outp_handle)
+        except ME.MyException as e:
+            sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        if jobs_int > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(jobs_int, _init_worker, 
+                (record_processor, jobs_int))
+            records_out = (result for results in pool.imap(_run_worker, 
+                batches) for result in results)
+        else:
+            pool = None
+            # Note: The records are written to the outfile directly
+            records_out = ((None, record_str, None) for batch in batches for 
+                record_str in record_processor.go_batch(batch, outp_handle))
+        from itertools import izip
+        pool_closed = False
+        record_start = checkpoint.offset
+        try:
+            # Note: The results are returned in the order of the tasks
+            for (counter, seq_name), (error, record_str, profile_data) in \
+                izip(tasks, records_out):
+                if error is not None:
+                    sys.exit(error)
+                if record_str is not None:
+                    outp_handle.write(record_str)
+                record_end = outp_handle.tell()
+                profiler.count('records_written')
+                profiler.count('bytes_written', record_end - record_start)
+                record_start = record_end
+                if profile_data:
+                    profiler.merge(profile_data)
+                try:
+                    checkpoint.completed(seq_name, outp_handle)
+                except ME.MyException as e:
+                    sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+        except:
+            # The records written so far are recorded, so that the 
+            # conversion can be resumed from there
+            exc_info = sys.exc_info()
+            try:
+                checkpoint.save(outp_handle)
+            except ME.MyException:
+                pass
+            raise exc_info[0], exc_info[1], exc_info[2]
+        else:
+            if pool:
+                pool.close()
+                pool_closed = True
+        finally:
+            # Note: Unless all records were received, the worker processes 
+            # are terminated (e.g., upon an error or an interruption), so 
+            # that they do not outlive the conversion
+            if pool:
+                if not pool_closed:
+                    pool.terminate()
+                pool.join()
+        transl_lookups = profiler.enabled and sum(profiler.counters.get(c, 0) 
+            for c in ['transl_cache_hits', 'transl_cache_misses'])
+        if transl_lookups:
+            profiler.count('transl_cache_hit_rate', round(float(profiler.
+                counters.get('transl_cache_hits', 0)) / transl_lookups, 4))
+        profiler.stop('6. Generate records')
+
+########################################################################
+
+# 7. CLOSE OUTFILE, CACHE AND TAXDUMP INDEX; REMOVE CHECKPOINT
+#    Note: The checkpoint is only removed once the conversion has 
+#    completed.
+        outp_handle.close()
+        checkpoint.remove()
+    finally:
+        if outp_handle:
+            outp_handle.close()
+        if entrez_cache:
+            entrez_cache.close()
+        if taxdump_index:
+            taxdump_index.close()
+        if profile_report:
+            PfOps.disable()
+
+########################################################################
+
+# 8. WRITE PROFILE REPORT, IF REQUESTED
+    if profile_report:
+        try:
+            profiler.write_report(profile_report)
+        except ME.MyException as e:
+            sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
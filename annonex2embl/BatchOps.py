@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+'''
+Classes to convert many pairs of NEXUS and CSV files in a single process
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import MyExceptions as ME
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.09.1500'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class BatchJobs:
+    ''' This class contains functions to compile the jobs of a batch run,
+        either from a manifest or from the NEXUS files that match a
+        pattern. Each job is a dictionary with the keys "nexus", "csv",
+        "descript" and "outfile" and, optionally, "options" (i.e., a
+        dictionary of keyword arguments of function `annonex2embl` that
+        apply to this job only).
+    '''
+
+    required_fields = ['nexus', 'csv', 'descript', 'outfile']
+
+    # Keyword arguments of function `annonex2embl` that can be set per job
+    option_fields = ['tax_check', 'checklist_mode', 'checklist_type',
+        'linemask', 'topology', 'tax_division', 'uniq_seqid_col',
+        'transl_table', 'seq_version']
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def _make_job(fields, base_dir):
+        ''' An internal static function to convert the fields of a
+            manifest entry into a job; relative paths are interpreted
+            relative to the directory of the manifest. '''
+        import os
+        missing = [f for f in BatchJobs.required_fields if not
+            fields.get(f)]
+        if missing:
+            raise ME.MyException('Manifest entry `%s` lacks the field(s) '\
+                '%s.' % (fields.get('nexus', ''), ', '.join(missing)))
+        unknown = [f for f in fields if f not in BatchJobs.required_fields
+            and f not in BatchJobs.option_fields]
+        if unknown:
+            raise ME.MyException('Manifest entry `%s` contains unknown '\
+                'field(s) %s.' % (fields['nexus'], ', '.join(sorted(
+                unknown))))
+        job = {'descript': fields['descript'], 'options': {}}
+        for key in ['nexus', 'csv', 'outfile']:
+            job[key] = os.path.join(base_dir, fields[key])
+        for key in BatchJobs.option_fields:
+            if fields.get(key):
+                job['options'][key] = str(fields[key])
+        return job
+
+    @staticmethod
+    def from_manifest(path_to_manifest):
+        ''' This function reads the jobs from a manifest, which is either
+            a JSON file (i.e., a list of objects) or a tab-separated file
+            with a header line. Each entry requires the fields "nexus",
+            "csv", "descript" and "outfile"; the fields listed in
+            `option_fields` are optional. '''
+        import csv
+        import os
+        base_dir = os.path.dirname(os.path.abspath(path_to_manifest))
+        try:
+            with open(path_to_manifest, 'rb') as manifest_handle:
+                if path_to_manifest.lower().endswith('.json'):
+                    import json
+                    entries = json.load(manifest_handle)
+                    if not isinstance(entries, list):
+                        raise ValueError('a list of jobs is expected')
+                else:
+                    entries = [entry for entry in csv.DictReader(
+                        manifest_handle, delimiter='\t') if any(
+                        entry.values())]
+        except (IOError, ValueError, csv.Error) as e:
+            raise ME.MyException('Parsing of manifest `%s` unsuccessful: '\
+                '%s' % (path_to_manifest, e))
+        entries = [dict((str(k).strip(), (v or '').strip() if
+            isinstance(v, basestring) else v) for k, v in entry.items())
+            for entry in entries]
+        return [BatchJobs._make_job(entry, base_dir) for entry in entries]
+
+    @staticmethod
+    def from_pattern(nex_pattern, descr_DEline, out_dir):
+        ''' This function compiles a job for each NEXUS file that matches
+            a pattern (e.g., "/path_to_input/*.nex"). The CSV file of a
+            job must share the name of its NEXUS file; the output is
+            written to a file of the same name in <out_dir>. '''
+        import glob
+        import os
+        jobs = []
+        for path_to_nex in sorted(glob.glob(nex_pattern)):
+            base_name = os.path.splitext(path_to_nex)[0]
+            path_to_csv = base_name + '.csv'
+            if not os.path.isfile(path_to_csv):
+                raise ME.MyException('No CSV file found for NEXUS file '\
+                    '`%s`.' % (path_to_nex))
+            jobs.append({'nexus': path_to_nex, 'csv': path_to_csv,
+                'descript': descr_DEline, 'outfile': os.path.join(out_dir,
+                os.path.basename(base_name) + '.embl'), 'options': {}})
+        if not jobs:
+            raise ME.MyException('No NEXUS file matches `%s`.' %
+                (nex_pattern))
+        return jobs
+
+
+class BatchRun:
+    ''' This class contains functions to process the jobs of a batch run
+        in a single process or in a pool of worker processes. All jobs
+        share the in-process memos of Entrez lookups and, if a cache
+        directory is given, the persistent Entrez cache. A job that
+        fails does not halt the batch run; instead, the status of each
+        job is recorded.
+    Args:
+        email_addr (str):    your email address
+        common_kwargs (dict):keyword arguments of function `annonex2embl`
+                             that apply to all jobs; example:
+                             {'cache_dir': '/home/username/.annonex2embl'}
+        workers (int):       the number of worker processes among which
+                             the jobs are distributed
+    '''
+
+    def __init__(self, email_addr, common_kwargs=None, workers=1):
+        self.email_addr = email_addr
+        self.common_kwargs = dict(common_kwargs or {})
+        self.workers = max(1, int(workers))
+
+    def _run_job(self, job):
+        ''' An internal function to process a single job and to return
+            its status. '''
+        import sys
+        import time
+        import Annonex2emblMain as AN2EMBLMain
+        kwargs = dict(self.common_kwargs)
+        kwargs.update(job.get('options', {}))
+        if self.workers > 1:
+            # Note: Worker processes cannot start worker processes
+            kwargs['jobs'] = '1'
+        status = {'nexus': job['nexus'], 'outfile': job['outfile'],
+            'status': 'ok', 'message': ''}
+        start = time.time()
+        try:
+            AN2EMBLMain.annonex2embl(job['nexus'], job['csv'],
+                job['descript'], self.email_addr, job['outfile'], **kwargs)
+        except SystemExit as e:
+            status['status'] = 'failed'
+            status['message'] = str(e.code).strip()
+        except Exception as e:
+            status['status'] = 'failed'
+            status['message'] = '%s: %s' % (type(e).__name__, e)
+        finally:
+            sys.stdout.flush()
+        status['seconds'] = round(time.time() - start, 3)
+        return status
+
+    def run(self, jobs):
+        ''' This function processes all jobs and returns their status in
+            the order of the jobs. '''
+        if self.workers == 1 or len(jobs) < 2:
+            return [self._run_job(job) for job in jobs]
+        import multiprocessing
+        pool = multiprocessing.Pool(min(self.workers, len(jobs)),
+            _init_worker, (self,))
+        try:
+            return pool.map(_run_worker, jobs, 1)
+        finally:
+            pool.close()
+            pool.join()
+
+    @staticmethod
+    def summary_table(statuses):
+        ''' This function formats the status of the jobs as a table. '''
+        lines = ['%-4s %-8s %9s  %s' % ('job', 'status', 'seconds',
+            'nexus / message')]
+        for i, status in enumerate(statuses):
+            lines.append('%-4i %-8s %9.3f  %s' % (i+1, status['status'],
+                status['seconds'], status['nexus']))
+            if status['message']:
+                lines.append('%23s%s' % ('', status['message'].replace(
+                    '\n', ' ')))
+        n_failed = len([s for s in statuses if s['status'] != 'ok'])
+        lines.append('%i of %i jobs completed successfully.' %
+            (len(statuses) - n_failed, len(statuses)))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def write_summary(statuses, path_to_summary):
+        ''' This function writes the status of the jobs to a file; in
+            JSON format if the file name ends with ".json", otherwise as
+            a tab-separated table. A file name of "-" writes a table to
+            the screen. '''
+        import sys
+        if path_to_summary == '-':
+            sys.stdout.write(BatchRun.summary_table(statuses))
+            return
+        fields = ['nexus', 'outfile', 'status', 'seconds', 'message']
+        try:
+            with open(path_to_summary, 'w') as summary_handle:
+                if path_to_summary.lower().endswith('.json'):
+                    import json
+                    json.dump(statuses, summary_handle, indent=2,
+                        sort_keys=True)
+                else:
+                    summary_handle.write('\t'.join(fields) + '\n')
+                    for status in statuses:
+                        summary_handle.write('\t'.join([str(status[f]).\
+                            replace('\t', ' ').replace('\n', ' ') for f
+                            in fields]) + '\n')
+        except IOError as e:
+            raise ME.MyException('Summary `%s` could not be written: %s' %
+                (path_to_summary, e))
+
+#############
+# FUNCTIONS #
+#############
+
+def _init_worker(batch_run):
+    ''' An internal function to hand the BatchRun object to a worker
+        process upon its start. '''
+    global _batch_run
+    _batch_run = batch_run
+
+def _run_worker(job):
+    ''' An internal function to process a single job in a worker
+        process. '''
+    return _batch_run._run_job(job)
+
+########
+# MAIN #
+########
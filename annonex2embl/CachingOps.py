@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+'''
+Classes to cache the results of Entrez queries between runs, as well as
+the results of frequent computations within a run
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import MyExceptions as ME
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.03.1200'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class EntrezCache:
+    ''' This class contains functions to store the results of Entrez
+        queries in a persistent key-value store (i.e., an SQLite
+        database in a user-defined directory) and to retrieve them
+        in subsequent runs. Each entry is filed under a namespace
+        (e.g., "gene_product") and a key (e.g., a gene symbol) and
+        expires after a given number of days.
+    Args:
+        cache_dir (str):  path to the cache directory; example:
+                          "/home/username/.annonex2embl"
+        ttl_days (float): the number of days after which a cached
+                          entry expires; example: 30 (a value of 0
+                          disables expiry)
+        offline (bool):   a logical; shall Entrez be queried at all,
+                          or shall only the cache be used?
+    Raises:
+        ME.MyException
+    '''
+
+    db_filename = 'entrez_cache.sqlite'
+
+    def __init__(self, cache_dir, ttl_days=30, offline=False):
+        import os
+        import sqlite3
+        self.cache_dir = cache_dir
+        self.ttl_seconds = float(ttl_days) * 86400
+        self.offline = offline
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            self.conn = sqlite3.connect(os.path.join(cache_dir,
+                EntrezCache.db_filename))
+            self.conn.text_factory = str
+            self.conn.execute('CREATE TABLE IF NOT EXISTS entrez_cache '\
+                '(namespace TEXT, key TEXT, value TEXT, stored REAL, '\
+                'PRIMARY KEY (namespace, key))')
+            self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            raise ME.MyException('Cache directory `%s` could not be '\
+                'opened: %s' % (cache_dir, e))
+
+    def get(self, namespace, key):
+        ''' This function returns the cached value of a key, or None
+            if the key is absent or its entry has expired. '''
+        import time
+        row = self.conn.execute('SELECT value, stored FROM entrez_cache '\
+            'WHERE namespace=? AND key=?', (namespace, key)).fetchone()
+        if row is None:
+            return None
+        value, stored = row
+        if self.ttl_seconds > 0 and time.time() - stored > self.ttl_seconds:
+            return None
+        return value
+
+    def set(self, namespace, key, value):
+        ''' This function stores a value under a key and timestamps
+            the entry. '''
+        import time
+        self.conn.execute('INSERT OR REPLACE INTO entrez_cache '\
+            '(namespace, key, value, stored) VALUES (?, ?, ?, ?)',
+            (namespace, key, value, time.time()))
+        self.conn.commit()
+
+    def reopen(self):
+        ''' This function returns a new connection to the same cache 
+            (e.g., for use in a worker process, as a database connection 
+            must not be shared across processes). '''
+        return EntrezCache(self.cache_dir, self.ttl_seconds / 86400,
+            self.offline)
+
+    def close(self):
+        ''' This function closes the connection to the database. '''
+        self.conn.close()
+
+
+class LRUCache:
+    ''' This class memoizes the results of a computation in memory, up 
+        to a maximum number of entries; once the maximum is reached, 
+        the least recently used entry is discarded. The numbers of hits 
+        and misses are recorded.
+    Args:
+        maxsize (int): the maximum number of entries; example: 4096
+    '''
+
+    def __init__(self, maxsize=4096):
+        from collections import OrderedDict
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        ''' This function returns the value of a key and marks the 
+            entry as most recently used, or returns <default> if the key 
+            is absent. '''
+        try:
+            value = self.entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries[key] = value
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        ''' This function stores the value of a key, discarding the 
+            least recently used entry if the maximum is reached. '''
+        if key in self.entries:
+            del self.entries[key]
+        elif len(self.entries) >= self.maxsize:
+            self.entries.popitem(last=False)
+        self.entries[key] = value
+
+    def clear(self):
+        ''' This function discards all entries and resets the 
+            numbers of hits and misses. '''
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        # Note: A membership test neither marks the entry as recently 
+        # used nor counts as hit or miss
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
@@ -7,9 +7,14 @@ Custom operations to check annotations
 # IMPORT OPERATIONS #
 #####################
 
+import re
+
 import MyExceptions as ME
+import CachingOps as CaOps
 import GenerationOps as GnOps
 import GlobalVariables as GlobVars
+import IntervalOps as IvOps
+import ProfilingOps as PfOps
 
 ###############
 # AUTHOR INFO #
@@ -24,13 +29,236 @@ __version__ = '2017.02.01.1400'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ###########
 # CLASSES #
 ###########
 
+class TranslEngine:
+    ''' This class translates coding regions via a lookup table of 
+        codons, which is generated once per translation table (from 
+        the public codon tables of Biopython, so that each codon is 
+        translated exactly as by function `translate` of Bio.Seq); 
+        codons with ambiguous letters are added upon their first 
+        occurrence. A single pass 
+        over the codons of a coding region yields its translation as 
+        well as the information needed to evaluate it as a complete 
+        CDS (i.e., the validity of its start and stop codon and the 
+        position of its first stop codon).
+    Args:
+        transl_table (int): the number of the translation table; 
+                            example: 11
+        alphabet (obj):     the alphabet of the sequences to be 
+                            translated; it determines the codon table 
+                            as in function `translate` of Bio.Seq
+    Raises:
+        any error of Biopython on an unknown translation table
+    '''
+
+    # Lookup tables generated so far, by codon table and gap character
+    _lookups = {}
+    _codon_arrays = {}
+    _nuc_array = None
+    _codons = re.compile('...', re.S)
+
+    def __init__(self, transl_table, alphabet=None):
+        from Bio import Alphabet
+        if alphabet is None:
+            alphabet = Alphabet.generic_dna
+        base_alphabet = alphabet
+        while isinstance(base_alphabet, Alphabet.AlphabetEncoder):
+            base_alphabet = base_alphabet.alphabet
+        if isinstance(base_alphabet, Alphabet.ProteinAlphabet):
+            raise ValueError('Proteins cannot be translated!')
+        codon_table = TranslEngine._codon_table(transl_table, alphabet)
+        gap = getattr(alphabet, 'gap_char', None)
+        key = (id(codon_table), gap)
+        if key not in TranslEngine._lookups:
+            TranslEngine._lookups[key] = TranslEngine._make_lookup(
+                codon_table, gap)
+        self.codon_table = codon_table
+        self.gap = gap
+        self.lookup, self.start_codons = TranslEngine._lookups[key]
+
+    @staticmethod
+    def _codon_table(transl_table, alphabet):
+        ''' An internal static function to select the codon table as 
+            function `translate` of Bio.Seq does for a table number. '''
+        from Bio.Alphabet import IUPAC
+        from Bio.Data import CodonTable
+        table_id = int(transl_table)
+        if alphabet == IUPAC.unambiguous_dna:
+            return CodonTable.unambiguous_dna_by_id[table_id]
+        if alphabet == IUPAC.unambiguous_rna:
+            return CodonTable.unambiguous_rna_by_id[table_id]
+        return CodonTable.ambiguous_generic_by_id[table_id]
+
+    @staticmethod
+    def _make_lookup(codon_table, gap):
+        ''' An internal static function to translate each codon that 
+            consists of unambiguous letters; all other codons are added 
+            to the lookup table upon their first occurrence. '''
+        letters = 'ACGTU'
+        lookup = {}
+        for codon in [a+b+c for a in letters for b in letters for c in 
+            letters]:
+            lookup[codon] = TranslEngine._translate_codon(codon, 
+                codon_table)
+        if gap is not None:
+            lookup[gap*3] = gap
+        return lookup, frozenset(codon_table.start_codons)
+
+    @staticmethod
+    def _translate_codon(codon, codon_table):
+        ''' An internal static function to translate a single codon (in 
+            upper case) as function `translate` of Bio.Seq does: a 
+            codon that may or may not be a stop codon (e.g., "TAN") is 
+            translated as "X", and an invalid codon as an empty string. 
+        '''
+        from Bio.Alphabet import IUPAC
+        from Bio.Data.CodonTable import TranslationError
+        try:
+            return codon_table.forward_table[codon]
+        except (KeyError, TranslationError):
+            pass
+        if codon in codon_table.stop_codons:
+            return '*'
+        letters = codon_table.nucleotide_alphabet.letters
+        if letters is None:
+            letters = IUPAC.ambiguous_dna.letters + \
+                IUPAC.ambiguous_rna.letters
+        if set(letters.upper()).issuperset(codon):
+            return 'X'
+        return ''
+
+    def scan(self, seq_str):
+        ''' This function translates all complete codons of a 
+            sequence in a single pass; stop codons are translated as 
+            "*".
+        Args:
+            seq_str (str): a nucleotide sequence
+        Returns:
+            tupl.   The return consists of the translation (a str, or 
+                    None if a codon is invalid), the position of the 
+                    first stop codon in the translation (-1 if there is 
+                    none) and a logical indicating whether the sequence 
+                    is a complete CDS (i.e., starts with a start codon, 
+                    has a length that is a multiple of three and ends 
+                    with its only stop codon)
+        '''
+        seq_str = seq_str.upper()
+        codons = TranslEngine._codons.findall(seq_str)
+        aas = map(self.lookup.get, codons)
+        if None in aas:
+            for i, codon in enumerate(codons):
+                if aas[i] is None:
+                    self.lookup[codon] = aas[i] = TranslEngine.\
+                        _translate_codon(codon, self.codon_table)
+        if '' in aas:
+            return (None, -1, False)
+        transl = ''.join(aas)
+        return (transl, transl.find('*'), self._is_cds(seq_str, transl))
+
+    def _is_cds(self, seq_str, transl):
+        ''' An internal function to evaluate if a sequence (in upper 
+            case) and its translation constitute a complete CDS. '''
+        # Note: The first codon of a CDS is only required to be a start 
+        # codon; a stop codon is only permitted as its last codon
+        return len(seq_str) % 3 == 0 and seq_str[:3] in \
+            self.start_codons and transl.endswith('*') and '*' not in \
+            transl[1:-1]
+
+    def _codon_array(self):
+        ''' An internal function to return the translations of the 64 
+            codons of the letters A, C, G and T as a NumPy array, in 
+            which codon XYZ has the index 16*X + 4*Y + Z (with A=0, C=1, 
+            G=2, T=3). '''
+        import numpy as np
+        key = (id(self.codon_table), self.gap)
+        if key not in TranslEngine._codon_arrays:
+            TranslEngine._codon_arrays[key] = np.array([ord(self.lookup[
+                a+b+c]) for a in 'ACGT' for b in 'ACGT' for c in 'ACGT'], 
+                dtype=np.uint8)
+        return TranslEngine._codon_arrays[key]
+
+    def scan_batch(self, seq_strs):
+        ''' This function scans a list of sequences (e.g., the same 
+            coding region in many records) at once: the sequences are 
+            encoded as a two-dimensional array of codon indices, which 
+            is translated via a single, vectorized table lookup; the 
+            first stop codon of each row is also determined in a 
+            vectorized manner. Sequences that contain letters other 
+            than A, C, G and T are scanned individually. If NumPy is 
+            not available, all sequences are scanned individually.
+        Args:
+            seq_strs (list): a list of nucleotide sequences
+        Returns:
+            list.   The results of function `scan` for each sequence
+        '''
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.scan(seq_str) for seq_str in seq_strs]
+        seq_strs = [seq_str.upper() for seq_str in seq_strs]
+        n_codons = np.array([len(seq_str) // 3 for seq_str in seq_strs], 
+            dtype=np.intp)
+        width = int(n_codons.max()) if seq_strs else 0
+        if width == 0:
+            return [self.scan(seq_str) for seq_str in seq_strs]
+        # Letters are encoded as A=0, C=1, G=2, T=3; all other letters 
+        # and the padding of shorter rows are encoded as 4
+        nucs = np.zeros((len(seq_strs), width*3), dtype=np.uint8)
+        for i, seq_str in enumerate(seq_strs):
+            nucs[i, :n_codons[i]*3] = np.frombuffer(seq_str[:n_codons[i]*3],
+                dtype=np.uint8)
+        codes = TranslEngine._nuc_codes()[nucs].reshape(len(seq_strs), 
+            width, 3)
+        in_row = np.arange(width) < n_codons[:, np.newaxis]
+        irregular = ((codes > 3).any(axis=2) & in_row).any(axis=1)
+        codes &= 3
+        aas = self._codon_array()[(codes[:, :, 0] << 4) | 
+            (codes[:, :, 1] << 2) | codes[:, :, 2]]
+        stops = (aas == ord('*')) & in_row
+        first_stops = np.where(stops.any(axis=1), stops.argmax(axis=1), -1)
+        results = []
+        for i, seq_str in enumerate(seq_strs):
+            if irregular[i]:
+                results.append(self.scan(seq_str))
+                continue
+            transl = aas[i, :n_codons[i]].tobytes()
+            results.append((transl, int(first_stops[i]), 
+                self._is_cds(seq_str, transl)))
+        return results
+
+    @staticmethod
+    def _nuc_codes():
+        ''' An internal static function to return the array that 
+            encodes each byte as a nucleotide code (see function 
+            `scan_batch`). '''
+        import numpy as np
+        if TranslEngine._nuc_array is None:
+            nuc_array = np.full(256, 4, dtype=np.uint8)
+            for code, letter in enumerate('ACGT'):
+                nuc_array[ord(letter)] = code
+            TranslEngine._nuc_array = nuc_array
+        return TranslEngine._nuc_array
+
+    def as_seq(self, transl):
+        ''' This function converts a translation into a Seq object 
+            with the alphabet assigned by function `translate` of 
+            Bio.Seq. '''
+        from Bio import Alphabet
+        from Bio.Seq import Seq
+        alphabet = self.codon_table.protein_alphabet
+        if self.gap and self.gap in transl:
+            alphabet = Alphabet.Gapped(alphabet, self.gap)
+        if '*' in transl:
+            alphabet = Alphabet.HasStopCodon(alphabet, '*')
+        return Seq(transl, alphabet)
+
+
 class AnnoCheck:
     ''' This class contains functions to evaluate the quality of an 
         annotation.
@@ -59,91 +287,98 @@ class AnnoCheck:
         self.transl_table = transl_table
 
     @staticmethod
-    def _transl(extract, transl_table, to_stop=False, cds=False):
-        ''' An internal static function to translate a coding region. '''
-        from Bio.Seq import Seq
-        transl = extract.translate(table=transl_table, to_stop=to_stop,
-            cds=cds)
-        # Adjustment for non-start codons given the necessary use of
-        # cds=True in TPL.
-        if not extract.startswith(GlobVars.nex2ena_start_codon):
-            first_codon_seq = extract[0:3]
-            first_aa = first_codon_seq.translate(table=transl_table, \
-                to_stop=to_stop, cds=False)
-            transl = first_aa + transl[1:]
-        return transl
-
-    @staticmethod
-    def _check_protein_start(extract, transl_table):
-        ''' An internal static function to translate a coding region and check
-            if it starts with a methionine. '''
-        from Bio.Seq import Seq
-        transl = extract.translate(table=transl_table)
-        return transl.startswith('M')
+    def _truncate_feat_loc(location_object, n_nucleotides):
+        ''' An internal static function to truncate a feature location 
+            to its first <n_nucleotides> positions. '''
+        compound_interval = IvOps.IntervalList([(e.start.position,
+            e.end.position) for e in location_object.parts])
+        adjusted_range = compound_interval.head(n_nucleotides)
+        return GnOps.GenerateFeatLoc().make_location(adjusted_range)
 
-    @staticmethod
-    def _adjust_feat_loc(location_object, transl_with_internStop, \
-        transl_without_internStop):
-        ''' An internal static function to adjust the feature location if an
-            internal stop codon were present. '''
-
-        if len(transl_without_internStop) > len(transl_with_internStop):
-            # 1. Unnest the nested lists
-            contiguous_subsets = [range(e.start.position,
-                e.end.position) for e in location_object.parts]
-            compound_integer_range = sum(contiguous_subsets, [])
-            # 2. Adjust location range
-            len_with_internStop = len(transl_with_internStop) * 3
-            adjusted_range = compound_integer_range[:len_with_internStop]
-            # 3. Establish location            
-            feat_loc = GnOps.GenerateFeatLoc().make_location(adjusted_range)
-        if len(transl_without_internStop) == len(transl_with_internStop):
-            feat_loc = location_object
-        return feat_loc
-
-    def check(self):
-        ''' This function performs checks on a coding region. 
-            Specifically, the function tries to translate the coding 
-            region (CDS) directly, using the internal checker 
-            "cds=True". If a direct translation fails, it confirms if 
-            the CDS starts with a methionine. If the CDS does not start 
-            with a methionine, a ValueError is raised. If the CDS does 
-            start with a methionine, translations are conducted with 
-            and without regard to internal stop codons. The shorter 
-            of the two translations is kept. The feature location is 
-            adjusted, where necessary.
-        Note:
-            The asterisk indicating a stop codon is truncated under 
-            _transl(to_stop=True) and must consequently be added again
-            (see line 137).
+    def outcome(self, scan=None):
+        ''' This function translates a coding region and evaluates 
+            the translation, independent of the feature location and 
+            the sequence name (i.e., the outcome depends on the 
+            nucleotide sequence and the translation table only).
+            Specifically, the function evaluates if the coding region 
+            is a complete CDS (i.e., starts with a start codon, has a 
+            length that is a multiple of three and ends with its only 
+            stop codon); if so, its translation (without the stop codon) 
+            is kept. Otherwise, the coding region is translated up to 
+            its first internal stop codon. All translations are derived 
+            from a single pass of class `TranslEngine` over the codons.
+        Args:
+            scan (tupl): the result of function `scan` of class 
+                         `TranslEngine` for this coding region, if 
+                         already available (e.g., from a batch scan)
+        Returns:
+            tupl.   The return consists of the translation (a Seq 
+                    object, or None if the translation is unsuccessful), 
+                    the number of nucleotides to which the feature 
+                    location must be truncated (None if no truncation 
+                    is necessary) and a logical indicating whether the 
+                    coding region ends with a partial codon; example: 
+                    (Seq('MI', HasStopCodon(...)), None, False)
         '''
-        from Bio.Seq import Seq
-        from Bio.SeqFeature import FeatureLocation
+        seq_str = str(self.extract)
         try:
-            # Note: TFL must contain "cds=True"; don't delete it
-            transl_out = AnnoCheck._transl(self.extract,
-                self.transl_table, cds=True)
-            feat_loc = self.feature.location
-        except:
-            try:
-                without_internalStop = AnnoCheck._transl(self.extract,
-                    self.transl_table)
-                with_internalStop = AnnoCheck._transl(self.extract,
-                    self.transl_table, to_stop=True)
-                transl_out = with_internalStop
-                feat_loc = AnnoCheck._adjust_feat_loc(self.feature.location, 
-                    with_internalStop, without_internalStop)
-            except:
-                raise ME.MyException('Translation of feature `%s` of '\
-                    'sequence `%s` is unsuccessful.' % (self.feature.id,
-                    self.record_id))
+            engine = TranslEngine(self.transl_table, 
+                getattr(self.extract, 'alphabet', None))
+            if scan is None:
+                scan = engine.scan(seq_str)
+        except Exception:
+            return (None, None, False)
+        transl, first_stop, is_cds = scan
+        if is_cds:
+            # Note: The first codon is translated as such, even if it 
+            # is an alternative start codon
+            return (engine.as_seq(transl[:-1]), None, False)
+        if transl is None:
+            return (None, None, False)
+        partial = len(seq_str) % 3 != 0
+        if first_stop > -1:
+            return (engine.as_seq(transl[:first_stop]), first_stop * 3, 
+                partial)
+        return (engine.as_seq(transl), None, partial)
+
+    def check(self, scan=None, outcome=None):
+        ''' This function performs checks on a coding region (see 
+            function `outcome`) and returns its translation and its 
+            feature location, which is truncated at the first internal 
+            stop codon, where necessary.
+        Args:
+            scan (tupl):    the result of function `scan` of class 
+                            `TranslEngine` for this coding region, if 
+                            already available (e.g., from a batch scan)
+            outcome (tupl): the result of function `outcome` for this 
+                            coding region, if already available (e.g., 
+                            from a cache); it supersedes <scan>
+        '''
+        if outcome is None:
+            outcome = self.outcome(scan)
+        transl_out, n_nucleotides, partial = outcome
+        # Note: A coding region that starts with a stop codon cannot be 
+        # truncated to a feature location
+        if transl_out is None or n_nucleotides == 0:
+            raise ME.MyException('Translation of feature `%s` of '\
+                'sequence `%s` is unsuccessful.' % (self.feature.id,
+                self.record_id))
+        if partial:
+            # TFL translates the partial codon via Biopython, which 
+            # issues its warning on partial codons
+            from Bio.Seq import translate
+            seq_str = str(self.extract)
+            translate(seq_str[len(seq_str) - len(seq_str) % 3:], 
+                table=self.transl_table)
+        feat_loc = self.feature.location
+        if n_nucleotides is not None:
+            feat_loc = AnnoCheck._truncate_feat_loc(feat_loc, n_nucleotides)
         if len(transl_out) < 2:
             raise ME.MyException('Translation of feature `%s` of '\
                 'sequence `%s` indicates a protein length of only a '\
                 'single amino acid.' % (self.feature.id, self.record_id))
-        #transl_out = transl_out + "*"
         return (transl_out, feat_loc)
-    
+
     def for_unittest(self):
         from Bio.Seq import Seq
         from Bio.SeqFeature import FeatureLocation
@@ -162,26 +397,130 @@ class AnnoCheck:
 
 class TranslCheck:
     ''' This class contains functions to coordinate different checks. '''
+
+    # Cache of the outcomes of translations (see function `outcome` of 
+    # class `AnnoCheck`), as the coding regions of many sequences of an 
+    # alignment are identical after degapping. The outcomes are indexed 
+    # by the nucleotide sequence and the codon table; each entry also 
+    # holds the time its computation took.
+    _transl_cache = CaOps.LRUCache(4096)
         
     def __init__(self):
         pass
     
-    def transl_and_quality_of_transl(self, seq_record, feature, transl_table):
+    @staticmethod
+    def _cache_key(seq_str, engine):
+        ''' An internal static function to return the key of the outcome 
+            of a translation in the cache. '''
+        return (seq_str, id(engine.codon_table), engine.gap)
+
+    @staticmethod
+    def cache_outcomes(seq_strs, transl_table, alphabet=None):
+        ''' This function computes the outcomes of the translations of 
+            a batch of coding regions (e.g., the same coding region in 
+            the sequences of a batch) and stores them in the cache. Only 
+            the coding regions whose outcome is not cached yet are 
+            translated, and they are scanned together (via function 
+            `scan_batch` of class `TranslEngine`).
+        Args:
+            seq_strs (list):    a list of nucleotide sequences
+            transl_table (int): the number of the translation table
+            alphabet (obj):     the alphabet of the sequences
+        Returns:
+            dict.   The outcomes computed (i.e., not taken from the 
+                    cache), indexed by sequence; they are counted as 
+                    misses and are to be used once each (see function 
+                    `transl_and_quality_of_transl`)
+        '''
+        import time
+        from Bio.Seq import Seq
+        profiler = PfOps.profiler
+        try:
+            engine = TranslEngine(transl_table, alphabet)
+        except Exception:
+            # Note: Such errors are reported for each feature
+            return {}
+        missing = sorted(set(seq_str for seq_str in seq_strs if 
+            TranslCheck._cache_key(seq_str, engine) not in 
+            TranslCheck._transl_cache))
+        if not missing:
+            return {}
+        start = time.time()
+        outcomes = {}
+        for seq_str, scan in zip(missing, engine.scan_batch(missing)):
+            extract = seq_str
+            if alphabet is not None:
+                extract = Seq(seq_str, alphabet)
+            outcomes[seq_str] = AnnoCheck(extract, None, None, 
+                transl_table).outcome(scan)
+        seconds = (time.time() - start) / len(missing)
+        for seq_str, outcome in outcomes.items():
+            TranslCheck._transl_cache.set(TranslCheck._cache_key(seq_str, 
+                engine), (outcome, seconds))
+        profiler.count('transl_cache_misses', len(missing))
+        return outcomes
+
+    @staticmethod
+    def _cached_outcome(anno_check, seq_str):
+        ''' An internal static function to return the outcome of a 
+            translation from the cache or, if absent, to compute and 
+            cache it. The numbers of hits and misses as well as the time 
+            saved by the hits are recorded by the active profiler. '''
+        import time
+        profiler = PfOps.profiler
+        try:
+            engine = TranslEngine(anno_check.transl_table, 
+                getattr(anno_check.extract, 'alphabet', None))
+        except Exception:
+            return anno_check.outcome()
+        key = TranslCheck._cache_key(seq_str, engine)
+        entry = TranslCheck._transl_cache.get(key)
+        if entry is not None:
+            outcome, seconds = entry
+            profiler.count('transl_cache_hits')
+            profiler.count('transl_cache_seconds_saved', seconds)
+            return outcome
+        start = time.time()
+        outcome = anno_check.outcome()
+        TranslCheck._transl_cache.set(key, (outcome, time.time() - start))
+        profiler.count('transl_cache_misses')
+        return outcome
+
+    def transl_and_quality_of_transl(self, seq_record, feature, transl_table,
+        transl_outcomes=None):
         ''' This function conducts a translation of a coding region and checks 
-            the quality of said translation.
+            the quality of said translation. The outcome of the translation 
+            is cached (see functions `cache_outcomes` and 
+            `_cached_outcome`), so that identical coding regions are 
+            translated only once; any truncation of 
+            the feature location is nonetheless applied to the location 
+            of each feature.
         Args:
             seq_record (obj):   foobar; example: 'foobar'
             feature (obj):      foobar; example: 'foobar'
             transl_table (int): 
+            transl_outcomes (dict): the outcomes just computed by 
+                                function `cache_outcomes`, indexed by 
+                                sequence; an outcome is removed once 
+                                used, so that further uses count as 
+                                hits of the cache
         Returns:
             True, unless exception
         Raises:
             feature
         '''
-        extract = feature.extract(seq_record)
+        # Note: Extracting from the sequence rather than the seq_record 
+        # avoids copying the features of the seq_record
+        extract = feature.location.extract(seq_record.seq)
+        seq_str = str(extract)
         try:
-            transl, loc = AnnoCheck(extract.seq, feature, seq_record.id, 
-                                     transl_table).check()
+            anno_check = AnnoCheck(extract, feature, seq_record.id, 
+                transl_table)
+            if transl_outcomes and seq_str in transl_outcomes:
+                outcome = transl_outcomes.pop(seq_str)
+            else:
+                outcome = TranslCheck._cached_outcome(anno_check, seq_str)
+            transl, loc = anno_check.check(outcome=outcome)
             feature.qualifiers["translation"] = transl
             feature.location = loc
         except ME.MyException as e:
@@ -203,17 +542,37 @@ class QualifierCheck:
         ME.MyException
     '''
     
+    # Memo of the ASCII conversions of qualifier values, as the same 
+    # values (e.g., countries, collectors, herbaria) recur in many rows
+    _ascii_memo = CaOps.LRUCache(4096)
+    _nonASCII = re.compile(r'[\x80-\xff]')
+
     def __init__(self, lst_of_dcts, label):
         self.lst_of_dcts = lst_of_dcts
         self.label = label
     
+    @staticmethod
+    def _to_ASCII(value):
+        ''' This function converts any non-ASCII characters of a 
+            qualifier value (a UTF-8 encoded string) to ASCII 
+            characters. Values that consist of ASCII characters only 
+            are returned unchanged; the conversions of all other values 
+            are memoized. '''
+        if not QualifierCheck._nonASCII.search(value):
+            return value
+        ascii_value = QualifierCheck._ascii_memo.get(value)
+        if ascii_value is None:
+            from unidecode import unidecode
+            ascii_value = unidecode(value.decode('utf-8'))
+            QualifierCheck._ascii_memo.set(value, ascii_value)
+        return ascii_value
+
     @staticmethod
     def _enforce_ASCII(lst_of_dcts):
         ''' This function converts any non-ASCII characters among 
             qualifier values to ASCII characters. '''
-        from unidecode import unidecode
         filtered_lst_of_dcts = [
-            {k: unidecode(v.decode('utf-8')) for k, v in dct.items()} 
+            {k: QualifierCheck._to_ASCII(v) for k, v in dct.items()} 
             for dct in lst_of_dcts]
         return filtered_lst_of_dcts
     
@@ -227,6 +586,17 @@ class QualifierCheck:
                 'labelled `%s`' % (label))
         return True
     
+    @staticmethod
+    def _seqnames_present(index, seq_names, label):
+        ''' This function checks if every (!) sequence name is a key of 
+            the qualifier index. '''
+        not_present = [s for s in seq_names if s not in index]
+        if not_present:
+            raise ME.MyException('The following sequence names are not '\
+                'listed in column `%s` of the csv-file: `%s`' % (label,
+                ', '.join(sorted(not_present))))
+        return True
+
     @staticmethod
     def _rm_empty_qual(lst_of_dcts):
         ''' This function removes any qualifier from a dictionary which 
@@ -239,6 +609,16 @@ class QualifierCheck:
             for dct in lst_of_dcts]
         return nonempty_lst_of_dcts
     
+    @staticmethod
+    def _valid_header(header, label):
+        ''' This function conducts the checks of function 
+            `quality_of_qualifiers` on the column labels of a csv-file 
+            (i.e., once for all rows). '''
+        lst_of_dcts = [dict.fromkeys(header)]
+        QualifierCheck._label_present(lst_of_dcts, label)
+        QualifierCheck._valid_INSDC_quals(lst_of_dcts)
+        return True
+
     @staticmethod
     def _valid_INSDC_quals(lst_of_dcts):
         ''' This function checks if every (!) dictionary key in a list of 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+'''
+Classes to record the progress of a conversion, so that an interrupted
+conversion can be resumed
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import MyExceptions as ME
+import ProfilingOps as PfOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.12.1200'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class Checkpoint:
+    ''' This class records the progress of a conversion in a checkpoint
+        file next to the outfile (i.e., "<outfile>.ckpt"). Each
+        checkpoint holds the name of the last sequence whose record was
+        written completely and the position in the outfile right after
+        that record; an initial checkpoint holds the size of the
+        outfile before the first record was written. Checkpoints are written atomically (i.e., via a
+        temporary file that replaces the previous checkpoint), and only
+        after the records were flushed to disk; a checkpoint therefore
+        never refers to records that were not fully written. A
+        conversion is resumed by truncating the outfile to the position
+        recorded (which removes any partial or unregistered trailing
+        record) and by continuing with the next sequence name in sorted
+        order.
+    Args:
+        path_to_outfile (str): path to the outfile; example:
+                               "/path_to_output/test.embl"
+        input_paths (list):    the paths to the infiles, whose sizes and
+                               modification times must not change
+                               between a checkpoint and the resumption
+        every (int):           the number of records after which a
+                               checkpoint is written; example: 100 (a
+                               value of 0 disables checkpoints)
+    Raises:
+        ME.MyException
+    '''
+
+    suffix = '.ckpt'
+    format_version = 1
+
+    def __init__(self, path_to_outfile, input_paths, every=100):
+        self.path_to_outfile = path_to_outfile
+        self.path_to_ckpt = path_to_outfile + Checkpoint.suffix
+        self.input_paths = input_paths
+        self.every = max(0, int(every))
+        self.records = 0
+        self.last_name = None
+        self.offset = None
+        self._unsaved = 0
+
+    @staticmethod
+    def _fingerprint(paths):
+        ''' An internal static function to return the absolute path, the
+            size and the modification time of each file. '''
+        import os
+        fingerprint = []
+        for path in paths:
+            stat = os.stat(path)
+            fingerprint.append([os.path.abspath(path), stat.st_size,
+                int(stat.st_mtime)])
+        return fingerprint
+
+    def load(self):
+        ''' This function returns the content of the checkpoint file, or
+            None if there is no checkpoint file. '''
+        import json
+        import os
+        if not os.path.isfile(self.path_to_ckpt):
+            return None
+        try:
+            with open(self.path_to_ckpt) as ckpt_handle:
+                state = json.load(ckpt_handle)
+            if state.get('version') != Checkpoint.format_version:
+                raise ValueError('unknown format version')
+            return state
+        except (IOError, ValueError, AttributeError) as e:
+            raise ME.MyException('Checkpoint `%s` could not be read: %s' %
+                (self.path_to_ckpt, e))
+
+    def restore(self):
+        ''' This function prepares the resumption of an interrupted
+            conversion: it truncates the outfile to the position 
+            recorded in the checkpoint and returns the name of the last 
+            sequence whose record was written completely (or None, if 
+            no record was registered yet). If there is no checkpoint 
+            file, None is returned and the conversion starts from the 
+            first sequence; a non-empty outfile without checkpoint file 
+            cannot be resumed. '''
+        import json
+        import os
+        state = self.load()
+        if state is None:
+            if os.path.isfile(self.path_to_outfile) and \
+                os.path.getsize(self.path_to_outfile) > 0:
+                raise ME.MyException('Outfile `%s` is not empty, but '\
+                    'there is no checkpoint `%s`; the conversion cannot '\
+                    'be resumed.' % (self.path_to_outfile, 
+                    self.path_to_ckpt))
+            return None
+        # Note: The fingerprint is compared as read from JSON
+        fingerprint = json.loads(json.dumps(Checkpoint._fingerprint(
+            self.input_paths)))
+        if state['inputs'] != fingerprint:
+            raise ME.MyException('The infiles have changed since '\
+                'checkpoint `%s` was written; the conversion cannot be '\
+                'resumed.' % (self.path_to_ckpt))
+        try:
+            with open(self.path_to_outfile, 'r+b') as outp_handle:
+                outp_handle.seek(0, os.SEEK_END)
+                if outp_handle.tell() < state['offset']:
+                    raise ME.MyException('Outfile `%s` is shorter than '\
+                        'recorded in checkpoint `%s`; the conversion '\
+                        'cannot be resumed.' % (self.path_to_outfile,
+                        self.path_to_ckpt))
+                outp_handle.truncate(state['offset'])
+        except IOError as e:
+            raise ME.MyException('Outfile `%s` could not be truncated: %s'
+                % (self.path_to_outfile, e))
+        self.records = state['records']
+        self.offset = state['offset']
+        # Note: Sequence names are byte strings
+        if state['last_name'] is not None:
+            self.last_name = state['last_name'].encode('utf-8')
+        return self.last_name
+
+    def start(self, outp_handle):
+        ''' This function writes an initial checkpoint, which records 
+            the size of the outfile before any record is written to 
+            it. '''
+        import os
+        if self.offset is None:
+            self.offset = os.fstat(outp_handle.fileno()).st_size
+        self.save(outp_handle)
+
+    def completed(self, seq_name, outp_handle):
+        ''' This function registers that the record of a sequence was
+            written to the outfile and writes a checkpoint, if due. 
+            This function must be called right after the record was 
+            written, as the current position in the outfile is recorded 
+            as the end of that record. '''
+        self.records += 1
+        self.last_name = seq_name
+        self.offset = outp_handle.tell()
+        self._unsaved += 1
+        if self.every and self._unsaved >= self.every:
+            self.save(outp_handle)
+
+    def save(self, outp_handle):
+        ''' This function flushes the outfile to disk and then writes a
+            checkpoint atomically. '''
+        import json
+        import os
+        if not self.every or self.offset is None:
+            return
+        outp_handle.flush()
+        os.fsync(outp_handle.fileno())
+        state = {'version': Checkpoint.format_version, 'inputs':
+            Checkpoint._fingerprint(self.input_paths), 'last_name':
+            self.last_name, 'records': self.records, 'offset':
+            self.offset}
+        path_to_tmp = self.path_to_ckpt + '.tmp'
+        try:
+            with open(path_to_tmp, 'w') as tmp_handle:
+                json.dump(state, tmp_handle, sort_keys=True)
+                tmp_handle.flush()
+                os.fsync(tmp_handle.fileno())
+            try:
+                os.rename(path_to_tmp, self.path_to_ckpt)
+            except OSError:
+                # Note: On Windows, os.rename does not replace an
+                # existing file
+                os.remove(self.path_to_ckpt)
+                os.rename(path_to_tmp, self.path_to_ckpt)
+        except (IOError, OSError) as e:
+            raise ME.MyException('Checkpoint `%s` could not be written: '\
+                '%s' % (self.path_to_ckpt, e))
+        self._unsaved = 0
+        PfOps.profiler.count('checkpoints_written')
+
+    def remove(self):
+        ''' This function removes the checkpoint file (e.g., once the
+            conversion has completed). '''
+        import os
+        if os.path.isfile(self.path_to_ckpt):
+            os.remove(self.path_to_ckpt)
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
@@ -7,6 +7,8 @@ Classes to degap sequences but maintain annotations
 # IMPORT OPERATIONS #
 #####################
 
+import IntervalOps as IvOps
+
 ###############
 # AUTHOR INFO #
 ###############
@@ -20,7 +22,7 @@ __version__ = '2017.01.31.1900'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ###########
@@ -31,8 +33,7 @@ class DegapButMaintainAnno:
     ''' This class contains functions to degap DNA sequences while 
         maintaining annotations. Specifically, the functions remove 
         dashes from strings while maintaining annotations on these 
-        strings. Only some of the implementations work if the charsets 
-        are overlapping.
+        strings. The charsets may overlap.
     Args:
         seq (str):      a string that represents an aligned DNA sequence;
                         example: "ATG-C"
@@ -52,28 +53,57 @@ class DegapButMaintainAnno:
         self.rmchar = rmchar
         self.charsets = charsets
     
+    @staticmethod
+    def _offset_map(seq, rmchar):
+        ''' An internal static function to generate, in a single pass 
+            over the sequence, a cumulative array that maps each position 
+            of the gapped sequence to its position in the degapped 
+            sequence. Element i of the array is the number of retained 
+            characters before position i; the array is one element 
+            longer than the sequence, so that stop positions of 
+            intervals can be mapped, too.
+        '''
+#        Examples:
+#            Example 1:
+#            >>> _offset_map("AT--GC", "-")
+#            Out: array('l', [0, 1, 2, 2, 2, 3, 4])
+
+        from array import array
+        import re
+        cum_map = array('l', [0]) * (len(seq)+1)
+        new_pos = 0
+        prev_end = 0
+        for run in re.finditer('[^%s]+' % re.escape(rmchar), str(seq)):
+            start, end = run.span()
+            cum_map[prev_end+1:start+1] = array('l', [new_pos]) * \
+                (start-prev_end)
+            cum_map[start+1:end+1] = array('l', xrange(new_pos+1,
+                new_pos+end-start+1))
+            new_pos += end-start
+            prev_end = end
+        cum_map[prev_end+1:] = array('l', [new_pos]) * (len(seq)-prev_end)
+        return cum_map
+
     def degap(self):
-        ''' This function works on overlapping charsets and is preferable over 
-        "degap_legacy".
-        Source: http://stackoverflow.com/questions/35233714/
-        maintaining-overlapping-annotations-while-removing-dashes-from-string
+        ''' This function works on overlapping charsets. Instead of 
+        removing one gap at a time, it generates a map of gap offsets 
+        for the entire sequence and then remaps the intervals of all 
+        charsets through this map. The input charsets are not 
+        modified; the output charsets are of class IntervalList.
         '''
-        from copy import copy
-        
         seq = self.seq
         rmchar = self.rmchar
         charsets = self.charsets
-        
-        annotations = copy(charsets)
-        index = seq.find(rmchar)
-        while index > -1: # if any occurrence is found
-            for gene_name, indices in annotations.items():
-                if index in indices:
-                    indices.remove(index)
-                annotations[gene_name] = [e-1 if e > index else e \
-                    for e in indices]
-            seq = seq[:index] + seq[index+1:]
-            index = seq.find(rmchar)
+
+        cum_map = DegapButMaintainAnno._offset_map(seq, rmchar)
+        annotations = {}
+        for gene_name, indices in charsets.items():
+            annotations[gene_name] = IvOps.IntervalList.\
+                from_indices(indices).remap(cum_map)
+        if isinstance(seq, basestring):
+            seq = seq.replace(rmchar, '')
+        else:
+            seq = seq.ungap(rmchar)
         return seq, annotations
 
 class RmAmbigsButMaintainAnno:
@@ -97,38 +127,136 @@ class RmAmbigsButMaintainAnno:
         pass
     
     @staticmethod
-    def rm_leadambig(seq, rmchar, charsets):
-        ''' This class removes leading ambiguous nucleotides from a DNA
-            sequence while maintaining the annotations.
+    def rm_ltambig(seq, rmchar, charsets):
+        ''' This function removes leading and trailing ambiguous 
+            nucleotides from a DNA sequence while maintaining the 
+            annotations. Both trim points are found in a single pass 
+            (i.e., a single strip), and each charset is clipped to the 
+            retained range in a single step. <rmchar> may consist of 
+            several characters (e.g., "N?"). The input charsets are not 
+            modified; the output charsets are of class IntervalList.
         '''
-        if seq[0] == rmchar:
-            lead_stripoff = len(seq)-len(seq.lstrip(rmchar))
-            for gene_name, indices in charsets.items():
-                indices_shifted = [i-lead_stripoff for i in indices]
-                charsets[gene_name] = [i for i in indices_shifted if i >= 0]
-            seq = seq[lead_stripoff:]
-        
-        return seq, charsets
-    
+#        Examples:
+#            Example 1:
+#            >>> rm_ltambig("NNATGCNNN", "N", {"gene1":[0,1,2,3]})
+#            Out: ('ATGC', {'gene1': IntervalList([(0, 2)])})
+
+        seq_str = str(seq)
+        core = seq_str.strip(rmchar)
+        # TFL infers the trim points from the trimmed sequence: all 
+        # positions before the first retained nucleotide are ambiguous, 
+        # so that its first occurrence marks the leading trim point
+        lead_stripoff = seq_str.index(core[0]) if core else len(seq_str)
+        trail_stripoff = lead_stripoff + len(core)
+        annotations = {}
+        for gene_name, indices in charsets.items():
+            annotations[gene_name] = IvOps.IntervalList.from_indices(
+                indices).clip(lead_stripoff, trail_stripoff).shift(
+                -lead_stripoff)
+        if isinstance(seq, basestring):
+            return core, annotations
+        return seq[lead_stripoff:trail_stripoff], annotations
+
+class CleanupButMaintainAnno:
+    ''' This class cleans up an aligned DNA sequence in a single step 
+        while maintaining the annotations: missing data is converted 
+        into ambiguous nucleotides, leading and trailing ambiguous 
+        nucleotides are removed, and the sequence is degapped. The 
+        result is identical to replacing the missing data and then 
+        calling, in turn, "RmAmbigsButMaintainAnno.rm_ltambig" and 
+        "DegapButMaintainAnno.degap". The sequence is rewritten by two 
+        C-level string operations only (i.e., strip and translate), and 
+        the charsets are remapped through a position map that is only 
+        evaluated at their interval boundaries. The input charsets are 
+        not modified; the output charsets are of class IntervalList.
+    Args:
+        seq (str):          a string (or a Bio.Seq object) that 
+                            represents an aligned DNA sequence; example: 
+                            "??NATG-CNN"
+        charsets (dict):    a dictionary with gene names (str) as keys and 
+                            lists of nucleotide positions (list) or 
+                            IntervalLists as values; example: 
+                            {"gene_1":[3,4,5,6,7]}
+        missingchar (str):  the character for missing data (or None); 
+                            example: "?"
+        ambigchar (str):    the character for ambiguous nucleotides, into 
+                            which missing data is converted; example: "N"
+        gapchar (str):      the character for gaps; example: "-"
+    Returns:
+        tupl.   The return consists of the cleaned sequence and the 
+                corresponding charsets; example: 
+                ("ATGC", {"gene_1":IntervalList([(0, 4)])})
+    Raises:
+        currently nothing
+    '''
+
+    def __init__(self, seq, charsets, missingchar='?', ambigchar='N',
+                 gapchar='-'):
+        self.seq = seq
+        self.charsets = charsets
+        self.missingchar = missingchar
+        self.ambigchar = ambigchar
+        self.gapchar = gapchar
+
+    @staticmethod
+    def _position_map(core, gapchar, positions):
+        ''' An internal static function to map positions of a gapped 
+            sequence to their positions in the degapped sequence. The 
+            gaps between consecutive positions are counted at C level, 
+            so that the sequence is traversed only once irrespective of 
+            the number of positions.
+        '''
+#        Examples:
+#            Example 1:
+#            >>> _position_map("AT--GC", "-", [0, 3, 6])
+#            Out: {0: 0, 3: 2, 6: 4}
+
+        pos_map = {}
+        prev_pos = 0
+        n_gaps = 0
+        for pos in sorted(set(positions)):
+            n_gaps += core.count(gapchar, prev_pos, pos)
+            pos_map[pos] = pos - n_gaps
+            prev_pos = pos
+        return pos_map
+
     @staticmethod
-    def rm_trailambig(seq, rmchar, charsets):
-        ''' This class removes trailing ambiguous nucleotides from a DNA
-            sequence while maintaining the annotations.
+    def _like(seq, seq_str):
+        ''' An internal static function to return a string as the same 
+            type of sequence as <seq>, analogous to Bio.Seq.ungap. '''
+        if isinstance(seq, basestring):
+            return seq_str
+        seq = seq.__class__(seq_str, seq.alphabet)
+        if hasattr(seq.alphabet, 'gap_char'):
+            # Note: The gaps were already removed; TFL only removes the 
+            # gap character from the alphabet
+            seq = seq.ungap()
+        return seq
+
+    def cleanup(self):
+        ''' This function cleans up the sequence and remaps the charsets. 
         '''
-        from copy import copy
-        if seq[-1] == rmchar:
-            trail_stripoff = len(seq.rstrip(rmchar))
-            range_stripoff = range(trail_stripoff, len(seq))
-            for gene_name, indices in charsets.items():
-                indices_new = copy(indices)
-                for index in range_stripoff:
-                    if index in indices_new:
-                        indices_new.remove(index)
-                #    else:
-                #        print "Warning: Index %s out of range." %(index)
-                charsets[gene_name] = indices_new
-            seq = seq[:trail_stripoff]
-        return seq, charsets
+        import string
+        stripchars = self.ambigchar + (self.missingchar or '')
+        core, clipped = RmAmbigsButMaintainAnno.rm_ltambig(str(self.seq),
+            stripchars, self.charsets)
+        boundaries = []
+        for intervals in clipped.values():
+            boundaries.extend(intervals.starts)
+            boundaries.extend(intervals.stops)
+        pos_map = CleanupButMaintainAnno._position_map(core, self.gapchar,
+            boundaries)
+        annotations = {}
+        for gene_name, intervals in clipped.items():
+            annotations[gene_name] = intervals.remap(pos_map)
+
+        if self.missingchar:
+            table = string.maketrans(self.missingchar, self.ambigchar)
+        else:
+            table = None
+        seq = CleanupButMaintainAnno._like(self.seq,
+            core.translate(table, self.gapchar))
+        return seq, annotations
 
 #############
 # FUNCTIONS #
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+'''
+Classes to send rate-limited, concurrent requests to NCBI Entrez
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import threading
+import time
+
+import ProfilingOps as PfOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.08.1000'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class TokenBucket:
+    ''' This class limits the rate of events (e.g., requests) across
+        threads. Each event consumes a token; tokens are replenished at
+        a fixed rate up to the capacity of the bucket. If no token is
+        available, the calling thread reserves the next token and sleeps
+        until it becomes available.
+    Args:
+        rate (float):     the number of tokens replenished per second;
+                          example: 3
+        capacity (float): the maximum number of tokens; a capacity of 1
+                          spaces all events evenly
+        clock (func):     an optional function that returns the time
+        sleep (func):     an optional function that waits for a time
+    '''
+
+    def __init__(self, rate, capacity=1, clock=time.time, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.stamp = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        ''' This function consumes a token and returns the time waited
+            for it. '''
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens +
+                (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+class EntrezClient:
+    ''' This class sends requests to NCBI Entrez via a transport (by
+        default the module Bio.Entrez) and parses the results. All
+        requests of a client pass through a shared TokenBucket that
+        honours the rate limit of NCBI (i.e., 3 requests per second
+        without an API key, 10 with one). Requests that fail with HTTP
+        status 429 or 5xx are retried with exponential backoff. Lists
+        of lookups can be distributed across a pool of threads, which
+        share the rate limit.
+    Args:
+        api_key (str):     an optional NCBI API key
+        transport (obj):   an optional object that stands in for
+                           Bio.Entrez (e.g., for tests); it must provide
+                           the Entrez utilities (e.g., "esearch") and
+                           the function "read"
+        max_workers (int): the number of threads of function `map`
+        max_retries (int): the number of retries of a failed request
+        backoff (float):   the delay before the first retry in seconds;
+                           it doubles with each further retry
+        bucket (obj):      an optional TokenBucket
+    '''
+
+    rate_default = 3
+    rate_apikey = 10
+    retry_codes = (429, 500, 502, 503, 504)
+
+    def __init__(self, api_key=None, transport=None, max_workers=4,
+                 max_retries=3, backoff=0.5, bucket=None):
+        self.api_key = api_key
+        self.transport = transport
+        self.max_workers = max(1, int(max_workers))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        if bucket is None:
+            bucket = TokenBucket(EntrezClient.rate_apikey if api_key
+                else EntrezClient.rate_default)
+        self.bucket = bucket
+        self.lock = threading.Lock()
+
+    def _transport(self):
+        ''' An internal function to return the transport; Bio.Entrez is
+            only imported upon the first request. '''
+        if self.transport is None:
+            from Bio import Entrez
+            return Entrez
+        return self.transport
+
+    @staticmethod
+    def _is_retryable(e):
+        ''' An internal static function to evaluate if a failed request
+            shall be retried. '''
+        return getattr(e, 'code', None) in EntrezClient.retry_codes
+
+    def _count(self, counter):
+        with self.lock:
+            PfOps.profiler.count(counter)
+
+    def request(self, utility, **params):
+        ''' This function sends a request to an Entrez utility and
+            returns the parsed result.
+        Args:
+            utility (str):  the name of the Entrez utility; example:
+                            "esearch"
+            params (dict):  the parameters of the request; example:
+                            db='gene', term='matK [sym]'
+        Returns:
+            the result as parsed by the function "read" of the transport
+        Raises:
+            any error of the transport, once the retries are exhausted
+        '''
+        transport = self._transport()
+        if self.api_key:
+            params['api_key'] = self.api_key
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self._count('entrez_requests')
+            try:
+                handle = getattr(transport, utility)(**params)
+                return transport.read(handle)
+            except Exception as e:
+                if attempt >= self.max_retries or not \
+                    EntrezClient._is_retryable(e):
+                    raise
+            self._count('entrez_retries')
+            self.bucket.sleep(self.backoff * 2**attempt)
+            attempt += 1
+
+    def map(self, function, items):
+        ''' This function applies a function (which typically sends
+            requests via this client) to each item of a list, using a
+            pool of threads, and returns the results in order. '''
+        items = list(items)
+        if self.max_workers == 1 or len(items) < 2:
+            return [function(item) for item in items]
+        from multiprocessing.dummy import Pool
+        pool = Pool(min(self.max_workers, len(items)))
+        try:
+            return pool.map(function, items)
+        finally:
+            pool.close()
+            pool.join()
+
+    def share(self, n):
+        ''' This function returns a client whose rate limit is the
+            <n>th part of the rate limit of this client (e.g., for each
+            of <n> worker processes, which cannot share a TokenBucket).
+        '''
+        return EntrezClient(self.api_key, self.transport, self.max_workers,
+            self.max_retries, self.backoff, TokenBucket(self.bucket.rate /
+            max(1, n), self.bucket.capacity))
+
+#############
+# FUNCTIONS #
+#############
+
+def configure(api_key=None, transport=None, max_workers=4):
+    ''' This function replaces the client shared by all Entrez lookups
+        and returns it. '''
+    global _client
+    _client = EntrezClient(api_key, transport, max_workers)
+    return _client
+
+def set_client(entrez_client):
+    ''' This function sets the client shared by all Entrez lookups. '''
+    global _client
+    _client = entrez_client
+
+def client():
+    ''' This function returns the client shared by all Entrez lookups;
+        a client with default settings is generated upon first use. '''
+    if _client is None:
+        configure()
+    return _client
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+_client = None
+
+########
+# MAIN #
+########
@@ -8,6 +8,7 @@ Custom operations for EMBL submission preparation tool
 #####################
 
 import GlobalVariables as GlobVars
+import IntervalOps as IvOps
 import MyExceptions as ME
 
 ###############
@@ -23,7 +24,7 @@ __version__ = '2017.02.01.2000'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ###########
@@ -38,51 +39,23 @@ class GenerateFeatLoc:
     def __init__(self):
         pass
 
-    @staticmethod
-    def _exact(csrange):
-        ''' An internal static function to generate an exact feature 
-            location. '''
-        from Bio.SeqFeature import ExactPosition, FeatureLocation
-        start_pos = csrange[0]
-        stop_pos = csrange[-1]+1
-        start_exact = ExactPosition(start_pos)
-        stop_exact = ExactPosition(stop_pos)
-        return FeatureLocation(start_exact, stop_exact)
-
-    @staticmethod
-    def _extract_contiguous_subsets(compound_integer_range):
-        ''' An internal static function to extract all contiguous
-            integer ranges from compound integer range.
-        '''
-#        Examples:
-#            Example 1:
-#            >>> compound_integer_range = [1,2,3,7,8,9]
-#            >>> _extract_contiguous_subsets(compound_integer_range)
-#            Out: [[1, 2, 3], [7, 8, 9]]
-
-        from operator import itemgetter
-        from itertools import groupby
-        outlist = []
-        for k, g in groupby(enumerate(compound_integer_range), lambda (i,x):i-x):
-            outlist.append(map(itemgetter(1), g))
-        return outlist
-
     def make_location(self, charset_range):
         ''' This function goes through a decision tree and generates
             fitting feature locations.
         Args:
-            charset_range (list): a list of index positions, example: [1,2,3,8,9 ...]
+            charset_range (IntervalList): an interval list or a list of 
+                                  index positions, example: [1,2,3,8,9 ...]
         Returns:
             FeatureLocation (obj):  A SeqFeature location object; either a
                                     FeatureLocation or a CompoundLocation
         Raises:
             -
         '''
-        contiguous_ranges = GenerateFeatLoc._extract_contiguous_subsets(
-            charset_range)
-        # Convert each contiguous range into an exact feature location
-        for i,r in enumerate(contiguous_ranges):
-            contiguous_ranges[i] = GenerateFeatLoc._exact(r)
+        from Bio.SeqFeature import ExactPosition, FeatureLocation
+        intervals = IvOps.IntervalList.from_indices(charset_range)
+        # Convert each interval into an exact feature location
+        contiguous_ranges = [FeatureLocation(ExactPosition(start),
+            ExactPosition(stop)) for start, stop in intervals.ranges()]
         if len(contiguous_ranges) > 1:
             from Bio.SeqFeature import CompoundLocation
             return CompoundLocation(contiguous_ranges)
@@ -175,7 +148,7 @@ class GenerateSeqFeature:
             [currently nothing]
         '''
         from Bio import SeqFeature
-        full_index = range(0, full_len)
+        full_index = IvOps.IntervalList([(0, full_len)])
         feature_loc = GenerateFeatLoc().make_location(full_index)
         source_feature = SeqFeature.SeqFeature(feature_loc, id='source',
             type='source', qualifiers=quals)
@@ -8,6 +8,8 @@ Custom operations input and output processes
 #####################
 
 import MyExceptions as ME
+import CheckingOps as CkOps
+import IntervalOps as IvOps
 
 ###############
 # AUTHOR INFO #
@@ -22,7 +24,7 @@ __version__ = '2017.01.24.1800'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ###########
@@ -65,17 +67,786 @@ class Inp:
             raise ME.MyException('Parsing of .csv-file unsuccessful.')
         return a_matrix    
 
-    def parse_nexus_file(self, path_to_nex):
-        ''' This function parses a NEXUS file. '''
-        from Bio.Nexus import Nexus
+    def stream_csv_file(self, path_to_csv, label, seq_names=None):
+        ''' This function reads a csv file in a single pass and 
+            returns a CsvStream object, which hands out the qualifiers 
+            of each sequence upon request. '''
+        return CsvStream(path_to_csv, label, seq_names)
+
+    def stream_nexus_file(self, path_to_nex):
+        ''' This function indexes a NEXUS file without parsing the 
+            full alignment into memory. It returns the charsets as 
+            range lists and a NexusStream object, from which the 
+            individual sequences are read upon request. '''
+        nexus_stream = NexusStream(path_to_nex)
+        return (nexus_stream.charsets, nexus_stream)
+
+    def load_nexus_file(self, path_to_nex):
+        ''' This function reads the alignment of a NEXUS file into a 
+            compact AlignmentStore (i.e., one byte per alignment 
+            position). It returns the charsets as range lists and the 
+            AlignmentStore object. '''
+        nexus_stream = NexusStream(path_to_nex)
+        return (nexus_stream.charsets, AlignmentStore(nexus_stream))
+
+
+class NexusStream:
+    ''' This class contains functions to read the DATA (or CHARACTERS) 
+        block and the SETS block of a NEXUS file without holding the 
+        entire alignment in memory. Upon initialization, the file is 
+        read once, line by line; for each taxon, only the byte offsets 
+        of its sequence fragments are recorded. Each sequence is read 
+        from the file when it is requested. Both sequential and 
+        interleaved matrices are supported. As in Bio.Nexus, the 
+        matrix may only contain the IUPAC nucleotide codes of its 
+        datatype as well as the gap and the missing character.
+    Args:
+        path_to_nex (str): path to a NEXUS file
+    Attributes:
+        charsets (dict):   a dictionary with charset names (str) as keys 
+                           and range lists (list) as values; each range 
+                           is a tuple of 0-based start and stop 
+                           positions, with the stop position excluded; 
+                           example: {"gene_1":[(3,12),(16,25)]}
+        taxlabels (list):  the taxon names in the order of the matrix
+    Raises:
+        ME.MyException
+    '''
+
+    def __init__(self, path_to_nex):
+        self.path_to_nex = path_to_nex
+        self.ntax = None
+        self.nchar = None
+        self.interleave = False
+        self.datatype = 'dna'
+        self.gap = '-'
+        self.missing = '?'
+        self.respectcase = False
+        self.valid_characters = None
+        self.charsets = {}
+        self.taxlabels = []
+        self.fragments = {}
         try:
-            aln = Nexus.Nexus()
-            aln.read(path_to_nex)
-            charsets = aln.charsets
-            matrix = aln.matrix
-        except:
-            raise ME.MyException('Parsing of .nex-file unsuccessful.')
-        return (charsets, matrix)
+            self._index()
+        except (IOError, ValueError) as e:
+            raise ME.MyException('Parsing of .nex-file unsuccessful: %s' 
+                % (e))
+
+    @staticmethod
+    def _quotestrip(word):
+        ''' An internal static function to remove quotes around 
+            identifiers. '''
+        while len(word) > 1 and word[0] == word[-1] and word[0] in '\'"':
+            word = word[1:-1]
+        return word
+
+    def _parse_charset(self, statement):
+        ''' An internal function to parse a CHARSET statement (without 
+            the leading keyword) into a charset name and a range list. '''
+        import re
+        try:
+            name, spec = statement.split('=', 1)
+        except ValueError:
+            raise ME.MyException('Formatting error in charset '\
+                'definition: `%s`' % (statement))
+        name = name.strip().lstrip('*').strip()
+        if '(' in name:
+            name, qualifier = name.split('(', 1)
+            if qualifier.strip(' )').lower() != 'standard':
+                raise ME.MyException('Unsupported format of charset '\
+                    '`%s`' % (name.strip()))
+        name = NexusStream._quotestrip(name.strip())
+        tokens = re.findall(r"'[^']*'|\"[^\"]*\"|[-\\]|[^\s\-\\]+", 
+            spec)
+        ranges = []
+        i = 0
+        while i < len(tokens):
+            start = self._resolve_position(tokens[i])
+            if isinstance(start, list):
+                ranges.extend(start)
+                i += 1
+                continue
+            stop, step = start, 1
+            if i+2 < len(tokens) and tokens[i+1] == '-':
+                stop = self._resolve_position(tokens[i+2])
+                i += 2
+                if i+2 < len(tokens) and tokens[i+1] == '\\':
+                    step = int(tokens[i+2])
+                    i += 2
+            if step == 1:
+                ranges.append((start, stop+1))
+            else:
+                ranges.extend((p, p+1) for p in xrange(start, stop+1, step))
+            i += 1
+        # Note: The ranges are sorted and merged via class IntervalList
+        return name, IvOps.IntervalList(ranges).ranges()
+
+    def _resolve_position(self, token):
+        ''' An internal function to translate an element of a charset 
+            definition into a 0-based position or, if it is the name of 
+            a previously defined charset, into its range list. '''
+        token = NexusStream._quotestrip(token)
+        if token == '.':
+            return self.nchar - 1
+        try:
+            pos = int(token)
+        except ValueError:
+            if token in self.charsets:
+                return list(self.charsets[token])
+            raise ME.MyException('Unknown character identifier in '\
+                'charset definition: `%s`' % (token))
+        if pos < 1 or (self.nchar and pos > self.nchar):
+            raise ME.MyException('Character position `%s` of charset '\
+                'definition is out of range' % (token))
+        return pos - 1
+
+    def _add_fragment(self, taxon, offset, text):
+        ''' An internal function to record the byte offset and length of 
+            a sequence fragment of a taxon. '''
+        chars = NexusStream._clean(text)
+        illegal = chars.translate(None, self.valid_characters)
+        if illegal:
+            raise ME.MyException('Taxon %s: Illegal character %s in '\
+                'sequence (check dimensions/interleaving)' % (taxon, 
+                illegal[0]))
+        self.fragments[taxon][0].append((offset, len(text)))
+        self.fragments[taxon][1] += len(chars)
+
+    @staticmethod
+    def _clean(text):
+        ''' An internal static function to remove whitespace and 
+            comments from a sequence fragment. '''
+        import re
+        if '[' in text:
+            text = re.sub(r'\[[^\]]*\]', '', text)
+        return ''.join(text.split())
+
+    def _index(self):
+        ''' An internal function to read the NEXUS file once and to index 
+            its matrix and charsets. '''
+        import re
+        word_re = re.compile(r"\s*('[^']*'|\"[^\"]*\"|\S+)")
+        block = None
+        statement = ''
+        in_matrix = False
+        in_comment = False
+        current = None
+        offset = 0
+        with open(self.path_to_nex, 'rb') as nex_handle:
+            for line in nex_handle:
+                line_offset = offset
+                offset += len(line)
+                if in_matrix:
+                    body = line
+                    end = body.find(';')
+                    if end > -1:
+                        body = body[:end]
+                    if NexusStream._clean(body):
+                        if current is not None:
+                            # Continuation of the sequence of a taxon
+                            self._add_fragment(current, line_offset, body)
+                            rest = body
+                        else:
+                            match = word_re.match(body)
+                            taxon = NexusStream._quotestrip(match.group(1))
+                            rest = body[match.end():]
+                            if taxon not in self.fragments:
+                                if len(self.taxlabels) == self.ntax:
+                                    raise ME.MyException('Too many taxa '\
+                                        'in matrix, or taxon `%s` not in '\
+                                        'first block of interleaved '\
+                                        'matrix.' % (taxon))
+                                self.taxlabels.append(taxon)
+                                self.fragments[taxon] = [[], 0]
+                            elif not self.interleave:
+                                raise ME.MyException('Taxon `%s` occurs '\
+                                    'more than once in matrix.' % (taxon))
+                            self._add_fragment(taxon, line_offset + 
+                                match.end(), rest)
+                            current = taxon
+                        # In an interleaved matrix, the sequence fragment 
+                        # may follow on the line after the taxon name; in 
+                        # a sequential matrix, the sequence may span 
+                        # several lines.
+                        if self.interleave:
+                            if NexusStream._clean(rest):
+                                current = None
+                        elif self.fragments[current][1] >= self.nchar:
+                            current = None
+                    if end > -1:
+                        in_matrix = False
+                    continue
+                # Outside of the matrix, strip comments (which may span 
+                # several lines) and collect statements until a semicolon
+                if line.lstrip().lower().startswith('#nexus'):
+                    continue
+                text = ''
+                for char in line:
+                    if in_comment:
+                        if char == ']':
+                            in_comment = False
+                    elif char == '[':
+                        in_comment = True
+                    else:
+                        text += char
+                statement += text
+                while ';' in statement:
+                    command, statement = statement.split(';', 1)
+                    words = command.split(None, 1)
+                    if not words:
+                        continue
+                    keyword = words[0].lower()
+                    args = words[1] if len(words) > 1 else ''
+                    if keyword == 'begin':
+                        block = args.strip().lower()
+                    elif keyword in ['end', 'endblock']:
+                        block = None
+                    elif block in ['data', 'characters', 'taxa']:
+                        if keyword == 'dimensions':
+                            self._parse_dimensions(args)
+                        elif keyword == 'format':
+                            self._parse_format(args)
+                    elif block == 'sets' and keyword == 'charset':
+                        name, ranges = self._parse_charset(args)
+                        self.charsets[name] = ranges
+                # The matrix is not terminated by a semicolon on the same 
+                # line, hence it is detected separately
+                if block in ['data', 'characters'] and \
+                    statement.strip().lower().startswith('matrix'):
+                    if not self.ntax or not self.nchar:
+                        raise ME.MyException('Dimensions must be '\
+                            'specified before matrix.')
+                    self._set_valid_characters()
+                    in_matrix = True
+                    statement = ''
+        self._check_matrix()
+
+    def _parse_dimensions(self, args):
+        ''' An internal function to parse the DIMENSIONS statement. '''
+        import re
+        for key, value in re.findall(r'(\w+)\s*=\s*(\d+)', args):
+            if key.lower() == 'ntax':
+                self.ntax = int(value)
+            elif key.lower() == 'nchar':
+                self.nchar = int(value)
+
+    def _parse_format(self, args):
+        ''' An internal function to parse the FORMAT statement. '''
+        import re
+        for key, value in re.findall(r'(\w+)\s*(?:=\s*(\S+))?', args):
+            key = key.lower()
+            if key == 'interleave':
+                self.interleave = value.lower() in ['', 'yes', 'true']
+            elif key == 'datatype':
+                if value.lower() not in ['dna', 'rna', 'nucleotide']:
+                    raise ME.MyException('Unsupported datatype `%s`' % 
+                        (value.lower()))
+                self.datatype = value.lower()
+            elif key == 'gap' and value:
+                self.gap = NexusStream._quotestrip(value)[0]
+            elif key == 'missing' and value:
+                self.missing = NexusStream._quotestrip(value)[0]
+            elif key == 'respectcase':
+                self.respectcase = True
+            elif key in ['matchchar', 'equate', 'transpose']:
+                raise ME.MyException('Unsupported format option `%s`' % 
+                    (key))
+
+    def _set_valid_characters(self):
+        ''' An internal function to compile the characters permitted in 
+            the matrix, which are (as in Bio.Nexus) the IUPAC nucleotide 
+            codes of the datatype, the gap and the missing character. '''
+        from Bio.Data import IUPACData
+        if self.datatype == 'rna':
+            letters = ''.join(IUPACData.ambiguous_rna_values) + \
+                IUPACData.unambiguous_rna_letters
+        else:
+            letters = ''.join(IUPACData.ambiguous_dna_values) + \
+                IUPACData.unambiguous_dna_letters
+        if not self.respectcase:
+            letters = letters.lower() + letters.upper()
+        self.valid_characters = letters + self.gap + self.missing
+
+    def _check_matrix(self):
+        ''' An internal function to confirm that the matrix contains 
+            the declared number of taxa and characters. '''
+        if not self.taxlabels:
+            raise ME.MyException('No matrix found in .nex-file.')
+        if len(self.taxlabels) != self.ntax:
+            raise ME.MyException('Number of taxa in matrix (%d) does not '\
+                'match NTAX (%d).' % (len(self.taxlabels), self.ntax))
+        for taxon in self.taxlabels:
+            if self.fragments[taxon][1] != self.nchar:
+                raise ME.MyException('Sequence length of taxon `%s` (%d) '\
+                    'does not match NCHAR (%d).' % (taxon, 
+                    self.fragments[taxon][1], self.nchar))
+
+    def _read(self, nex_handle, taxon):
+        ''' An internal function to read the sequence of a taxon from an 
+            open file handle. '''
+        chunks = []
+        for offset, length in self.fragments[taxon][0]:
+            nex_handle.seek(offset)
+            chunks.append(NexusStream._clean(nex_handle.read(length)))
+        return ''.join(chunks)
+
+    def __getitem__(self, taxon):
+        ''' This function reads the sequence of a taxon from the file 
+            and returns it as a Seq object. '''
+        from Bio.Seq import Seq
+        from Bio.Alphabet import IUPAC
+        if taxon not in self.fragments:
+            raise KeyError(taxon)
+        with open(self.path_to_nex, 'rb') as nex_handle:
+            seq = self._read(nex_handle, taxon)
+        return Seq(seq, IUPAC.IUPACAmbiguousDNA())
+
+    def __contains__(self, taxon):
+        return taxon in self.fragments
+
+    def __len__(self):
+        return len(self.taxlabels)
+
+    def keys(self):
+        ''' This function returns the taxon names in the order of the 
+            matrix. '''
+        return list(self.taxlabels)
+
+    def iter_sequences(self):
+        ''' This function yields the taxon names and sequences (as Seq 
+            objects) one at a time, in the order of the matrix; the file 
+            is opened only once. '''
+        from Bio.Seq import Seq
+        from Bio.Alphabet import IUPAC
+        with open(self.path_to_nex, 'rb') as nex_handle:
+            for taxon in self.taxlabels:
+                yield taxon, Seq(self._read(nex_handle, taxon), 
+                    IUPAC.IUPACAmbiguousDNA())
+
+
+class AlignmentStore:
+    ''' This class holds an alignment in a single byte array, in which 
+        the sequences are stored one after the other with one byte per 
+        alignment position; its memory footprint is thus close to the 
+        size of the matrix in the NEXUS file. The array is filled in a 
+        single, sequential pass over the file. Rows are handed out as 
+        views into the array, without copying; the array is never 
+        modified after its generation, so that it can be shared by 
+        worker processes. The interface corresponds to that of class 
+        `NexusStream`.
+    Args:
+        nexus_stream (obj): a NexusStream object
+    '''
+
+    def __init__(self, nexus_stream):
+        self.nchar = nexus_stream.nchar
+        self.taxlabels = list(nexus_stream.taxlabels)
+        self.rows = dict((taxon, i) for i, taxon in 
+            enumerate(self.taxlabels))
+        self.data = bytearray(self.nchar * len(self.taxlabels))
+        # TFL reads all sequence fragments in the order of their position 
+        # in the file, irrespective of whether the matrix is interleaved
+        fragments = []
+        for taxon in self.taxlabels:
+            for offset, length in nexus_stream.fragments[taxon][0]:
+                fragments.append((offset, length, taxon))
+        fragments.sort()
+        row_fill = dict((taxon, self.rows[taxon] * self.nchar) for taxon 
+            in self.taxlabels)
+        with open(nexus_stream.path_to_nex, 'rb') as nex_handle:
+            for offset, length, taxon in fragments:
+                nex_handle.seek(offset)
+                text = NexusStream._clean(nex_handle.read(length))
+                self.data[row_fill[taxon]:row_fill[taxon]+len(text)] = text
+                row_fill[taxon] += len(text)
+
+    def row(self, taxon):
+        ''' This function returns the sequence of a taxon as a view into 
+            the byte array (i.e., without copying it). '''
+        if taxon not in self.rows:
+            raise KeyError(taxon)
+        row_pos = self.rows[taxon] * self.nchar
+        return memoryview(self.data)[row_pos:row_pos+self.nchar]
+
+    def __getitem__(self, taxon):
+        ''' This function returns the sequence of a taxon as a Seq 
+            object. '''
+        from Bio.Seq import Seq
+        from Bio.Alphabet import IUPAC
+        return Seq(self.row(taxon).tobytes(), IUPAC.IUPACAmbiguousDNA())
+
+    def __contains__(self, taxon):
+        return taxon in self.rows
+
+    def __len__(self):
+        return len(self.taxlabels)
+
+    def keys(self):
+        ''' This function returns the taxon names in the order of the 
+            matrix. '''
+        return list(self.taxlabels)
+
+    def iter_sequences(self):
+        ''' This function yields the taxon names and sequences (as Seq 
+            objects) one at a time, in the order of the matrix. '''
+        for taxon in self.taxlabels:
+            yield taxon, self[taxon]
+
+
+class CsvStream:
+    ''' This class reads the qualifiers of a csv file in a single pass, 
+        row by row, without generating a dictionary for each row. The 
+        column labels are checked once (via class `QualifierCheck`) and 
+        shared by all rows; each row is stored as a tuple of its values 
+        and indexed by its sequence name. Only the rows of the requested 
+        sequences are stored. Empty qualifiers are removed and 
+        qualifier values converted to ASCII characters only when the 
+        qualifiers of a sequence are requested.
+    Args:
+        path_to_csv (str): path to a csv file
+        label (str):       the name of the column that specifies the 
+                           sequence names; example: "isolate"
+        seq_names (list):  the names of the sequences whose rows are 
+                           stored; if None, all rows are stored
+    Raises:
+        ME.MyException
+    '''
+
+    def __init__(self, path_to_csv, label, seq_names=None):
+        import csv
+        self.label = label
+        self.header = ()
+        self.rows = {}
+        try:
+            self._index(path_to_csv, seq_names)
+        except (IOError, csv.Error) as e:
+            raise ME.MyException('Parsing of .csv-file unsuccessful: %s' 
+                % (e))
+
+    def _index(self, path_to_csv, seq_names):
+        ''' An internal function to read the csv file and to index its 
+            rows by sequence name; each sequence name must occur exactly 
+            once. '''
+        import csv
+        wanted = set(seq_names) if seq_names is not None else None
+        seen = set()
+        duplicates = []
+        with open(path_to_csv, 'rb') as csv_handle:
+            reader = csv.reader(csv_handle, delimiter=',', quotechar='"', 
+                skipinitialspace=True)
+            header = tuple(next(reader, []))
+            CkOps.QualifierCheck._valid_header(header, self.label)
+            label_pos = header.index(self.label)
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) > len(header):
+                    raise ME.MyException('csv-file contains a row with '\
+                        'more entries than column labels: `%s`' % 
+                        (', '.join(row)))
+                row.extend([''] * (len(header) - len(row)))
+                if row[label_pos] == '':
+                    raise ME.MyException('csv-file contains a row without '\
+                        'entry in column `%s`' % (self.label))
+                seq_name = CkOps.QualifierCheck._to_ASCII(row[label_pos])
+                if seq_name in seen:
+                    duplicates.append(seq_name)
+                    continue
+                seen.add(seq_name)
+                if wanted is None or seq_name in wanted:
+                    self.rows[seq_name] = tuple(row)
+        if duplicates:
+            raise ME.MyException('The following sequence names occur '\
+                'more than once in column `%s` of the csv-file: `%s`' % 
+                (self.label, ', '.join(sorted(set(duplicates)))))
+        self.header = header
+
+    def __getitem__(self, seq_name):
+        ''' This function returns the non-empty qualifiers of a 
+            sequence, converted to ASCII characters, as a new 
+            dictionary. '''
+        return dict((k, CkOps.QualifierCheck._to_ASCII(v)) for k, v in 
+            zip(self.header, self.rows[seq_name]) if v != '')
+
+    def __contains__(self, seq_name):
+        return seq_name in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def keys(self):
+        ''' This function returns the names of the stored 
+            sequences. '''
+        return self.rows.keys()
+
+
+class EmblWriter:
+    ''' This class writes seqRecords in EMBL format directly to an 
+        output handle. It covers the record shapes generated by 
+        annonex2embl (i.e., DNA sequences with exact or fuzzy feature 
+        locations and without references, comments or keywords), and 
+        its output is byte-identical to that of the EMBL writer of 
+        Biopython (Bio.SeqIO). Upon request, the ID and AC lines are 
+        masked as requested by ENA for submissions.
+    Args:
+        outp_handle (obj):  an output handle
+        linemask (bool):    a logical; shall the ID and AC lines be 
+                            masked?
+    Raises:
+        ME.MyException
+    '''
+
+    max_width = 80
+    qual_indent = 'FT                   '
+    no_quote_quals = ('anticodon', 'citation', 'codon_start', 'compare',
+        'direction', 'estimated_length', 'mod_base', 'number', 'rpt_type', 
+        'rpt_unit_range', 'tag_peptide', 'transl_except', 'transl_table')
+    embl_divisions = ('PHG', 'ENV', 'FUN', 'HUM', 'INV', 'MAM', 'VRT', 'MUS',
+        'PLN', 'PRO', 'ROD', 'SYN', 'TGN', 'UNC', 'VRL', 'XXX')
+
+    def __init__(self, outp_handle, linemask=False):
+        self.outp_handle = outp_handle
+        self.linemask = linemask
+
+    @staticmethod
+    def is_supported(seq_record):
+        ''' This function evaluates if a seqRecord is of a shape covered 
+            by this class. '''
+        from Bio import Alphabet, SeqFeature
+        from Bio.Seq import Seq, UnknownSeq
+        supported_pos = (SeqFeature.ExactPosition, 
+            SeqFeature.BeforePosition, SeqFeature.AfterPosition)
+        if not isinstance(seq_record.seq, Seq) or \
+            isinstance(seq_record.seq, UnknownSeq):
+            return False
+        base_alphabet = seq_record.seq.alphabet
+        while isinstance(base_alphabet, Alphabet.AlphabetEncoder):
+            base_alphabet = base_alphabet.alphabet
+        if not isinstance(base_alphabet, Alphabet.DNAAlphabet):
+            return False
+        if seq_record.dbxrefs or any([key in seq_record.annotations for key 
+            in ['accession', 'keywords', 'references', 'comment']]):
+            return False
+        for feature in seq_record.features:
+            if feature.location is None:
+                return False
+            if not feature.type or feature.ref or feature.location.ref \
+                or feature.location.ref_db:
+                return False
+            for part in feature.location.parts:
+                if not isinstance(part.start, supported_pos) or not \
+                    isinstance(part.end, supported_pos) or part.ref or \
+                    part.ref_db:
+                    return False
+        return True
+
+    @staticmethod
+    def _split_multi_line(text, max_len):
+        ''' An internal static function to split a text into lines of 
+            at most <max_len> characters at whitespace. '''
+        text = text.strip()
+        if len(text) <= max_len:
+            return [text]
+        lines = []
+        line = ''
+        for word in text.split():
+            if line and len(line) + 1 + len(word) > max_len:
+                lines.append(line)
+                line = word
+            elif not lines and not line:
+                # Note: A first word that is too long is not glued to a 
+                #       line of its own, but opens the next line
+                if len(word) + 1 > max_len:
+                    lines.append('')
+                line = word
+            else:
+                line = (line + ' ' + word) if line else word
+        lines.append(line)
+        return lines
+
+    @staticmethod
+    def _pos_str(pos, offset=0):
+        ''' An internal static function to generate the string of a 
+            feature position. '''
+        from Bio import SeqFeature
+        if isinstance(pos, SeqFeature.BeforePosition):
+            return '<%i' % (pos.position + offset)
+        if isinstance(pos, SeqFeature.AfterPosition):
+            return '>%i' % (pos.position + offset)
+        return '%i' % (pos.position + offset)
+
+    @staticmethod
+    def _part_str(part, rec_length):
+        ''' An internal static function to generate the location string 
+            of a simple feature location (without strand). '''
+        from Bio import SeqFeature
+        start, end = part.start, part.end
+        if isinstance(start, SeqFeature.ExactPosition) and \
+            isinstance(end, SeqFeature.ExactPosition):
+            if start.position == end.position:
+                if end.position == rec_length:
+                    return '%i^1' % (rec_length)
+                return '%i^%i' % (end.position, end.position + 1)
+            if start.position + 1 == end.position:
+                return '%i' % (end.position)
+        return EmblWriter._pos_str(start, 1) + '..' + \
+            EmblWriter._pos_str(end)
+
+    @staticmethod
+    def _location_str(location, rec_length):
+        ''' An internal static function to generate the location string 
+            of a (compound) feature location. '''
+        if hasattr(location, 'operator'):
+            if location.strand == -1:
+                return 'complement(%s(%s))' % (location.operator, 
+                    ','.join([EmblWriter._part_str(p, rec_length) for p in 
+                    location.parts[::-1]]))
+            return '%s(%s)' % (location.operator, ','.join([EmblWriter.\
+                _location_str(p, rec_length) for p in location.parts]))
+        loc_str = EmblWriter._part_str(location, rec_length)
+        if location.strand == -1:
+            return 'complement(%s)' % (loc_str)
+        return loc_str
+
+    def _wrap_location(self, loc_str):
+        ''' An internal function to wrap a location string at commas. '''
+        max_len = self.max_width - len(self.qual_indent)
+        lines = []
+        while len(loc_str) > max_len:
+            index = loc_str[:max_len].rfind(',')
+            if index == -1:
+                break
+            lines.append(loc_str[:index+1])
+            loc_str = loc_str[index+1:]
+        lines.append(loc_str)
+        return ('\n' + self.qual_indent).join(lines)
+
+    def _write_qualifier(self, key, value):
+        ''' An internal function to write a feature qualifier, wrapped at
+            whitespace where possible. '''
+        write = self.outp_handle.write
+        indent = self.qual_indent
+        if value is None:
+            write('%s/%s\n' % (indent, key))
+            return
+        if isinstance(value, (int, long)) or key in self.no_quote_quals:
+            line = '%s/%s=%s' % (indent, key, value)
+        else:
+            line = '%s/%s="%s"' % (indent, key, value)
+        max_width = self.max_width
+        while len(line) > max_width:
+            # Insert a line break at the last whitespace that fits
+            index = line.rfind(' ', len(indent) + 2, max_width + 1)
+            if index == -1:
+                index = max_width
+            write(line[:index] + '\n')
+            line = indent + line[index:].lstrip()
+        write(line + '\n')
+
+    def _write_feature(self, feature, rec_length):
+        ''' An internal function to write a feature and its 
+            qualifiers. '''
+        loc_str = EmblWriter._location_str(feature.location, rec_length)
+        f_type = feature.type.replace(' ', '_')
+        self.outp_handle.write(('FT   %s                ' % (f_type))[:21] + 
+            self._wrap_location(loc_str) + '\n')
+        for key in sorted(feature.qualifiers.keys()):
+            values = feature.qualifiers[key]
+            if isinstance(values, (list, tuple)):
+                for value in values:
+                    self._write_qualifier(key, value)
+            else:
+                self._write_qualifier(key, values)
+
+    def _write_sequence(self, seq_str):
+        ''' An internal function to write the sequence block in lines of
+            60 nucleotides. '''
+        write = self.outp_handle.write
+        data = seq_str.lower()
+        seq_len = len(data)
+        a_count = data.count('a')
+        c_count = data.count('c')
+        g_count = data.count('g')
+        t_count = data.count('t')
+        write('SQ   Sequence %i BP; %i A; %i C; %i G; %i T; %i other;\n' % (
+            seq_len, a_count, c_count, g_count, t_count, 
+            seq_len - (a_count + c_count + g_count + t_count)))
+        full_len = seq_len - seq_len % 60
+        for i in xrange(0, full_len, 60):
+            write('     %s %s %s %s %s %s%10i\n' % (data[i:i+10], 
+                data[i+10:i+20], data[i+20:i+30], data[i+30:i+40], 
+                data[i+40:i+50], data[i+50:i+60], i+60))
+        if full_len < seq_len:
+            write('    ' + ''.join([(' ' + data[i:i+10]).ljust(11) for i 
+                in xrange(full_len, full_len+60, 10)]) + 
+                str(seq_len).rjust(10) + '\n')
+
+    def write_record(self, seq_record):
+        ''' This function writes a single seqRecord.
+        Args:
+            seq_record (obj):   a seqRecord object
+        Returns:
+            currently nothing
+        Raises:
+            ME.MyException
+        '''
+        write = self.outp_handle.write
+        seq_str = str(seq_record.seq)
+        rec_length = len(seq_str)
+        # 1. ID and AC lines
+        record_id = seq_record.id
+        if '.' in record_id and record_id.rsplit('.', 1)[1].isdigit():
+            accession, version = record_id.rsplit('.', 1)
+            version = 'SV ' + version
+        else:
+            accession, version = record_id, ''
+        if ';' in accession or ' ' in accession:
+            raise ME.MyException('Problem with `%s`: The accession must '\
+                'not contain semicolons or spaces.' % (record_id))
+        topology = str(seq_record.annotations.get('topology', ''))
+        division = seq_record.annotations.get('data_file_division', 'UNC')
+        if division not in self.embl_divisions:
+            division = {'BCT': 'PRO'}.get(division, 'UNC')
+        ID_line = 'ID   %s; %s; %s; DNA; ; %s; %i BP.' % (accession, 
+            version, topology, division, rec_length)
+        if self.linemask:
+            # Note: Masked records are preceded by a line break and lack
+            #       the final line break (see Outp.write_EntryUpload).
+            ID_line_parts = ID_line.split('; ')
+            if len(ID_line_parts) == 7:
+                ID_line_parts = ['XXX' if ID_line_parts.index(p) in \
+                    [0,1,3,4,5,6] else p for p in ID_line_parts]
+            write('\nID   ' + '; '.join(ID_line_parts) + '\nXX\n'\
+                'AC   XXX;\nXX\n')
+        else:
+            write(ID_line + '\nXX\nAC   ' + accession + ';\nXX\n')
+        # 2. DE, OS and OC lines
+        descr = seq_record.description
+        if descr == '<unknown description>':
+            descr = '.'
+        for line in EmblWriter._split_multi_line(descr, self.max_width-5):
+            write('DE   ' + line + '\n')
+        write('XX\n')
+        organism = seq_record.annotations.get('organism', '.')
+        if isinstance(organism, list):
+            organism = organism[0]
+        for line in EmblWriter._split_multi_line(str(organism), 
+            self.max_width-5):
+            write('OS   ' + line + '\n')
+        taxonomy = '; '.join(seq_record.annotations['taxonomy']) + '.' \
+            if 'taxonomy' in seq_record.annotations else '.'
+        for line in EmblWriter._split_multi_line(taxonomy, 
+            self.max_width-5):
+            write('OC   ' + line + '\n')
+        write('XX\n')
+        # 3. Feature table
+        write('FH   Key             Location/Qualifiers\n')
+        for feature in seq_record.features:
+            self._write_feature(feature, rec_length)
+        write('XX\n')
+        # 4. Sequence
+        self._write_sequence(seq_str)
+        write('//' if self.linemask else '//\n')
 
 
 class Outp:
@@ -104,6 +875,12 @@ class Outp:
         Raises:
             -
         '''
+        # Records of the shape generated by annonex2embl are written 
+        # directly; all other records are written via Bio.SeqIO
+        if EmblWriter.is_supported(seq_record):
+            EmblWriter(outp_handle, eusubm_bool).write_record(seq_record)
+            return
+
         from StringIO import StringIO
         from Bio import SeqIO
 
@@ -112,7 +889,8 @@ class Outp:
             SeqIO.write(seq_record, temp_handle, 'embl')
         except:
             raise ME.MyException('%s annonex2embl ERROR: Problem with \
-            `%s`. Did not write to internal handle.' % ('\n', seq_name))
+            `%s`. Did not write to internal handle.' % ('\n', 
+            seq_record.id))
         
         if eusubm_bool:
             temp_handle_lines = temp_handle.getvalue().splitlines()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+'''
+Class for a compact representation of charsets as lists of intervals
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+from array import array
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.05.1000'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class IntervalList(object):
+    ''' This class represents a charset as a sorted list of
+        non-overlapping, non-adjacent intervals. Each interval is
+        stored as a 0-based start position and a stop position (the
+        latter excluded) in two integer arrays. Objects of this class
+        are not modified after their generation; all operations return
+        a new object. Iterating over an object yields the individual
+        nucleotide positions, and objects compare equal to lists of
+        these positions.
+    Args:
+        ranges (list): a list of tuples of start and stop positions;
+                       example: [(0,3), (7,9)] (i.e., positions
+                       [0,1,2,7,8]); the tuples are sorted and merged,
+                       where necessary
+    '''
+
+    __slots__ = ('starts', 'stops')
+
+    def __init__(self, ranges=()):
+        self.starts = array('l')
+        self.stops = array('l')
+        for start, stop in sorted(ranges):
+            if start >= stop:
+                continue
+            if self.stops and start <= self.stops[-1]:
+                if stop > self.stops[-1]:
+                    self.stops[-1] = stop
+            else:
+                self.starts.append(start)
+                self.stops.append(stop)
+
+    @classmethod
+    def from_indices(cls, indices):
+        ''' This function generates an IntervalList from a list of
+            nucleotide positions. '''
+#        Examples:
+#            Example 1:
+#            >>> IntervalList.from_indices([1,2,3,7,8,9]).ranges()
+#            Out: [(1, 4), (7, 10)]
+
+        if isinstance(indices, cls):
+            return indices
+        ranges = []
+        start = stop = None
+        for i in sorted(indices):
+            if start is not None and i <= stop:
+                stop = max(stop, i+1)
+                continue
+            if start is not None:
+                ranges.append((start, stop))
+            start, stop = i, i+1
+        if start is not None:
+            ranges.append((start, stop))
+        return cls(ranges)
+
+    def ranges(self):
+        ''' This function returns the intervals as a list of tuples of
+            start and stop positions. '''
+        return zip(self.starts, self.stops)
+
+    def shift(self, offset):
+        ''' This function shifts all intervals by <offset> positions. '''
+        return IntervalList((start+offset, stop+offset) for start, stop
+            in zip(self.starts, self.stops))
+
+    def clip(self, lower, upper):
+        ''' This function removes all positions smaller than <lower>
+            and all positions equal to or larger than <upper>. '''
+        return IntervalList((max(start, lower), min(stop, upper)) for
+            start, stop in zip(self.starts, self.stops))
+
+    def head(self, n):
+        ''' This function retains only the first <n> positions. '''
+        ranges = []
+        for start, stop in zip(self.starts, self.stops):
+            if n <= 0:
+                break
+            ranges.append((start, min(stop, start+n)))
+            n -= stop-start
+        return IntervalList(ranges)
+
+    def remap(self, cum_map):
+        ''' This function translates all intervals through a cumulative
+            position map, where cum_map[i] is the number of positions
+            that are retained before position i (see
+            DegappingOps.DegapButMaintainAnno._offset_map). Positions
+            that are not retained are removed. '''
+        return IntervalList((cum_map[start], cum_map[stop]) for start,
+            stop in zip(self.starts, self.stops))
+
+    def extract(self, seq):
+        ''' This function concatenates the subsequences of <seq> that
+            are covered by the intervals. '''
+        return ''.join(str(seq[start:stop]) for start, stop in
+            zip(self.starts, self.stops))
+
+    def __iter__(self):
+        for start, stop in zip(self.starts, self.stops):
+            for i in xrange(start, stop):
+                yield i
+
+    def __len__(self):
+        return sum(stop-start for start, stop in zip(self.starts,
+            self.stops))
+
+    def __nonzero__(self):
+        return len(self.starts) > 0
+
+    def __eq__(self, other):
+        if isinstance(other, IntervalList):
+            return self.starts == other.starts and self.stops == other.stops
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (IntervalList, (self.ranges(),))
+
+    def __repr__(self):
+        return 'IntervalList(%s)' % (self.ranges())
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
@@ -8,6 +8,7 @@ Classes to parse charset names
 #####################
 
 import GlobalVariables as GlobVars
+import EntrezOps as EnOps
 import MyExceptions as ME
 
 import sys
@@ -25,7 +26,7 @@ __version__ = '2017.02.02.1100'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ###########
@@ -34,10 +35,28 @@ import pdb
 
 class GetEntrezInfo:
     ''' This class contains functions to obtain gene information from gene
-    symbols. '''
+    symbols. 
+    Args:
+        email_addr (str):   your email address; example: 
+                            "m.gruenstaeudl@fu-berlin.de"
+        entrez_cache (obj): an optional EntrezCache object; if given, 
+                            gene products are looked up in and stored 
+                            to this cache
+        taxdump_index (obj):an optional TaxdumpIndex object; if given, 
+                            taxon names are checked against this local 
+                            copy of NCBI Taxonomy instead of Entrez
+    '''
 
-    def __init__(self, email_addr):
+    # In-process memos of the Entrez hit counts of taxon names and of the 
+    # gene products of gene symbols; shared by all instances of the class 
+    # (e.g., across the jobs of a batch run)
+    _taxon_memo = {}
+    _gene_product_memo = {}
+
+    def __init__(self, email_addr, entrez_cache=None, taxdump_index=None):
         self.email_addr = email_addr
+        self.entrez_cache = entrez_cache
+        self.taxdump_index = taxdump_index
 
     @staticmethod
     def _id_lookup(gene_sym, retmax=10):
@@ -58,7 +77,6 @@ class GetEntrezInfo:
 #                >>> _id_lookup(gene_sym)
 #                Out: ['26835430', '26833718', '26833393', ...]
 
-        from Bio import Entrez
         if not gene_sym:
             raise ME.MyException('No gene symbol detected.')
         if '_' in gene_sym:
@@ -66,12 +84,11 @@ class GetEntrezInfo:
                 'underscore, which is not allowed.' % (gene_sym))
         query_term = gene_sym + ' [sym]'
         try:
-            esearch_records = Entrez.esearch(db='gene', term=query_term,
-                retmax = retmax, retmod='xml')
+            parsed_records = EnOps.client().request('esearch', db='gene',
+                term=query_term, retmax = retmax, retmod='xml')
         except:
             raise ME.MyException('An error occurred while retrieving '\
                 'data from %s.' % ('ESearch'))
-        parsed_records = Entrez.read(esearch_records)
         entrez_id_list = parsed_records['IdList']
         return entrez_id_list
 
@@ -94,22 +111,21 @@ class GetEntrezInfo:
 #                >>> _record_lookup(entrez_id_list)
 #                Out: ???
 
-        from Bio import Entrez
-        epost_query = Entrez.epost('gene', id=','.join(entrez_id_list))
         try:
-            epost_results = Entrez.read(epost_query)
+            epost_results = EnOps.client().request('epost', db='gene',
+                id=','.join(entrez_id_list))
         except:
             raise ME.MyException('An error occurred while retrieving data from '\
                 '%s.' % ('EPost'))
         webenv = epost_results['WebEnv']
         query_key = epost_results['QueryKey']
         try:
-            esummary_records = Entrez.esummary(db='gene', webenv=webenv,
-                query_key=query_key)
+            entrez_rec_list = EnOps.client().request('esummary', db='gene',
+                webenv=webenv, query_key=query_key, 
+                retmax=len(entrez_id_list))
         except:
             raise ME.MyException('An error occurred while retrieving data from '\
                 '%s.' % ('ESummary'))
-        entrez_rec_list = Entrez.read(esummary_records)
         return entrez_rec_list
 
     @staticmethod
@@ -143,6 +159,76 @@ class GetEntrezInfo:
         gene_product = Counter(list_gene_product).most_common()[0][0]
         return gene_product
 
+    @staticmethod
+    def _id_lookup_batch(gene_syms, retmax=10):
+        ''' An internal static function to convert each gene symbol of a 
+            list to Entrez IDs via ESearch. Each gene symbol is looked up 
+            individually (as by function `_id_lookup`), so that its hits 
+            and their ranking do not depend on the other gene symbols; 
+            the lookups are conducted concurrently.
+        Args:
+            gene_syms (list): a list of gene symbols; example: ['psbI', 
+                              'matK']
+            retmax (int):     the number of maximally retained hits per 
+                              gene symbol
+        Returns:
+            entrez_ids (dict): a dictionary with gene symbols as keys and 
+                               lists of Entrez IDs as values; example: 
+                               {'psbI': ['26835430', ...], ...}
+        Raises:
+            ME.MyException
+        '''
+
+#        Examples:
+#            Example 1: # Default behaviour
+#                >>> gene_syms = ['psbI', 'matK']
+#                >>> _id_lookup_batch(gene_syms)
+#                Out: {'psbI': ['26835430', '26833718', ...], ...}
+
+        entrez_id_lists = EnOps.client().map(lambda gene_sym: 
+            GetEntrezInfo._id_lookup(gene_sym, retmax), gene_syms)
+        return dict(zip(gene_syms, entrez_id_lists))
+
+    @staticmethod
+    def _parse_gene_products_batch(entrez_rec_list, entrez_ids):
+        ''' An internal static function to assign the Entrez gene records
+            of a batch lookup to the individual gene symbols and to 
+            parse out the most common gene product of each symbol. A 
+            record is assigned to each gene symbol whose ESearch 
+            returned its Entrez ID, so that the gene product of a gene 
+            symbol is identical to that of function 
+            `_parse_gene_products` for the records of this symbol.
+        Args:
+            entrez_rec_list (list): a list of Entrez gene records
+            entrez_ids (dict):      the Entrez IDs of each gene symbol 
+                                    (see function `_id_lookup_batch`)
+        Returns:
+            gene_products (dict):   a dictionary with gene symbols as keys
+                                    and gene products as values; gene 
+                                    symbols without matching records are 
+                                    absent
+        Raises:
+            ME.MyException
+        '''
+        from collections import Counter
+        try:
+            documentSummarySet = entrez_rec_list['DocumentSummarySet']
+            docs = documentSummarySet['DocumentSummary']
+            descriptions = dict((doc.attributes['uid'], doc['Description']) 
+                for doc in docs)
+        except:
+            raise ME.MyException('An error occurred while parsing the '\
+            'data from %s.' % ('ESummary'))
+        gene_products = {}
+        for gene_sym, entrez_id_list in entrez_ids.items():
+            list_gene_product = [descriptions[entrez_id] for entrez_id in 
+                entrez_id_list if entrez_id in descriptions]
+            if list_gene_product:
+                # Avoiding that spurious first hit biases gene_product
+                gene_products[gene_sym] = Counter(list_gene_product).\
+                    most_common()[0][0]
+        return gene_products
+
     @staticmethod
     def _taxname_lookup(taxon_name, retmax=1):
         ''' An internal static function to look up a taxon name at NCBI 
@@ -162,7 +248,6 @@ class GetEntrezInfo:
 #                >>> _taxname_lookup(taxon_name)
 #                Out: 0
         
-        from Bio import Entrez
         if not taxon_name:
             raise ME.MyException('No taxon name detected.')
         if '_' in taxon_name:
@@ -170,18 +255,39 @@ class GetEntrezInfo:
             'which is not allowed.' % (taxon_name))
         query_term = taxon_name
         try:
-            esearch_records = Entrez.esearch(db='taxonomy', term=query_term,
-                retmax=retmax, retmod='xml')
+            parsed_records = EnOps.client().request('esearch', 
+                db='taxonomy', term=query_term, retmax=retmax, retmod='xml')
         except:
             raise ME.MyException('An error occurred while retrieving data from '\
                 '%s.' % ('ESearch'))
-        parsed_records = Entrez.read(esearch_records)
         entrez_hitcount = parsed_records['Count']
         return entrez_hitcount
 
+    @staticmethod
+    def _lookup_gene_product(gene_sym):
+        ''' An internal static function to look up the gene product of a 
+            gene symbol via ESearch, EPost and ESummary. '''
+        try:
+            entrez_id_list = GetEntrezInfo._id_lookup(gene_sym)
+        except ME.MyException as e:
+            raise e
+        try:
+            entrez_rec_list = GetEntrezInfo._gene_product_lookup(entrez_id_list)
+        except ME.MyException as e:
+            raise e
+        try:
+            gene_product = GetEntrezInfo._parse_gene_products(entrez_rec_list)
+        except ME.MyException as e:
+            raise e
+        return gene_product
+
 
     def obtain_gene_product(self, gene_sym):
-        ''' This function performs something.
+        ''' This function obtains the gene product of a gene symbol. The 
+            gene product is first looked up in the in-process memo and, 
+            if an EntrezCache is present, in the cache; only if both miss 
+            is Entrez queried (unless the cache is in offline mode) and 
+            the result memoized and stored to the cache.
         '''
 
 #        Examples:
@@ -190,38 +296,153 @@ class GetEntrezInfo:
 #                >>> GetGeneInfo()._entrezid_lookup(gene_sym)
 #                Out: ['26835430', '26833718', '26833393', ...]
 
+        gene_product = GetEntrezInfo._gene_product_memo.get(gene_sym)
+        if gene_product is not None:
+            return gene_product
+        if self.entrez_cache:
+            gene_product = self.entrez_cache.get('gene_product', gene_sym)
+            if gene_product is not None:
+                GetEntrezInfo._gene_product_memo[gene_sym] = gene_product
+                return gene_product
+            if self.entrez_cache.offline:
+                raise ME.MyException('Gene symbol `%s` not found in the '\
+                    'Entrez cache, and online lookups are disabled.' % 
+                    (gene_sym))
         from Bio import Entrez
         Entrez.email = self.email_addr
         try:
-            entrez_id_list = GetEntrezInfo._id_lookup(gene_sym)
-        except ME.MyException as e:
-            raise e
-        try:
-            entrez_rec_list = GetEntrezInfo._gene_product_lookup(entrez_id_list)
-        except ME.MyException as e:
-            raise e
-        try:
-            gene_product = GetEntrezInfo._parse_gene_products(entrez_rec_list)
+            gene_product = GetEntrezInfo._lookup_gene_product(gene_sym)
         except ME.MyException as e:
             raise e
+        GetEntrezInfo._gene_product_memo[gene_sym] = gene_product
+        if self.entrez_cache:
+            self.entrez_cache.set('gene_product', gene_sym, gene_product)
         return gene_product
 
 
-    def does_taxon_exist(self, taxon_name):
-        ''' This function calls _taxname_lookup and thus evaluates if a taxon exists.
+    def obtain_gene_products(self, gene_syms):
+        ''' This function obtains the gene products of a list of gene 
+            symbols in a single batch: gene symbols neither memoized nor 
+            present in the EntrezCache (if any) are resolved via 
+            concurrent ESearches (one per gene symbol, so that the 
+            result of each gene symbol is identical to that of function 
+            `obtain_gene_product`) and a single EPost/ESummary pair for 
+            the hits of all gene symbols. Gene symbols without any 
+            record are looked up individually, as by function 
+            `obtain_gene_product`.
         Args:
-            taxon_name (str): a taxon name; example: 'Pyrus tamamaschjanae'
-            retmax (int):     the number of maximally retained hits
+            gene_syms (list): a list of gene symbols; example: ['psbI', 
+                              'matK']
         Returns:
-            entrez_id_list (list): a list of Entrez IDs; example: ['26835430',
-                            '26833718', '26833393', ...]
+            gene_products (dict): a dictionary with gene symbols as keys
+                                  and gene products as values; example:
+                                  {'matK': 'maturase K', ...}
         Raises:
-            none
+            ME.MyException
+        '''
+        gene_products = {}
+        gene_syms_missing = []
+        for gene_sym in gene_syms:
+            if gene_sym in gene_products or gene_sym in gene_syms_missing:
+                continue
+            gene_product = GetEntrezInfo._gene_product_memo.get(gene_sym)
+            if gene_product is not None:
+                gene_products[gene_sym] = gene_product
+                continue
+            if self.entrez_cache:
+                gene_product = self.entrez_cache.get('gene_product', 
+                    gene_sym)
+                if gene_product is not None:
+                    GetEntrezInfo._gene_product_memo[gene_sym] = gene_product
+                    gene_products[gene_sym] = gene_product
+                    continue
+                if self.entrez_cache.offline:
+                    raise ME.MyException('Gene symbol `%s` not found in '\
+                        'the Entrez cache, and online lookups are '\
+                        'disabled.' % (gene_sym))
+            gene_syms_missing.append(gene_sym)
+        if not gene_syms_missing:
+            return gene_products
+        from Bio import Entrez
+        Entrez.email = self.email_addr
+        entrez_ids = GetEntrezInfo._id_lookup_batch(gene_syms_missing)
+        entrez_id_list = []
+        entrez_id_set = set()
+        for gene_sym in gene_syms_missing:
+            for entrez_id in entrez_ids[gene_sym]:
+                if entrez_id not in entrez_id_set:
+                    entrez_id_set.add(entrez_id)
+                    entrez_id_list.append(entrez_id)
+        if entrez_id_list:
+            entrez_rec_list = GetEntrezInfo._gene_product_lookup(
+                entrez_id_list)
+            gene_products_batch = GetEntrezInfo._parse_gene_products_batch(
+                entrez_rec_list, entrez_ids)
+        else:
+            gene_products_batch = {}
+        gene_syms_unassigned = [gene_sym for gene_sym in gene_syms_missing 
+            if gene_sym not in gene_products_batch]
+        # Note: The cache is only accessed from the calling thread
+        gene_products_batch.update(zip(gene_syms_unassigned, 
+            EnOps.client().map(GetEntrezInfo._lookup_gene_product, 
+            gene_syms_unassigned)))
+        for gene_sym in gene_syms_missing:
+            gene_products[gene_sym] = gene_products_batch[gene_sym]
+            GetEntrezInfo._gene_product_memo[gene_sym] = \
+                gene_products[gene_sym]
+            if self.entrez_cache:
+                self.entrez_cache.set('gene_product', gene_sym, 
+                    gene_products[gene_sym])
+        return gene_products
+
+
+    def _taxon_hitcount(self, taxon_name):
+        ''' An internal function to obtain the Entrez hit count of a taxon 
+            name. If a TaxdumpIndex is present, the hit count is 
+            obtained from this index. Otherwise, the hit count is looked 
+            up in the in-process memo first, then in the EntrezCache 
+            (if present); only if both miss is Entrez queried (unless 
+            the cache is in offline mode).
         '''
+        if self.taxdump_index:
+            return self.taxdump_index.hitcount(taxon_name)
+        entrez_hitcount = GetEntrezInfo._taxon_memo.get(taxon_name)
+        if entrez_hitcount is not None:
+            return entrez_hitcount
+        if self.entrez_cache:
+            entrez_hitcount = self.entrez_cache.get('taxon_hitcount', 
+                taxon_name)
+            if entrez_hitcount is not None:
+                GetEntrezInfo._taxon_memo[taxon_name] = entrez_hitcount
+                return entrez_hitcount
+            if self.entrez_cache.offline:
+                raise ME.MyException('Taxon name `%s` not found in the '\
+                    'Entrez cache, and online lookups are disabled.' % 
+                    (taxon_name))
         from Bio import Entrez
         Entrez.email = self.email_addr
+        entrez_hitcount = str(GetEntrezInfo._taxname_lookup(taxon_name))
+        GetEntrezInfo._taxon_memo[taxon_name] = entrez_hitcount
+        if self.entrez_cache:
+            self.entrez_cache.set('taxon_hitcount', taxon_name, 
+                entrez_hitcount)
+        return entrez_hitcount
+
+
+    def does_taxon_exist(self, taxon_name):
+        ''' This function calls _taxname_lookup and thus evaluates if a taxon 
+            exists. Results are memoized within the process and, if an 
+            EntrezCache is present, stored to the cache.
+        Args:
+            taxon_name (str): a taxon name; example: 'Pyrus tamamaschjanae'
+        Returns:
+            bool.   True if the taxon name has exactly one hit, False if 
+                    it has none (and None otherwise)
+        Raises:
+            ME.MyException
+        '''
         try:
-            entrez_hitcount = GetEntrezInfo._taxname_lookup(taxon_name)
+            entrez_hitcount = self._taxon_hitcount(taxon_name)
         except ME.MyException as e:
             raise e
         if entrez_hitcount == '0':
@@ -230,6 +451,74 @@ class GetEntrezInfo:
             return True
 
 
+    def prefetch_taxon_names(self, taxon_names):
+        ''' This function obtains, ahead of the individual evaluation of 
+            taxon names via ConfirmAdjustTaxonName, all Entrez hit counts 
+            that this evaluation requires: the hit counts of all distinct 
+            taxon names and, where a taxon name does not have exactly one 
+            hit, of its genus name are looked up concurrently. Each hit 
+            count is obtained via the same ESearch as in function 
+            `does_taxon_exist`, so that the memoized (and cached) hit 
+            counts are identical to those of the individual lookup. In 
+            offline mode or if a TaxdumpIndex is present, no lookup 
+            takes place.
+        Args:
+            taxon_names (list): a list of taxon names; example: 
+                                ['Pyrus caucasica', 'Pyrus communis']
+        Raises:
+            ME.MyException
+        '''
+        if self.taxdump_index or (self.entrez_cache and 
+            self.entrez_cache.offline):
+            return
+        taxon_names = sorted(set(taxon_names))
+        self._prefetch_hitcounts(taxon_names)
+        genus_names = [taxon_name.split(' ', 1)[0] for taxon_name in 
+            taxon_names if ' ' in taxon_name and 
+            GetEntrezInfo._taxon_memo.get(taxon_name) != '1']
+        self._prefetch_hitcounts(sorted(set(genus_names)))
+
+    def _prefetch_hitcounts(self, taxon_names):
+        ''' An internal function to look up the Entrez hit counts of all 
+            taxon names that are neither memoized nor cached 
+            concurrently. Invalid taxon names and failed lookups are left 
+            to the individual lookup, which reports them. '''
+        taxon_names_missing = []
+        for taxon_name in taxon_names:
+            if not taxon_name or '_' in taxon_name:
+                continue
+            if taxon_name in GetEntrezInfo._taxon_memo:
+                continue
+            if self.entrez_cache:
+                entrez_hitcount = self.entrez_cache.get('taxon_hitcount', 
+                    taxon_name)
+                if entrez_hitcount is not None:
+                    GetEntrezInfo._taxon_memo[taxon_name] = entrez_hitcount
+                    continue
+            taxon_names_missing.append(taxon_name)
+        if not taxon_names_missing:
+            return
+        from Bio import Entrez
+        Entrez.email = self.email_addr
+
+        def lookup(taxon_name):
+            try:
+                return GetEntrezInfo._taxname_lookup(taxon_name)
+            except ME.MyException:
+                return None
+
+        entrez_hitcounts = EnOps.client().map(lookup, taxon_names_missing)
+        # Note: The cache is only accessed from the calling thread
+        for taxon_name, entrez_hitcount in zip(taxon_names_missing, 
+            entrez_hitcounts):
+            if entrez_hitcount is None:
+                continue
+            GetEntrezInfo._taxon_memo[taxon_name] = str(entrez_hitcount)
+            if self.entrez_cache:
+                self.entrez_cache.set('taxon_hitcount', taxon_name, 
+                    str(entrez_hitcount))
+
+
 class ConfirmAdjustTaxonName:
     ''' This class contains functions to confirm or adjust a sequence's
     taxon name.
@@ -238,7 +527,8 @@ class ConfirmAdjustTaxonName:
     def __init__(self):
         pass
     
-    def go(self, seq_record, email_addr):
+    def go(self, seq_record, email_addr, entrez_cache=None, 
+           taxdump_index=None):
         ''' This function evaluates a taxon name against NCBI taxonomy; 
             if not listed, it adjusts the taxon name and appends it
             as ecotype info.
@@ -246,6 +536,8 @@ class ConfirmAdjustTaxonName:
                 seq_record (obj):   a seqRecord object
                 email_addr (dict):  your email address; example: 
                                     "m.gruenstaeudl@fu-berlin.de"
+                entrez_cache (obj): an optional EntrezCache object
+                taxdump_index (obj):an optional TaxdumpIndex object
             Returns:
                 seq_record (obj):   a seqRecord object
             Raises:
@@ -257,12 +549,14 @@ class ConfirmAdjustTaxonName:
             sys.exit('%s annonex2embl ERROR: Could not locate a '\
                 'whitespace between genus name and specific epithet '\
                 'in taxon name of sequence `%s`.' % ('\n', seq_record.id))
-        if not GetEntrezInfo(email_addr).does_taxon_exist(seq_record.name):
+        entrez_handle = GetEntrezInfo(email_addr, entrez_cache, 
+            taxdump_index)
+        if not entrez_handle.does_taxon_exist(seq_record.name):
             print('%s annonex2embl WARNING: Taxon name of sequence `%s` '\
                 'not found in NCBI Taxonomy: `%s`. Please consider sending '\
                 'a taxon request to ENA.'
                 % ('\n', seq_record.id, seq_record.name))
-            if not GetEntrezInfo(email_addr).does_taxon_exist(genus_name):
+            if not entrez_handle.does_taxon_exist(genus_name):
                 sys.exit('%s annonex2embl ERROR: Neither genus name, '\
                     'nor species name of sequence `%s` were found in '\
                     'NCBI Taxonomy.' % ('\n', seq_record.id))
@@ -286,13 +580,15 @@ class ParseCharsetName:
                             "psbI_CDS"
         email_addr (dict):  your email address; example: 
                             "m.gruenstaeudl@fu-berlin.de"
+        entrez_cache (obj): an optional EntrezCache object
     Raises:
         currently nothing
     '''
 
-    def __init__(self, charset_name, email_addr):
+    def __init__(self, charset_name, email_addr, entrez_cache=None):
         self.charset_name = charset_name
         self.email_addr = email_addr
+        self.entrez_cache = entrez_cache
 
     @staticmethod
     def _extract_charset_type(charset_name):
@@ -325,11 +621,13 @@ class ParseCharsetName:
         charset_sym = charset_sym.rstrip('_') # Remove trailing underscores
         return charset_sym
 
-    def parse(self):
-        ''' This function parses the charset_name.
+    def parse_name(self):
+        ''' This function parses the charset_name without looking up the 
+            gene product (e.g., if gene products are looked up in batch 
+            via GetEntrezInfo.obtain_gene_products).
         Returns:
-            tupl.   The return consists of three strings in the order 
-                    "charset_sym, charset_type, charset_product"
+            tupl.   The return consists of two strings in the order 
+                    "charset_sym, charset_type"
         '''
         try:
             charset_type = ParseCharsetName._extract_charset_type(\
@@ -341,7 +639,16 @@ class ParseCharsetName:
                 self.charset_name, charset_type)
         except ME.MyException as e:
             raise e
-        entrez_handle = GetEntrezInfo(self.email_addr)
+        return (charset_sym, charset_type)
+
+    def parse(self):
+        ''' This function parses the charset_name.
+        Returns:
+            tupl.   The return consists of three strings in the order 
+                    "charset_sym, charset_type, charset_product"
+        '''
+        charset_sym, charset_type = self.parse_name()
+        entrez_handle = GetEntrezInfo(self.email_addr, self.entrez_cache)
         if charset_type == 'CDS' or charset_type == 'gene':
             try:
                 charset_product = entrez_handle.obtain_gene_product(\
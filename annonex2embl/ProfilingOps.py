@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+'''
+Classes to record the wall time and call counts of the steps of the
+pipeline, as well as event counters (e.g., Entrez requests)
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import time
+
+import MyExceptions as ME
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.07.1500'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class NullProfiler:
+    ''' This class is the inactive counterpart of class `Profiler`; all
+        its functions do nothing, so that instrumentation has virtually
+        no overhead unless profiling was requested. '''
+
+    enabled = False
+
+    def start(self, step):
+        pass
+
+    def stop(self, step):
+        pass
+
+    def lap(self, step):
+        pass
+
+    def count(self, counter, value=1):
+        pass
+
+
+class Profiler:
+    ''' This class records the wall time and the number of calls of
+        the steps of the pipeline, as well as event counters. Steps are
+        either timed explicitly (via `start` and `stop`) or as laps
+        (via `lap`), where each lap ends the previous one; the latter
+        is used for the consecutive sub-steps of a loop iteration.
+    '''
+
+    enabled = True
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.counters = {}
+        self._started = {}
+        self._lap_step = None
+        self._lap_start = None
+
+    def _add(self, step, seconds):
+        self.seconds[step] = self.seconds.get(step, 0.0) + seconds
+        self.calls[step] = self.calls.get(step, 0) + 1
+
+    def start(self, step):
+        ''' This function starts the timing of a step. '''
+        self._started[step] = time.time()
+
+    def stop(self, step):
+        ''' This function stops the timing of a step. '''
+        self._add(step, time.time() - self._started.pop(step))
+
+    def lap(self, step):
+        ''' This function ends the current lap (if any) and starts the
+            timing of the next step; a step of None only ends the
+            current lap. '''
+        now = time.time()
+        if self._lap_step is not None:
+            self._add(self._lap_step, now - self._lap_start)
+        self._lap_step = step
+        self._lap_start = now
+
+    def count(self, counter, value=1):
+        ''' This function increments an event counter. '''
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def snapshot(self):
+        ''' This function returns the recorded data and resets the
+            profiler (e.g., to transfer the data of a worker process to
+            the parent process). '''
+        data = (self.seconds, self.calls, self.counters)
+        self.seconds, self.calls, self.counters = {}, {}, {}
+        return data
+
+    def merge(self, data):
+        ''' This function adds the data of a snapshot. '''
+        seconds, calls, counters = data
+        for step, value in seconds.items():
+            self.seconds[step] = self.seconds.get(step, 0.0) + value
+        for step, value in calls.items():
+            self.calls[step] = self.calls.get(step, 0) + value
+        for counter, value in counters.items():
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    @staticmethod
+    def _step_key(step):
+        ''' An internal static function to sort steps by their
+            numbering; example: "6.10. Write" comes after "6.9. ..." '''
+        number = step.split(' ', 1)[0].strip('.')
+        try:
+            return ([int(n) for n in number.split('.')], step)
+        except ValueError:
+            return ([float('inf')], step)
+
+    def report(self):
+        ''' This function returns the recorded data as a dictionary. '''
+        steps = sorted(self.seconds.keys(), key=Profiler._step_key)
+        return {'steps': [{'step': step, 'calls': self.calls[step],
+                           'seconds': round(self.seconds[step], 6)}
+                          for step in steps],
+                'counters': dict((counter, round(value, 6) if 
+                    isinstance(value, float) else value) for counter, value 
+                    in self.counters.items())}
+
+    def report_table(self):
+        ''' This function returns the recorded data as a table. '''
+        report = self.report()
+        lines = ['%-50s %10s %12s' % ('step', 'calls', 'seconds')]
+        for row in report['steps']:
+            lines.append('%-50s %10i %12.4f' % (row['step'][:50],
+                row['calls'], row['seconds']))
+        lines.append('')
+        lines.append('%-50s %10s' % ('counter', 'value'))
+        for counter in sorted(report['counters'].keys()):
+            value = report['counters'][counter]
+            # Note: Counters of seconds (e.g., the time saved by a 
+            # cache) are floats
+            lines.append(('%-50s %10.4f' if isinstance(value, float) else 
+                '%-50s %10i') % (counter, value))
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path_to_report):
+        ''' This function writes the recorded data to a file; in JSON
+            format if the file name ends with ".json", otherwise as a
+            table. A file name of "-" writes the table to the screen.
+        '''
+        import json
+        import sys
+        if path_to_report == '-':
+            sys.stdout.write(self.report_table())
+            return
+        try:
+            with open(path_to_report, 'w') as report_handle:
+                if path_to_report.lower().endswith('.json'):
+                    json.dump(self.report(), report_handle, indent=2,
+                        sort_keys=True)
+                else:
+                    report_handle.write(self.report_table())
+        except IOError as e:
+            raise ME.MyException('Profile report `%s` could not be '\
+                'written: %s' % (path_to_report, e))
+
+#############
+# FUNCTIONS #
+#############
+
+def enable():
+    ''' This function activates profiling and returns the active
+        profiler. '''
+    global profiler
+    profiler = Profiler()
+    return profiler
+
+def disable():
+    ''' This function deactivates profiling. '''
+    global profiler
+    profiler = NullProfiler()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+# The active profiler; modules record their data via
+# `ProfilingOps.profiler`, which does nothing unless profiling was
+# activated via function `enable`
+profiler = NullProfiler()
+
+########
+# MAIN #
+########
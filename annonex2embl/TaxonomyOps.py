@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+'''
+Classes to check taxon names against a local copy of NCBI Taxonomy
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import MyExceptions as ME
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.06.1100'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class TaxdumpIndex:
+    ''' This class contains functions to check taxon names against the
+        file `names.dmp` of a local NCBI taxdump (i.e., without network
+        access). Upon first use, the names are indexed into an SQLite
+        database next to `names.dmp` (or at a user-defined location);
+        if the directory of `names.dmp` is not writable, the index is
+        placed in the cache directory instead (if any). The index is 
+        rebuilt whenever `names.dmp` is newer than the index. Names are compared case-insensitively and irrespective
+        of their name class (e.g., scientific name, synonym).
+    Args:
+        path_to_taxdump (str): path to the file `names.dmp` or to the
+                               directory that contains it; example:
+                               "/home/username/taxdump"
+        path_to_index (str):   optional path to the index file; example:
+                               "/home/username/taxdump/names.dmp.sqlite"
+        cache_dir (str):       optional path to the cache directory, in 
+                               which the index is placed if the 
+                               directory of `names.dmp` is not writable; 
+                               example: "/home/username/.annonex2embl"
+    Raises:
+        ME.MyException
+    '''
+
+    def __init__(self, path_to_taxdump, path_to_index=None, 
+        cache_dir=None):
+        import os
+        import sqlite3
+        if os.path.isdir(path_to_taxdump):
+            path_to_taxdump = os.path.join(path_to_taxdump, 'names.dmp')
+        if not os.path.isfile(path_to_taxdump):
+            raise ME.MyException('Taxdump file `%s` not found.' %
+                (path_to_taxdump))
+        if not path_to_index:
+            path_to_index = TaxdumpIndex._default_index(path_to_taxdump, 
+                cache_dir)
+        self.path_to_taxdump = path_to_taxdump
+        self.path_to_index = path_to_index
+        try:
+            if not TaxdumpIndex._is_current(path_to_taxdump, 
+                path_to_index):
+                TaxdumpIndex._build(path_to_taxdump, path_to_index)
+            self.conn = sqlite3.connect(path_to_index)
+            self.conn.text_factory = str
+        except (IOError, OSError, sqlite3.Error) as e:
+            raise ME.MyException('Taxdump index `%s` could not be '\
+                'generated: %s' % (path_to_index, e))
+
+    @staticmethod
+    def _is_current(path_to_taxdump, path_to_index):
+        ''' An internal static function to evaluate if an index exists 
+            and is not older than the file `names.dmp`. '''
+        import os
+        return os.path.isfile(path_to_index) and \
+            os.path.getmtime(path_to_index) >= \
+            os.path.getmtime(path_to_taxdump)
+
+    @staticmethod
+    def _default_index(path_to_taxdump, cache_dir=None):
+        ''' An internal static function to determine the path to the 
+            index file: next to `names.dmp`, unless the index cannot be 
+            (re)built there and a cache directory is given. In the cache 
+            directory, the file name is derived from the absolute path 
+            to `names.dmp`, so that different taxdumps do not share an 
+            index. '''
+        import os
+        from hashlib import md5
+        path_to_index = path_to_taxdump + '.sqlite'
+        taxdump_dir = os.path.dirname(os.path.abspath(path_to_taxdump))
+        if TaxdumpIndex._is_current(path_to_taxdump, path_to_index) or \
+            os.access(taxdump_dir, os.W_OK):
+            return path_to_index
+        if not cache_dir:
+            raise ME.MyException('Directory `%s` is not writable; the '\
+                'taxdump index cannot be generated there. Specify the '\
+                'path to the index file or a cache directory.' % 
+                (taxdump_dir))
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+        except OSError as e:
+            raise ME.MyException('Cache directory `%s` could not be '\
+                'opened: %s' % (cache_dir, e))
+        return os.path.join(cache_dir, 'taxdump_%s.sqlite' % (md5(
+            os.path.abspath(path_to_taxdump)).hexdigest()[:12]))
+
+    @staticmethod
+    def _parse_names(names_handle):
+        ''' An internal static function to parse the lines of the file
+            `names.dmp` into tuples of lower-case name and taxon ID.
+        '''
+#        Examples:
+#            Example 1:
+#            >>> line = '23211\t|\tPyrus\t|\t\t|\tscientific name\t|\n'
+#            >>> list(_parse_names([line]))
+#            Out: [('pyrus', 23211)]
+
+        for line in names_handle:
+            fields = line.split('\t|\t')
+            if len(fields) < 2:
+                continue
+            yield (fields[1].strip().lower(), int(fields[0]))
+
+    @staticmethod
+    def _build(path_to_taxdump, path_to_index):
+        ''' An internal static function to index the file `names.dmp`
+            into an SQLite database. The database is first written to a
+            temporary file, which then replaces the index, so that an
+            interrupted build never leaves an incomplete index. '''
+        import os
+        import sqlite3
+        path_to_tmp = '%s.%s.tmp' % (path_to_index, os.getpid())
+        if os.path.exists(path_to_tmp):
+            os.remove(path_to_tmp)
+        conn = sqlite3.connect(path_to_tmp)
+        conn.text_factory = str
+        try:
+            conn.execute('CREATE TABLE names (name TEXT, taxid INTEGER)')
+            with open(path_to_taxdump, 'r') as names_handle:
+                conn.executemany('INSERT INTO names VALUES (?, ?)',
+                    TaxdumpIndex._parse_names(names_handle))
+            conn.execute('CREATE INDEX names_name ON names (name)')
+            conn.commit()
+        finally:
+            conn.close()
+        os.rename(path_to_tmp, path_to_index)
+
+    def hitcount(self, taxon_name):
+        ''' This function returns the number of taxa that carry a taxon
+            name as a string, analogous to the hit count of an Entrez
+            ESearch; example: "1" '''
+        row = self.conn.execute('SELECT COUNT(DISTINCT taxid) FROM names '\
+            'WHERE name=?', (taxon_name.strip().lower(),)).fetchone()
+        return str(row[0])
+
+    def does_taxon_exist(self, taxon_name):
+        ''' This function evaluates if a taxon exists; see
+            ParsingOps.GetEntrezInfo.does_taxon_exist. '''
+        entrez_hitcount = self.hitcount(taxon_name)
+        if entrez_hitcount == '0':
+            return False
+        if entrez_hitcount == '1':
+            return True
+
+    def reopen(self):
+        ''' This function returns a new connection to the same index
+            (e.g., for use in a worker process). '''
+        return TaxdumpIndex(self.path_to_taxdump, self.path_to_index)
+
+    def close(self):
+        ''' This function closes the connection to the index. '''
+        self.conn.close()
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
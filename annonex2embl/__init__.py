@@ -1 +1 @@
-__all__=['Annonex2emblMain', 'CheckingOps', 'DegappingOps', 'GenerationOps', 'GlobalVariables', 'IOOps', 'MyExceptions', 'ParsingOps']
+__all__=['Annonex2emblMain', 'BatchOps', 'CachingOps', 'CheckpointOps', 'CheckingOps', 'DegappingOps', 'EntrezOps', 'GenerationOps', 'GlobalVariables', 'IntervalOps', 'IOOps', 'MyExceptions', 'ParsingOps', 'ProfilingOps', 'TaxonomyOps']
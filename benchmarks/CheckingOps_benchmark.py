@@ -0,0 +1,122 @@
+#!/usr/bin/env python2.7
+'''
+Benchmark for the conversion of qualifier values to ASCII characters in
+the module `CheckingOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import csv
+import random
+import time
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import CheckingOps as CkOps
+import IOOps as IOOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.10.1000'
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+# Recurring qualifier values, some of which contain non-ASCII characters
+countries = ['Armenia', 'Georgia', 'Turkey', 'Iran', 'Azerbaijan',
+    u'T\xfcrkiye', u'Espa\xf1a', u'C\xf4te d\'Ivoire']
+collectors = ['Ter-Voskanyan', 'Akopian', 'Parolly', 'Weber', 'Oganesian',
+    u'Gr\xfcnst\xe4udl', u'M\xfcller', u'Sch\xf6nfelder', u'\u0160ulc']
+herbaria = ['B', 'ERE', 'K', 'LE', 'TBI', u'M (M\xfcnchen)',
+    u'W (Wien, Naturhistorisches Museum)']
+
+#############
+# FUNCTIONS #
+#############
+
+def synthetic_csv(path_to_csv, n_rows, seed):
+    ''' This function writes a csv file with <n_rows> rows whose
+        qualifier values recur across rows, as is typical for the
+        metadata of a sampling campaign. '''
+    rand = random.Random(seed)
+    with open(path_to_csv, 'wb') as csv_handle:
+        writer = csv.writer(csv_handle)
+        writer.writerow(['isolate', 'organism', 'country', 'collected_by',
+            'specimen_voucher', 'note'])
+        for i in xrange(n_rows):
+            herbarium = rand.choice(herbaria)
+            row = ['taxon_%s' % (i), 'Pyrus caucasica',
+                rand.choice(countries), rand.choice(collectors),
+                u'%s:%s' % (herbarium, rand.randint(1, 50)),
+                rand.choice(['', 'leaf material', u'silica-dried, '\
+                u'\xb120 years old'])]
+            writer.writerow([v.encode('utf-8') if isinstance(v, unicode)
+                else v for v in row])
+
+
+def enforce_ASCII_legacy(lst_of_dcts):
+    ''' This function converts all qualifier values to ASCII characters
+        as function `_enforce_ASCII` did before its conversions were
+        memoized (i.e., via unidecode on every value). '''
+    from unidecode import unidecode
+    return [{k: unidecode(v.decode('utf-8')) for k, v in dct.items()}
+        for dct in lst_of_dcts]
+
+
+def time_function(function, *args):
+    ''' This function returns the result of a function and the elapsed
+        wall time in seconds. '''
+    start = time.time()
+    result = function(*args)
+    return result, time.time() - start
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    import argparse
+    import shutil
+    import tempfile
+    parser = argparse.ArgumentParser(description='Benchmark of the '\
+        'conversion of qualifier values to ASCII characters on a '\
+        'synthetic csv file')
+    parser.add_argument('--rows', type=int, default=50000,
+                        help='Number of rows of the csv file')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        path_to_csv = os.path.join(work_dir, 'metadata.csv')
+        synthetic_csv(path_to_csv, args.rows, args.seed)
+        raw_qualifiers = IOOps.Inp().parse_csv_file(path_to_csv)
+        n_values = sum(len(dct) for dct in raw_qualifiers)
+        out_old, t_old = time_function(enforce_ASCII_legacy, raw_qualifiers)
+        CkOps.QualifierCheck._ascii_memo.clear()
+        out_new, t_new = time_function(CkOps.QualifierCheck._enforce_ASCII,
+            raw_qualifiers)
+        if out_new != out_old:
+            sys.exit('ERROR: The conversions differ.')
+        memo = CkOps.QualifierCheck._ascii_memo
+        print('_enforce_ASCII on %d rows (%d values):' % (args.rows,
+            n_values))
+        print('  legacy:       %.2f s' % (t_old))
+        print('  memoized:     %.2f s' % (t_new))
+        print('  speedup:      %.1fx' % (t_old/t_new))
+        print('  memo hits:    %d of %d non-ASCII values' % (memo.hits,
+            memo.hits + memo.misses))
+    finally:
+        shutil.rmtree(work_dir)
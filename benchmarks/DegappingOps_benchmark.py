@@ -0,0 +1,134 @@
+#!/usr/bin/env python2.7
+'''
+Benchmark for the classes of the module `DegappingOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import random
+import time
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import DegappingOps as DgOps
+import IntervalOps as IvOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.03.1500'
+
+#############
+# FUNCTIONS #
+#############
+
+def synthetic_alignment(n_taxa, aln_len, gap_density, n_charsets, seed):
+    ''' This function generates a synthetic alignment (i.e., a list of
+        gapped sequences) and a set of adjacent charsets that cover the
+        entire alignment. All sequences are derived from a single 
+        random template; gaps are placed as runs of 1 to 20 dashes. '''
+    rand = random.Random(seed)
+    template = bytearray(rand.choice('ACGT') for _ in xrange(aln_len))
+    seqs = []
+    for _ in range(n_taxa):
+        seq = bytearray(template)
+        n_gaps = int(aln_len * gap_density)
+        while n_gaps > 0:
+            run_len = min(rand.randint(1, 20), n_gaps)
+            start = rand.randint(0, aln_len-run_len)
+            seq[start:start+run_len] = '-' * run_len
+            n_gaps -= run_len
+        seqs.append(str(seq))
+    bounds = sorted(rand.sample(xrange(1, aln_len), n_charsets-1))
+    bounds = [0] + bounds + [aln_len]
+    charsets = {}
+    for i in range(n_charsets):
+        charsets['gene%s_CDS' % (i)] = IvOps.IntervalList([(bounds[i],
+            bounds[i+1])])
+    return seqs, charsets
+
+
+def degap(seq, rmchar, charsets):
+    ''' This function degaps a sequence via function `degap` of class 
+        `DegapButMaintainAnno`. '''
+    return DgOps.DegapButMaintainAnno(seq, rmchar, charsets).degap()
+
+
+def degap_legacy(seq, rmchar, charsets):
+    ''' This function degaps a sequence as function `degap` did before 
+        it employed a map of gap offsets (i.e., by removing one gap at 
+        a time).
+        Source: http://stackoverflow.com/questions/35233714/
+        maintaining-overlapping-annotations-while-removing-dashes-from-string
+    '''
+    annotations = dict((k, list(v)) for k, v in charsets.items())
+    index = seq.find(rmchar)
+    while index > -1:
+        for gene_name, indices in annotations.items():
+            if index in indices:
+                indices.remove(index)
+            annotations[gene_name] = [e-1 if e > index else e \
+                for e in indices]
+        seq = seq[:index] + seq[index+1:]
+        index = seq.find(rmchar)
+    return seq, annotations
+
+
+def time_degap(seqs, charsets, function):
+    ''' This function degaps all sequences of an alignment via the
+        specified function and returns the elapsed wall time in 
+        seconds. '''
+    start = time.time()
+    for seq in seqs:
+        function(seq, '-', charsets)
+    return time.time() - start
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark of the '\
+        'degapping engine on a synthetic alignment')
+    parser.add_argument('--taxa', type=int, default=500,
+                        help='Number of sequences in the alignment')
+    parser.add_argument('--length', type=int, default=100000,
+                        help='Length of the alignment')
+    parser.add_argument('--gaps', type=float, default=0.2,
+                        help='Fraction of alignment positions that are gaps')
+    parser.add_argument('--charsets', type=int, default=80,
+                        help='Number of charsets')
+    parser.add_argument('--legacy', type=int, default=20,
+                        help='Number of sequences on which both the current '\
+                        'and the legacy implementation are compared')
+    parser.add_argument('--legacylength', type=int, default=5000,
+                        help='Length of the alignment on which both the '\
+                        'current and the legacy implementation are compared')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    seqs, charsets = synthetic_alignment(args.taxa, args.length,
+        args.gaps, args.charsets, args.seed)
+    t_new = time_degap(seqs, charsets, degap)
+    print('degap:        %d x %d bp in %.2f s (%.4f s per sequence)' % (
+        args.taxa, args.length, t_new, t_new/args.taxa))
+    if args.legacy > 0:
+        seqs, charsets = synthetic_alignment(args.legacy, args.legacylength,
+            args.gaps, args.charsets, args.seed)
+        t_new = time_degap(seqs, charsets, degap)
+        t_old = time_degap(seqs, charsets, degap_legacy)
+        print('comparison on %d x %d bp:' % (args.legacy, args.legacylength))
+        print('  degap:        %.2f s' % (t_new))
+        print('  degap_legacy: %.2f s' % (t_old))
+        print('  speedup:      %.0fx' % (t_old/t_new))
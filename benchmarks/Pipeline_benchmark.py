@@ -0,0 +1,387 @@
+#!/usr/bin/env python2.7
+'''
+Benchmark of the individual stages of the annonex2embl pipeline on a
+synthetic dataset
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import json
+import random
+import time
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import Annonex2emblMain as A2EMain
+import CachingOps as CaOps
+import CheckingOps as CkOps
+import DegappingOps as DgOps
+import GenerationOps as GnOps
+import GlobalVariables as GlobVars
+import IOOps as IOOps
+import IntervalOps as IvOps
+import MyExceptions as ME
+import ParsingOps as PrOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.07.1000'
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+# Sense codons (i.e., all codons except the stop codons of table 11)
+sense_codons = [a+b+c for a in 'ACGT' for b in 'ACGT' for c in 'ACGT'
+    if a+b+c not in ['TAA', 'TAG', 'TGA']]
+
+email_addr = 'annonex2embl@example.org'
+descr_DEline = 'synthetic locus, partial sequence'
+
+#############
+# FUNCTIONS #
+#############
+
+def synthetic_layout(aln_len, n_genes, layout, rand):
+    ''' This function distributes <n_genes> gene units evenly across an
+        alignment of length <aln_len>. Each unit consists of a coding
+        region (whose length is a multiple of three), followed by a
+        spacer. A leading spacer precedes the first unit.
+    Returns:
+        tupl.   The return consists of the template sequence, the
+                charsets (i.e., a dictionary with charset names as keys
+                and tuples of start and stop positions as values) and
+                the list of coding regions (as tuples of start and stop
+                positions)
+    '''
+    lead_len = aln_len // 20
+    unit_len = (aln_len - lead_len) // n_genes
+    if unit_len < 30:
+        raise ValueError('Alignment too short for %s gene units.' %
+            (n_genes))
+    template = [rand.choice('ACGT') for _ in xrange(lead_len)]
+    charsets = {}
+    coding_regions = []
+    start = lead_len
+    for i in range(n_genes):
+        cds_len = max(9, (unit_len * 2 // 3) // 3 * 3)
+        template.append('ATG')
+        template.extend(rand.choice(sense_codons) for _ in
+            xrange(cds_len // 3 - 2))
+        template.append('TAA')
+        stop = start + cds_len
+        spacer_len = unit_len - cds_len
+        if i == n_genes - 1:
+            spacer_len = aln_len - stop
+        template.extend(rand.choice('ACGT') for _ in xrange(spacer_len))
+        coding_regions.append((start, stop))
+        gene_sym = 'syn%s' % (i+1)
+        if 'CDS' in layout:
+            charsets[gene_sym + '_CDS'] = (start, stop)
+        if 'gene' in layout:
+            charsets[gene_sym + '_gene'] = (start, stop)
+        if 'intron' in layout and spacer_len > 0:
+            charsets[gene_sym + '_intron'] = (stop, stop + spacer_len)
+        start = stop + spacer_len
+    return ''.join(template), charsets, coding_regions
+
+
+def synthetic_sequence(template, coding_regions, gap_density, lead_n,
+    trail_n, rand):
+    ''' This function derives a gapped sequence from the template. Gaps
+        are placed as runs of 1 to 20 dashes outside of coding regions
+        and as runs of complete codons inside of coding regions (sparing
+        the start and the stop codon), so that all reading frames are
+        maintained. Leading runs of question marks and trailing runs of
+        Ns of random length (up to <lead_n> and <trail_n>) are added. '''
+    import bisect
+    seq = bytearray(template)
+    aln_len = len(seq)
+    starts = [start for start, stop in coding_regions]
+    n_gaps = int(aln_len * gap_density)
+    while n_gaps > 0:
+        pos = rand.randint(0, aln_len-1)
+        i = bisect.bisect_right(starts, pos) - 1
+        if i >= 0 and pos < coding_regions[i][1]:
+            cds_start, cds_stop = coding_regions[i]
+            pos = cds_start + (pos - cds_start) // 3 * 3
+            run_len = 3 * rand.randint(1, 5)
+            if pos < cds_start + 3 or pos + run_len > cds_stop - 3:
+                continue
+        else:
+            run_len = rand.randint(1, 20)
+            if i+1 < len(starts):
+                run_len = min(run_len, starts[i+1] - pos)
+            run_len = min(run_len, aln_len - pos)
+        seq[pos:pos+run_len] = '-' * run_len
+        n_gaps -= run_len
+    lead_len = rand.randint(0, lead_n)
+    seq[:lead_len] = '?' * lead_len
+    trail_len = rand.randint(0, trail_n)
+    seq[aln_len-trail_len:] = 'N' * trail_len
+    return str(seq)
+
+
+def synthetic_dataset(out_dir, n_taxa, aln_len, gap_density, lead_n,
+    trail_n, n_genes, layout, seed):
+    ''' This function writes a synthetic NEXUS file and a matching CSV
+        file to <out_dir>.
+    Returns:
+        tupl.   The return consists of the path to the NEXUS file, the
+                path to the CSV file and a dictionary of the gene
+                symbols and their (fictitious) gene products
+    '''
+    rand = random.Random(seed)
+    template, charsets, coding_regions = synthetic_layout(aln_len,
+        n_genes, layout, rand)
+    path_to_nex = os.path.join(out_dir, 'synthetic.nex')
+    path_to_csv = os.path.join(out_dir, 'synthetic.csv')
+    taxon_names = ['taxon_%06d' % (i+1) for i in range(n_taxa)]
+    with open(path_to_nex, 'w') as nex_handle:
+        nex_handle.write('#NEXUS\n\nBEGIN DATA;\nDIMENSIONS NTAX=%s '\
+            'NCHAR=%s;\nFORMAT DATATYPE=DNA MISSING=? GAP=- ;\nMATRIX\n' %
+            (n_taxa, aln_len))
+        for taxon_name in taxon_names:
+            nex_handle.write('%s %s\n' % (taxon_name, synthetic_sequence(
+                template, coding_regions, gap_density, lead_n, trail_n,
+                rand)))
+        nex_handle.write(';\nEND;\n\nBEGIN SETS;\n')
+        for charset_name, (start, stop) in sorted(charsets.items()):
+            nex_handle.write('CHARSET %s = %s-%s;\n' % (charset_name,
+                start+1, stop))
+        nex_handle.write('END;\n')
+    with open(path_to_csv, 'w') as csv_handle:
+        csv_handle.write('isolate,organism,country,specimen_voucher,note,'\
+            'mol_type\n')
+        for i, taxon_name in enumerate(taxon_names):
+            csv_handle.write('%s,Pyrus synthetica%s,Armenia,B:Synthetic '\
+                '%s,Tax. Authority: Synthetic,genomic DNA\n' % (taxon_name,
+                i % 7, i+1))
+    gene_products = dict(('syn%s' % (i+1), 'synthetic protein %s' % (i+1))
+        for i in range(n_genes))
+    return path_to_nex, path_to_csv, gene_products
+
+
+class StageTimer:
+    ''' This class accumulates the wall time of named stages. '''
+
+    def __init__(self):
+        self.seconds = {}
+        self.order = []
+        self._stage = None
+        self._start = None
+
+    def start(self, stage):
+        if stage not in self.seconds:
+            self.seconds[stage] = 0.0
+            self.order.append(stage)
+        self._stage = stage
+        self._start = time.time()
+
+    def stop(self):
+        self.seconds[self._stage] += time.time() - self._start
+        self._stage = None
+
+
+def run_stages(path_to_nex, path_to_csv, entrez_cache, timer):
+    ''' This function runs the stages of the pipeline (as in steps 2 to
+        6 of function `annonex2embl`) one after another across all
+        sequences and records the wall time of each stage.
+    Returns:
+        int.    The number of records generated
+    '''
+    from StringIO import StringIO
+    uniq_seqid_col, transl_table = 'isolate', '11'
+
+    timer.start('parse_nexus')
+    charset_ranges, alignm = IOOps.Inp().load_nexus_file(path_to_nex)
+    charsets_global = dict((charset_name, IvOps.IntervalList(ranges)) for
+        charset_name, ranges in charset_ranges.items())
+    seq_names = sorted(alignm.keys())
+    sequences = [alignm[seq_name] for seq_name in seq_names]
+    timer.stop()
+
+    timer.start('parse_csv')
+    qualifier_index = IOOps.Inp().stream_csv_file(path_to_csv,
+        uniq_seqid_col, seq_names)
+    timer.stop()
+
+    timer.start('check_qualifiers')
+    CkOps.QualifierCheck._seqnames_present(qualifier_index, seq_names,
+        uniq_seqid_col)
+    timer.stop()
+
+    timer.start('resolve_charsets')
+    charset_dict = {}
+    for charset_name in charsets_global.keys():
+        charset_dict[charset_name] = PrOps.ParseCharsetName(charset_name,
+            email_addr).parse_name()
+    gene_products = PrOps.GetEntrezInfo(email_addr, entrez_cache).\
+        obtain_gene_products(sorted(set([charset_sym for charset_sym,
+        charset_type in charset_dict.values() if charset_type in
+        ['CDS', 'gene']])))
+    for charset_name, (charset_sym, charset_type) in charset_dict.items():
+        charset_dict[charset_name] = (charset_sym, charset_type,
+            gene_products.get(charset_sym))
+    timer.stop()
+
+    timer.start('degap')
+    records = []
+    for seq_name, current_seq in zip(seq_names, sequences):
+        seq_record = GnOps.GenerateSeqRecord().base_record(current_seq,
+            qualifier_index[seq_name], uniq_seqid_col, '1', descr_DEline,
+            'linear', 'PLN')
+        seq_record.seq, charsets = DgOps.CleanupButMaintainAnno(
+            seq_record.seq, charsets_global, '?', 'N', '-').cleanup()
+        records.append((seq_name, seq_record, charsets))
+    timer.stop()
+
+    timer.start('generate_features')
+    for seq_name, seq_record, charsets in records:
+        seq_record.features.append(GnOps.GenerateSeqFeature().source_feat(
+            len(seq_record), qualifier_index[seq_name],
+            charsets.keys(), transl_table))
+        for charset_name, charset_range in charsets.items():
+            charset_sym, charset_type, charset_product = \
+                charset_dict[charset_name]
+            seq_record.features.append(GnOps.GenerateSeqFeature().\
+                regular_feat(charset_sym, charset_type, GnOps.\
+                GenerateFeatLoc().make_location(charset_range),
+                charset_product))
+        seq_record.features = [seq_record.features[0]] + sorted(
+            seq_record.features[1:], key=lambda x: x.location.start.position)
+    timer.stop()
+
+    timer.start('check_translations')
+    for seq_name, seq_record, charsets in records:
+        kept_features = []
+        for feature in seq_record.features:
+            if feature.type == 'CDS' or feature.type == 'gene':
+                try:
+                    feature = CkOps.TranslCheck().\
+                        transl_and_quality_of_transl(seq_record, feature,
+                        transl_table)
+                except ME.MyException:
+                    continue
+                coding_seq = str(feature.extract(seq_record.seq))
+                if not coding_seq.startswith(GlobVars.nex2ena_start_codon):
+                    feature.location = GnOps.GenerateFeatLoc().\
+                        make_start_fuzzy(feature.location)
+            kept_features.append(feature)
+        seq_record.features = kept_features
+    timer.stop()
+
+    timer.start('write')
+    outp_handle = StringIO()
+    for seq_name, seq_record, charsets in records:
+        IOOps.Outp().write_EntryUpload(seq_record, outp_handle, False)
+    timer.stop()
+    outp_handle.close()
+    return len(records)
+
+
+def run_end_to_end(path_to_nex, path_to_csv, cache_dir, out_dir, jobs):
+    ''' This function runs the complete pipeline via function
+        `annonex2embl` and returns the elapsed wall time in seconds. '''
+    path_to_outfile = os.path.join(out_dir, 'synthetic.embl')
+    if os.path.exists(path_to_outfile):
+        os.remove(path_to_outfile)
+    start = time.time()
+    A2EMain.annonex2embl(path_to_nex, path_to_csv, descr_DEline,
+        email_addr, path_to_outfile, cache_dir=cache_dir, offline='True',
+        jobs=str(jobs))
+    return time.time() - start
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    import argparse
+    import platform
+    import shutil
+    import tempfile
+    parser = argparse.ArgumentParser(description='Benchmark of the stages '\
+        'of the annonex2embl pipeline on a synthetic dataset; the results '\
+        'are reported in JSON format')
+    parser.add_argument('--taxa', type=int, default=200,
+                        help='Number of sequences in the alignment')
+    parser.add_argument('--length', type=int, default=20000,
+                        help='Length of the alignment')
+    parser.add_argument('--gaps', type=float, default=0.1,
+                        help='Fraction of alignment positions that are gaps')
+    parser.add_argument('--leadn', type=int, default=50,
+                        help='Maximum length of the leading runs of '\
+                        'ambiguities')
+    parser.add_argument('--trailn', type=int, default=50,
+                        help='Maximum length of the trailing runs of '\
+                        'ambiguities')
+    parser.add_argument('--genes', type=int, default=20,
+                        help='Number of gene units')
+    parser.add_argument('--layout', default='CDS,gene,intron',
+                        help='Comma-separated charset types per gene unit '\
+                        '(any of CDS, gene, intron)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of worker processes in the end-to-end '\
+                        'run')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', default=None,
+                        help='Path of the JSON report (default: stdout)')
+    args = parser.parse_args()
+
+    layout = args.layout.split(',')
+    work_dir = tempfile.mkdtemp()
+    try:
+        path_to_nex, path_to_csv, gene_products = synthetic_dataset(
+            work_dir, args.taxa, args.length, args.gaps, args.leadn,
+            args.trailn, args.genes, layout, args.seed)
+        cache_dir = os.path.join(work_dir, 'cache')
+        entrez_cache = CaOps.EntrezCache(cache_dir, offline=True)
+        for gene_sym, gene_product in gene_products.items():
+            entrez_cache.set('gene_product', gene_sym, gene_product)
+        timer = StageTimer()
+        # Note: Warnings on unsuccessful translations are not reported
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            n_records = run_stages(path_to_nex, path_to_csv, entrez_cache,
+                timer)
+            entrez_cache.close()
+            t_total = run_end_to_end(path_to_nex, path_to_csv, cache_dir,
+                work_dir, args.jobs)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        report = {
+            'annonex2embl_version': A2EMain.__version__,
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'parameters': vars(args),
+            'records': n_records,
+            'stages': [{'stage': stage,
+                        'seconds': round(timer.seconds[stage], 6),
+                        'ms_per_record': round(1000*timer.seconds[stage] /
+                            max(n_records, 1), 4)}
+                       for stage in timer.order],
+            'end_to_end': {'seconds': round(t_total, 6),
+                           'records_per_second': round(n_records / t_total,
+                               2)}}
+    finally:
+        shutil.rmtree(work_dir)
+    if args.json:
+        with open(args.json, 'w') as json_handle:
+            json.dump(report, json_handle, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
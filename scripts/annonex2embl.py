@@ -13,7 +13,9 @@ annonex2embl wrapper
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
 
-import Annonex2emblMain as AN2EMBLMain
+# Note: Module Annonex2emblMain is only imported after the arguments 
+# were parsed, so that "--help", "--version" and argument errors do not 
+# incur its import time
 
 ###############
 # AUTHOR INFO #
@@ -28,7 +30,7 @@ __version__ = '2017.02.02.1000'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ####################
@@ -130,6 +132,61 @@ if __name__ == '__main__':
                         default='1',
                         required=False)
 
+    parser.add_argument('--cachedir',
+                        help='Path to a directory in which the results of Entrez lookups are cached between runs; Example: /home/username/.annonex2embl',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--cachettl',
+                        help='Number of days after which cached Entrez lookups expire.',
+                        default='30',
+                        required=False)
+
+    parser.add_argument('--offline',
+                        help='A logical; Shall gene products be obtained from the cache only (i.e., without querying Entrez)?',
+                        default='False',
+                        required=False)
+
+    parser.add_argument('--jobs',
+                        help='Number of worker processes among which the sequences are distributed.',
+                        default='1',
+                        required=False)
+
+    parser.add_argument('--taxdump',
+                        help='Path to the file names.dmp of a local NCBI taxdump (or to the directory containing it); if given, taxon names are checked against this file instead of NCBI Taxonomy; Example: /home/username/taxdump',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--taxdump-index',
+                        help='Path to the index file that is generated from the taxdump upon first use; by default, the index is placed next to names.dmp or, if that directory is not writable, in the directory given via --cachedir; Example: /home/username/.annonex2embl/names.dmp.sqlite',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--profile-report',
+                        help='Path to a report on the wall time and the number of calls of each step, as well as the number of Entrez requests and of bytes written; the report is written in JSON format if the file name ends with .json, otherwise as a table (a file name of - prints the table to the screen); Example: /home/username/profile.json',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--apikey',
+                        help='An NCBI API key; if given, up to 10 instead of 3 Entrez requests per second are sent',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--lowmem',
+                        help='A logical; Shall the sequences be read from the NEXUS file one at a time instead of being held in memory (at one byte per alignment position)?',
+                        default='False',
+                        required=False)
+
+    parser.add_argument('--resume',
+                        help='A logical; Shall an interrupted conversion be resumed from its last checkpoint (i.e., the file <outfile>.ckpt)? The outfile is truncated to the last checkpoint and the conversion continues with the next sequence; use --cachedir to retain the Entrez lookups across the restart',
+                        default='False',
+                        required=False)
+
+    parser.add_argument('--checkpoint-every',
+                        help='Number of records after which the progress of the conversion is recorded in the file <outfile>.ckpt (0 disables checkpoints); the file is removed once the conversion has completed',
+                        default='100',
+                        required=False)
+
     parser.add_argument('--version', 
                         help='Print version information and exit',
                         action='version',
@@ -141,11 +198,16 @@ if __name__ == '__main__':
         parser.error(" ERROR: --cltype requires --clmode.")
     if args.clmode == 'False' and args.cltype is not None:
         parser.error(" ERROR: --cltype requires --clmode to be `True`.")
+    if args.offline == 'True' and args.cachedir is None:
+        parser.error(" ERROR: --offline requires --cachedir.")
+    if args.taxdump_index is not None and args.taxdump is None:
+        parser.error(" ERROR: --taxdump-index requires --taxdump.")
 
 ########
 # MAIN #
 ########
 
+    import Annonex2emblMain as AN2EMBLMain
     AN2EMBLMain.annonex2embl(   args.nexus,
                                 args.csv,
                                 args.descript,
@@ -160,4 +222,15 @@ if __name__ == '__main__':
                                 args.taxdiv,
                                 args.collabel,
                                 args.ttable,
-                                args.seqvers )
+                                args.seqvers,
+                                args.cachedir,
+                                args.cachettl,
+                                args.offline,
+                                args.jobs,
+                                args.taxdump,
+                                args.profile_report,
+                                args.apikey,
+                                args.lowmem,
+                                args.resume,
+                                args.checkpoint_every,
+                                args.taxdump_index )
@@ -0,0 +1,222 @@
+#!/usr/bin/env python2.7
+'''
+annonex2embl wrapper for batch runs (i.e., many pairs of NEXUS and CSV files
+converted in one process)
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+# Note: Module BatchOps is only imported after the arguments 
+# were parsed, so that "--help", "--version" and argument errors do not 
+# incur its import time
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.09.1500'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+########
+# TODO #
+########
+
+############
+# ARGPARSE #
+############
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="  --  ".join([__author__, __copyright__, __info__, __version__]))
+    
+    # Required
+    jobs_group = parser.add_mutually_exclusive_group(required=True)
+    jobs_group.add_argument('-m',
+                        '--manifest',
+                        help='absolute path to a manifest listing one job per entry; either a tab-separated file with a header line or a JSON file containing a list of objects; each entry requires the fields nexus, csv, descript and outfile (relative paths are interpreted relative to the manifest) and may set the fields tax_check, checklist_mode, checklist_type, linemask, topology, tax_division, uniq_seqid_col, transl_table and seq_version; Example: /path_to_input/manifest.tsv',
+                        default=None)
+
+    jobs_group.add_argument('-g',
+                        '--glob',
+                        help='pattern matching the NEXUS files to be converted; each NEXUS file requires a CSV file of the same name; Example: "/path_to_input/*.nex"',
+                        default=None)
+
+    parser.add_argument('-e',
+                        '--email',
+                        help='Your email address.',
+                        default='my.username@gmail.com',
+                        required=True)
+
+    parser.add_argument('-d',
+                        '--descript',
+                        help='text string characterizing the DNA alignments; required with --glob; Example: "chloroplast trnR-atpA intergenic spacer"',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('-o',
+                        '--outdir',
+                        help='absolute path to the directory to which the outfiles are written; required with --glob; Example: /path_to_output',
+                        default=None,
+                        required=False)
+
+    # Optional
+    parser.add_argument('--taxcheck',
+                        help='A logical; Shall taxon names be checked against NCBI Taxonomy?',
+                        default='False',
+                        required=False)
+
+    parser.add_argument('--clmode',
+                        help='A logical; Shall the output be checklists?',
+                        default='False',
+                        required=False)
+
+    parser.add_argument('--cltype',
+                        help='Any of the currently implemented checklist types (i.e. `trnK_matK`)',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--linemask',
+                        help='A logical; Shall the ID and the AC lines be masked for Entry Upload submissions?',
+                        default='False',
+                        required=False)
+                        
+    parser.add_argument('--topol',
+                        help='`circular` or `linear`.', 
+                        default='linear',
+                        required=False)
+                        
+    parser.add_argument('--taxdiv',
+                        help='Any of the three letter codes specified in section 3.2 of the EMBL user manual.', 
+                        default='PLN',
+                        required=False)
+
+    parser.add_argument('--collabel',
+                        #metavar='column specifying sequence names',
+                        help='Name of column that specifies the sequence names.',
+                        default='isolate',
+                        required=False)
+
+    parser.add_argument('--ttable',
+                        #metavar='translation table',
+                        help='Number of the translation table to translate coding regions with.'\
+                        'For details, see: http://www.ncbi.nlm.nih.gov/Taxonomy/Utils/wprintgc.cgi',
+                        default='11',
+                        required=False)
+
+    parser.add_argument('--seqvers',
+                        #metavar='sequence version',
+                        help='An integer',
+                        default='1',
+                        required=False)
+
+    parser.add_argument('--cachedir',
+                        help='Path to a directory in which the results of Entrez lookups are cached between runs; Example: /home/username/.annonex2embl',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--cachettl',
+                        help='Number of days after which cached Entrez lookups expire.',
+                        default='30',
+                        required=False)
+
+    parser.add_argument('--offline',
+                        help='A logical; Shall gene products be obtained from the cache only (i.e., without querying Entrez)?',
+                        default='False',
+                        required=False)
+
+    parser.add_argument('--taxdump',
+                        help='Path to the file names.dmp of a local NCBI taxdump (or to the directory containing it); if given, taxon names are checked against this file instead of NCBI Taxonomy; Example: /home/username/taxdump',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--apikey',
+                        help='An NCBI API key; if given, up to 10 instead of 3 Entrez requests per second are sent',
+                        default=None,
+                        required=False)
+
+    parser.add_argument('--lowmem',
+                        help='A logical; Shall the sequences be read from the NEXUS file one at a time instead of being held in memory (at one byte per alignment position)?',
+                        default='False',
+                        required=False)
+
+    parser.add_argument('--workers',
+                        help='Number of worker processes among which the jobs are distributed.',
+                        default='1',
+                        required=False)
+
+    parser.add_argument('--summary',
+                        help='Path to a summary on the status and the wall time of each job; the summary is written in JSON format if the file name ends with .json, otherwise as a tab-separated table (a file name of - prints a table to the screen); Example: /home/username/summary.tsv',
+                        default='-',
+                        required=False)
+
+    parser.add_argument('--version', 
+                        help='Print version information and exit',
+                        action='version',
+                        version='%(prog)s ' + __version__)
+
+    args = parser.parse_args()
+    
+    if args.clmode is None and args.cltype is not None:
+        parser.error(" ERROR: --cltype requires --clmode.")
+    if args.clmode == 'False' and args.cltype is not None:
+        parser.error(" ERROR: --cltype requires --clmode to be `True`.")
+    if args.offline == 'True' and args.cachedir is None:
+        parser.error(" ERROR: --offline requires --cachedir.")
+    if args.glob is not None and (args.descript is None or args.outdir is None):
+        parser.error(" ERROR: --glob requires --descript and --outdir.")
+
+########
+# MAIN #
+########
+
+    import BatchOps as BtOps
+    import MyExceptions as ME
+    common_kwargs = {'tax_check': args.taxcheck,
+                     'checklist_mode': args.clmode,
+                     'checklist_type': args.cltype,
+                     'linemask': args.linemask,
+                     'topology': args.topol,
+                     'tax_division': args.taxdiv,
+                     'uniq_seqid_col': args.collabel,
+                     'transl_table': args.ttable,
+                     'seq_version': args.seqvers,
+                     'cache_dir': args.cachedir,
+                     'cache_ttl': args.cachettl,
+                     'offline': args.offline,
+                     'taxdump': args.taxdump,
+                     'api_key': args.apikey,
+                     'low_memory': args.lowmem}
+    try:
+        if args.manifest is not None:
+            jobs = BtOps.BatchJobs.from_manifest(args.manifest)
+        else:
+            jobs = BtOps.BatchJobs.from_pattern(args.glob, args.descript,
+                args.outdir)
+        statuses = BtOps.BatchRun(args.email, common_kwargs,
+            args.workers).run(jobs)
+        BtOps.BatchRun.write_summary(statuses, args.summary)
+    except ME.MyException as e:
+        sys.exit('%s annonex2embl ERROR: %s' % ('\n', e))
+    if any(status['status'] != 'ok' for status in statuses):
+        sys.exit(1)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the start-up of the module `Annonex2emblMain` and of the 
+script `annonex2embl.py`, as well as for the conversion itself
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.09.1000'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'scripts', 'annonex2embl.py')
+
+data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'data', 'input')
+
+# Maximal wall time (in seconds) of a call of the script that ends 
+# after parsing the arguments (e.g., "--version"); this includes the 
+# start-up of the interpreter
+startup_budget = 1.0
+
+# Modules that must not be imported unless a run requires them
+heavy_modules = ['Bio', 'pdb', 'sqlite3', 'unidecode', 'multiprocessing']
+
+###########
+# CLASSES #
+###########
+
+class StartupTestCases(unittest.TestCase):
+    ''' Tests for the start-up time of the program '''
+
+    @staticmethod
+    def _loaded_modules(code):
+        ''' Runs <code> in a fresh interpreter and returns the names of 
+        the heavy modules that were imported. '''
+        import subprocess
+        probe = 'import sys\n%s\nprint(" ".join(m for m in %r if m in '\
+            'sys.modules))' % (code, heavy_modules)
+        return subprocess.check_output([sys.executable, '-c', probe], 
+            cwd=os.path.dirname(script_path)).split()
+
+    def test_1_Startup(self):
+        ''' This test evaluates the case where the main module is 
+        imported; no heavy module must be imported. '''
+        self.assertEqual(StartupTestCases._loaded_modules(
+            'sys.path.insert(0, %r)\nimport Annonex2emblMain' % 
+            (os.path.join(os.path.dirname(script_path), '..', 
+            'annonex2embl'))), [])
+
+    def test_2_Startup(self):
+        ''' This test evaluates the case where the script is called with 
+        "--version"; no heavy module must be imported, and the call must 
+        finish within the start-up budget. '''
+        import subprocess
+        import time
+        self.assertEqual(StartupTestCases._loaded_modules(
+            'import runpy\nsys.argv = [%r, "--version"]\ntry:\n'\
+            '    runpy.run_path(%r, run_name="__main__")\n'\
+            'except SystemExit:\n    pass' % (script_path, script_path)), [])
+        with open(os.devnull, 'w') as devnull:
+            elapsed = []
+            for _ in range(3):
+                start = time.time()
+                subprocess.check_call([sys.executable, script_path, 
+                    '--version'], stdout=devnull, stderr=devnull)
+                elapsed.append(time.time() - start)
+        self.assertLess(min(elapsed), startup_budget)
+
+
+class ConversionTestCases(unittest.TestCase):
+    ''' Tests for the conversion of a NEXUS and a CSV file '''
+
+    def setUp(self):
+        import tempfile
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path_to_nex = os.path.join(data_path, 'Pyrus_trnR_atpA.nex')
+        self.path_to_csv = os.path.join(data_path, 'Pyrus_trnR_atpA.csv')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmp_dir)
+
+    def test_1_Conversion(self):
+        ''' This test evaluates the case where a conversion that uses 
+        worker processes is interrupted in the parent process; no worker 
+        process must outlive the conversion. '''
+        import multiprocessing
+        import Annonex2emblMain as AN2EMBLMain
+        import CheckpointOps as CpOps
+        def interrupt(self, seq_name, outp_handle):
+            raise KeyboardInterrupt
+        completed = CpOps.Checkpoint.completed
+        CpOps.Checkpoint.completed = interrupt
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                AN2EMBLMain.annonex2embl(self.path_to_nex, 
+                    self.path_to_csv, 'foo', 'my.username@gmail.com', 
+                    os.path.join(self.tmp_dir, 'out.embl'), jobs='2')
+        finally:
+            CpOps.Checkpoint.completed = completed
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_2_Conversion(self):
+        ''' This test evaluates the case where a conversion is
+        interrupted while a record is generated and resumed after a
+        partial record was appended to the outfile; the outfile must be
+        identical to that of an uninterrupted conversion. '''
+        import Annonex2emblMain as AN2EMBLMain
+        complete = AN2EMBLMain.ProcessSeqRecord._complete
+        calls = []
+        def interrupt(self, *args):
+            calls.append(None)
+            if len(calls) == 6:
+                sys.exit('interrupted')
+            return complete(self, *args)
+        path_to_ideal, path_to_outfile = self._convert_interrupted(
+            AN2EMBLMain.ProcessSeqRecord, '_complete', interrupt, 
+            SystemExit)
+        with open(path_to_outfile, 'a') as outp_handle:
+            outp_handle.write('ID   partial record')
+        self._resume(path_to_ideal, path_to_outfile)
+
+    def test_3_Conversion(self):
+        ''' This test evaluates the case where a conversion is
+        interrupted after a record was written, but before it was
+        registered in the checkpoint; upon resumption, the record must
+        be written exactly once. '''
+        import CheckpointOps as CpOps
+        completed = CpOps.Checkpoint.completed
+        calls = []
+        def interrupt(self, seq_name, outp_handle):
+            calls.append(seq_name)
+            if len(calls) == 5:
+                raise KeyboardInterrupt
+            return completed(self, seq_name, outp_handle)
+        path_to_ideal, path_to_outfile = self._convert_interrupted(
+            CpOps.Checkpoint, 'completed', interrupt, KeyboardInterrupt)
+        self._resume(path_to_ideal, path_to_outfile)
+
+    def test_4_Conversion(self):
+        ''' This test evaluates the case where a conversion is resumed, 
+        but the outfile is not empty and there is no checkpoint; the 
+        conversion must not be resumed. '''
+        import Annonex2emblMain as AN2EMBLMain
+        path_to_outfile = os.path.join(self.tmp_dir, 'out.embl')
+        with open(path_to_outfile, 'w') as outp_handle:
+            outp_handle.write('ID   partial record')
+        with self.assertRaises(SystemExit):
+            AN2EMBLMain.annonex2embl(self.path_to_nex, self.path_to_csv, 
+                'foo', 'my.username@gmail.com', path_to_outfile, 
+                resume='True')
+        with open(path_to_outfile) as outp_handle:
+            self.assertEqual(outp_handle.read(), 'ID   partial record')
+
+    def test_5_Conversion(self):
+        ''' This test evaluates the case where a batch of sequences is 
+        interrupted while a sequence is prepared; the interruption must 
+        not be delayed until the preceding seq_records were generated, 
+        unlike an error. '''
+        import Annonex2emblMain as AN2EMBLMain
+        def prepare(self, task):
+            if task[0] == 1:
+                raise exc_type
+            return task
+        def complete(self, item, transl_outcomes, outp_handle):
+            return item
+        record_processor = AN2EMBLMain.ProcessSeqRecord(*[None]*15)
+        record_processor._prepare = prepare.__get__(record_processor)
+        record_processor._complete = complete.__get__(record_processor)
+        record_processor._scan_coding_regions = lambda prepared: {}
+        tasks = [(0, 'taxon_A'), (1, 'taxon_B')]
+        exc_type = ValueError
+        batch = record_processor.go_batch(tasks)
+        self.assertEqual(next(batch), (0, 'taxon_A'))
+        with self.assertRaises(ValueError):
+            next(batch)
+        exc_type = KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            next(record_processor.go_batch(tasks))
+
+    def test_6_Conversion(self):
+        ''' This test evaluates the case where a conversion with a 
+        cache and a profile report fails; the outfile and the cache 
+        must be closed, and profiling must be deactivated. '''
+        import Annonex2emblMain as AN2EMBLMain
+        import CachingOps as CaOps
+        import CheckpointOps as CpOps
+        import ProfilingOps as PfOps
+        handles, closed = [], []
+        def start(self, outp_handle):
+            handles.append(outp_handle)
+        def close(self):
+            closed.append(self)
+            cache_close(self)
+        def complete(self, *args):
+            sys.exit('failed')
+        cache_close = CaOps.EntrezCache.close
+        patches = [(CpOps.Checkpoint, 'start', start), (CaOps.EntrezCache, 
+            'close', close), (AN2EMBLMain.ProcessSeqRecord, '_complete', 
+            complete)]
+        originals = [getattr(cls, attr) for cls, attr, _ in patches]
+        for cls, attr, function in patches:
+            setattr(cls, attr, function)
+        try:
+            with self.assertRaises(SystemExit):
+                AN2EMBLMain.annonex2embl(self.path_to_nex, 
+                    self.path_to_csv, 'foo', 'my.username@gmail.com', 
+                    os.path.join(self.tmp_dir, 'out.embl'), 
+                    cache_dir=self.tmp_dir, profile_report=os.path.join(
+                    self.tmp_dir, 'profile.txt'))
+        finally:
+            for (cls, attr, _), original in zip(patches, originals):
+                setattr(cls, attr, original)
+        self.assertTrue(handles[0].closed)
+        self.assertEqual(len(closed), 1)
+        self.assertFalse(PfOps.profiler.enabled)
+
+    def _convert_interrupted(self, cls, attr, interrupt, exception):
+        ''' An internal function to perform an uninterrupted conversion 
+        and a conversion that is interrupted by function <interrupt>, 
+        which temporarily replaces attribute <attr> of class <cls>. '''
+        import Annonex2emblMain as AN2EMBLMain
+        path_to_ideal = os.path.join(self.tmp_dir, 'ideal.embl')
+        path_to_outfile = os.path.join(self.tmp_dir, 'out.embl')
+        AN2EMBLMain.annonex2embl(self.path_to_nex, self.path_to_csv, 
+            'foo', 'my.username@gmail.com', path_to_ideal, 
+            checkpoint_every='2')
+        original = getattr(cls, attr)
+        setattr(cls, attr, interrupt)
+        try:
+            with self.assertRaises(exception):
+                AN2EMBLMain.annonex2embl(self.path_to_nex, 
+                    self.path_to_csv, 'foo', 'my.username@gmail.com', 
+                    path_to_outfile, checkpoint_every='2')
+        finally:
+            setattr(cls, attr, original)
+        self.assertTrue(os.path.isfile(path_to_outfile + '.ckpt'))
+        return path_to_ideal, path_to_outfile
+
+    def _resume(self, path_to_ideal, path_to_outfile):
+        ''' An internal function to resume an interrupted conversion and 
+        to compare its outfile to that of the uninterrupted one. '''
+        import Annonex2emblMain as AN2EMBLMain
+        AN2EMBLMain.annonex2embl(self.path_to_nex, self.path_to_csv, 
+            'foo', 'my.username@gmail.com', path_to_outfile, 
+            resume='True', checkpoint_every='2')
+        with open(path_to_ideal) as ideal_handle:
+            with open(path_to_outfile) as outp_handle:
+                self.assertEqual(outp_handle.read(), ideal_handle.read())
+        self.assertFalse(os.path.isfile(path_to_outfile + '.ckpt'))
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `BatchOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import MyExceptions as ME
+import BatchOps as BtOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.09.1500'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'data', 'input')
+
+###########
+# CLASSES #
+###########
+
+class BatchJobsTestCases(unittest.TestCase):
+    ''' Tests for class `BatchJobs` '''
+
+    def setUp(self):
+        import tempfile
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmp_dir)
+
+    def test_1_BatchJobs(self):
+        ''' This test evaluates the case where a tab-separated and a
+        JSON manifest list the same jobs; relative paths must be
+        interpreted relative to the manifest. '''
+        import json
+        path_to_tsv = os.path.join(self.tmp_dir, 'manifest.tsv')
+        with open(path_to_tsv, 'w') as tsv_handle:
+            tsv_handle.write('nexus\tcsv\tdescript\toutfile\ttransl_table\n'\
+                'a.nex\ta.csv\ttrnK-matK\tout/a.embl\t\n'\
+                '/data/b.nex\t/data/b.csv\tITS\tb.embl\t1\n\n')
+        path_to_json = os.path.join(self.tmp_dir, 'manifest.json')
+        with open(path_to_json, 'w') as json_handle:
+            json.dump([{'nexus': 'a.nex', 'csv': 'a.csv', 'descript':
+                'trnK-matK', 'outfile': 'out/a.embl'}, {'nexus':
+                '/data/b.nex', 'csv': '/data/b.csv', 'descript': 'ITS',
+                'outfile': 'b.embl', 'transl_table': 1}], json_handle)
+        out_ideal = [{'nexus': os.path.join(self.tmp_dir, 'a.nex'),
+            'csv': os.path.join(self.tmp_dir, 'a.csv'), 'descript':
+            'trnK-matK', 'outfile': os.path.join(self.tmp_dir, 'out',
+            'a.embl'), 'options': {}}, {'nexus': '/data/b.nex',
+            'csv': '/data/b.csv', 'descript': 'ITS', 'outfile':
+            os.path.join(self.tmp_dir, 'b.embl'), 'options':
+            {'transl_table': '1'}}]
+        self.assertEqual(BtOps.BatchJobs.from_manifest(path_to_tsv),
+            out_ideal)
+        self.assertEqual(BtOps.BatchJobs.from_manifest(path_to_json),
+            out_ideal)
+
+    def test_2_BatchJobs(self):
+        ''' This test evaluates the case where a manifest entry lacks a
+        required field or contains an unknown field. '''
+        path_to_tsv = os.path.join(self.tmp_dir, 'manifest.tsv')
+        for line in ['nexus\tcsv\tdescript\n' 'a.nex\ta.csv\tITS\n',
+            'nexus\tcsv\tdescript\toutfile\tjobs\n'\
+            'a.nex\ta.csv\tITS\ta.embl\t2\n']:
+            with open(path_to_tsv, 'w') as tsv_handle:
+                tsv_handle.write(line)
+            with self.assertRaises(ME.MyException):
+                BtOps.BatchJobs.from_manifest(path_to_tsv)
+
+    def test_3_BatchJobs(self):
+        ''' This test evaluates the case where the jobs are compiled from
+        the NEXUS files matching a pattern; each NEXUS file must be
+        paired with the CSV file of the same name. '''
+        jobs = BtOps.BatchJobs.from_pattern(os.path.join(data_path,
+            'Pyrus_*.nex'), 'foo', self.tmp_dir)
+        self.assertEqual([(os.path.basename(job['nexus']),
+            os.path.basename(job['csv']), job['outfile']) for job in jobs],
+            [('Pyrus_trnK_matK.nex', 'Pyrus_trnK_matK.csv',
+            os.path.join(self.tmp_dir, 'Pyrus_trnK_matK.embl')),
+            ('Pyrus_trnR_atpA.nex', 'Pyrus_trnR_atpA.csv',
+            os.path.join(self.tmp_dir, 'Pyrus_trnR_atpA.embl'))])
+        with self.assertRaises(ME.MyException):
+            BtOps.BatchJobs.from_pattern(os.path.join(data_path,
+                'TestData_1_*.nex'), 'foo', self.tmp_dir)
+
+
+class BatchRunTestCases(unittest.TestCase):
+    ''' Tests for class `BatchRun` '''
+
+    def test_1_BatchRun(self):
+        ''' This test evaluates the case where a job fails; the failure
+        must be recorded in the status of the job rather than halt the
+        batch run. '''
+        import tempfile
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            jobs = [{'nexus': os.path.join(tmp_dir, 'missing.nex'),
+                'csv': os.path.join(tmp_dir, 'missing.csv'), 'descript':
+                'foo', 'outfile': os.path.join(tmp_dir, 'missing.embl'),
+                'options': {}}] * 2
+            statuses = BtOps.BatchRun('my.username@gmail.com').run(jobs)
+            self.assertEqual([status['status'] for status in statuses],
+                ['failed', 'failed'])
+            self.assertTrue(statuses[0]['message'])
+            path_to_summary = os.path.join(tmp_dir, 'summary.tsv')
+            BtOps.BatchRun.write_summary(statuses, path_to_summary)
+            with open(path_to_summary) as summary_handle:
+                lines = summary_handle.read().splitlines()
+            self.assertEqual(lines[0], 'nexus\toutfile\tstatus\tseconds'\
+                '\tmessage')
+            self.assertEqual(len(lines), 3)
+        finally:
+            import shutil
+            shutil.rmtree(tmp_dir)
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `CachingOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import MyExceptions as ME
+import CachingOps as CaOps
+import ParsingOps as PrOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.03.1200'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+###########
+# CLASSES #
+###########
+
+class EntrezCacheTestCases(unittest.TestCase):
+    ''' Tests for class `EntrezCache` '''
+
+    def setUp(self):
+        import tempfile
+        self.cache_dir = tempfile.mkdtemp()
+        PrOps.GetEntrezInfo._gene_product_memo.clear()
+        PrOps.GetEntrezInfo._taxon_memo.clear()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.cache_dir)
+        PrOps.GetEntrezInfo._gene_product_memo.clear()
+        PrOps.GetEntrezInfo._taxon_memo.clear()
+
+    def test_1_EntrezCache(self):
+        ''' This test evaluates the case where a value is stored and
+        retrieved again, also after the cache has been reopened. '''
+        cache = CaOps.EntrezCache(self.cache_dir)
+        self.assertIsNone(cache.get('gene_product', 'matK'))
+        cache.set('gene_product', 'matK', 'maturase K')
+        self.assertEqual(cache.get('gene_product', 'matK'), 'maturase K')
+        cache.close()
+        cache = CaOps.EntrezCache(self.cache_dir)
+        self.assertEqual(cache.get('gene_product', 'matK'), 'maturase K')
+        self.assertIsNone(cache.get('taxon_hitcount', 'matK'))
+        cache.close()
+
+    def test_2_EntrezCache(self):
+        ''' This test evaluates the case where a cached value has
+        expired. '''
+        import time
+        cache = CaOps.EntrezCache(self.cache_dir, ttl_days=1e-7)
+        cache.set('gene_product', 'matK', 'maturase K')
+        time.sleep(0.05)
+        self.assertIsNone(cache.get('gene_product', 'matK'))
+        cache.close()
+
+    def test_3_EntrezCache(self):
+        ''' This test evaluates the case where a gene product is
+        obtained via GetEntrezInfo in offline mode, both for a cached
+        and for a non-cached gene symbol. '''
+        cache = CaOps.EntrezCache(self.cache_dir, offline=True)
+        cache.set('gene_product', 'matK', 'maturase K')
+        handle = PrOps.GetEntrezInfo('m.gruenstaeudl@fu-berlin.de', cache)
+        self.assertEqual(handle.obtain_gene_product('matK'), 'maturase K')
+        with self.assertRaises(ME.MyException):
+            handle.obtain_gene_product('psbI')
+        cache.close()
+
+    def test_4_EntrezCache(self):
+        ''' This test evaluates the case where a charset name is parsed
+        in offline mode. '''
+        cache = CaOps.EntrezCache(self.cache_dir, offline=True)
+        cache.set('gene_product', 'matK', 'maturase K')
+        out_ideal = ('matK', 'CDS', 'maturase K')
+        out_actual = PrOps.ParseCharsetName('matK_CDS',
+            'm.gruenstaeudl@fu-berlin.de', cache).parse()
+        self.assertTupleEqual(out_actual, out_ideal)
+        cache.close()
+
+
+class LRUCacheTestCases(unittest.TestCase):
+    ''' Tests for class `LRUCache` '''
+
+    def test_1_LRUCache(self):
+        ''' This test evaluates the case where the maximum number of 
+        entries is exceeded; the least recently used entry must be 
+        discarded. '''
+        cache = CaOps.LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
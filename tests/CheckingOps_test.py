@@ -32,7 +32,7 @@ __version__ = '2017.02.01.1100'
 # DEBUGGING #
 #############
 
-import pdb
+#import pdb
 #pdb.set_trace()
 
 ####################
@@ -107,8 +107,162 @@ class AnnoChecksTestCases(unittest.TestCase):
             CkOps.AnnoCheck(extract, feature, record_id).for_unittest()
 
 
-#class TranslCheckTestCases(unittest.TestCase):
-#    ''' Tests for class `TranslCheck` '''
+class TranslEngineTestCases(unittest.TestCase):
+    ''' Tests for class `TranslEngine` '''
+
+    def test_1_TranslEngine(self):
+        ''' This test evaluates the cases where a complete CDS (with an 
+        alternative start codon), a coding region with an internal stop 
+        codon, a coding region with ambiguous codons and a coding 
+        region with an invalid codon are scanned. '''
+        engine = CkOps.TranslEngine(11)
+        self.assertEqual(engine.scan('GTGATATAA'), ('VI*', 2, True))
+        self.assertEqual(engine.scan('atgtgaataTAA'), ('M*I*', 1, False))
+        self.assertEqual(engine.scan('ATGNNNTARTA'), ('MX*', 2, False))
+        self.assertEqual(engine.scan('ATG?TATAA'), (None, -1, False))
+        self.assertEqual(CkOps.TranslEngine(2).scan('ATGTGAAGA'), 
+            ('MW*', 2, True))
+
+    def test_2_TranslEngine(self):
+        ''' This test evaluates the case where random coding regions are 
+        checked under different translation tables; the results of 
+        function `check` of class `AnnoCheck` must be identical to those 
+        of function `check_reference`, which translates via Biopython. '''
+        import random
+        import warnings
+        from Bio.Seq import Seq
+        from Bio.Alphabet import IUPAC
+        from Bio.SeqFeature import FeatureLocation, SeqFeature
+        def outcome(function):
+            try:
+                transl, loc = function()
+                return (str(transl), str(loc))
+            except ME.MyException as e:
+                return str(e)
+        rand = random.Random(1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for _ in range(300):
+                seq_str = rand.choice(['ATG', 'GTG', 'TTG', 'AAG']) + \
+                    ''.join(rand.choice('ACGTN') for _ in range(
+                    rand.randint(0, 30))) + rand.choice(['TAA', 'TGA', 
+                    'AGA', ''])
+                feature = SeqFeature(FeatureLocation(0, len(seq_str)), 
+                    id='foobar', type='CDS')
+                anno_check = CkOps.AnnoCheck(Seq(seq_str, 
+                    IUPAC.IUPACAmbiguousDNA()), feature, 'foobar', 
+                    rand.choice([1, 2, 4, 11]))
+                self.assertEqual(outcome(anno_check.check), 
+                    outcome(lambda: check_reference(anno_check)))
+
+    def test_3_TranslEngine(self):
+        ''' This test evaluates the case where sequences of different 
+        lengths (including sequences with ambiguous or invalid letters 
+        and sequences shorter than a codon) are scanned as a batch; the 
+        results must be identical to those of individual scans. '''
+        import random
+        rand = random.Random(1)
+        seq_strs = ['', 'AT', 'ATGNNNTAA', 'atgtgaTAG', 'ATG?TATAA'] + [
+            ''.join(rand.choice('ACGT') for _ in range(rand.randint(3, 
+            60))) for _ in range(50)]
+        for transl_table in [1, 11]:
+            engine = CkOps.TranslEngine(transl_table)
+            self.assertEqual(engine.scan_batch(seq_strs), 
+                [engine.scan(seq_str) for seq_str in seq_strs])
+
+
+    def test_4_TranslEngine(self):
+        ''' This test evaluates the case where codons of all (also 
+        ambiguous or invalid) letters are translated; the translations 
+        must be identical to those of function `translate` of Bio.Seq, 
+        and invalid codons must be translated as an empty string. '''
+        import itertools
+        from Bio.Seq import translate
+        from Bio.Data.CodonTable import TranslationError
+        for transl_table in [1, 2, 11]:
+            engine = CkOps.TranslEngine(transl_table)
+            for codon in itertools.product('ACGTUNRYW?-', repeat=3):
+                codon = ''.join(codon)
+                try:
+                    out_ideal = translate(codon, table=transl_table)
+                except TranslationError:
+                    out_ideal = ''
+                self.assertEqual(CkOps.TranslEngine._translate_codon(
+                    codon, engine.codon_table), out_ideal)
+
+
+class TranslCheckTestCases(unittest.TestCase):
+    ''' Tests for class `TranslCheck` '''
+
+    def test_1_TranslCheck(self):
+        ''' This test evaluates the case where two seq_records contain 
+        an identical coding region with an internal stop codon at 
+        different positions; the translation of the second coding region 
+        must be taken from the cache, but its feature location must be 
+        truncated relative to its own start. '''
+        from Bio.Seq import Seq
+        from Bio.Alphabet import generic_dna
+        from Bio.SeqRecord import SeqRecord
+        from Bio.SeqFeature import FeatureLocation
+        from Bio import SeqFeature
+        import ProfilingOps as PfOps
+        CkOps.TranslCheck._transl_cache.clear()
+        profiler = PfOps.enable()
+        try:
+            features = []
+            for record_id, start in [('taxon_A', 0), ('taxon_B', 6)]:
+                seq_record = SeqRecord(Seq('C'*start + 'ATGAAATGAAAATAG' + 
+                    'CC', generic_dna), id=record_id)
+                feature = SeqFeature.SeqFeature(FeatureLocation(start, 
+                    start+15), id='matK', type='CDS')
+                features.append(CkOps.TranslCheck().\
+                    transl_and_quality_of_transl(seq_record, feature, 11))
+        finally:
+            PfOps.disable()
+        self.assertEqual([str(f.qualifiers['translation']) for f in 
+            features], ['MK', 'MK'])
+        self.assertEqual([(f.location.start, f.location.end) for f in 
+            features], [(0, 6), (6, 12)])
+        self.assertEqual((profiler.counters['transl_cache_hits'], 
+            profiler.counters['transl_cache_misses']), (1, 1))
+
+
+    def test_2_TranslCheck(self):
+        ''' This test evaluates the case where the coding regions of a 
+        batch are translated together; only coding regions absent from 
+        the cache must be translated, their outcomes must be added to 
+        the cache, and each must count as a single miss. '''
+        from Bio.Seq import Seq
+        from Bio.Alphabet import generic_dna
+        from Bio.SeqRecord import SeqRecord
+        from Bio.SeqFeature import FeatureLocation
+        from Bio import SeqFeature
+        import ProfilingOps as PfOps
+        CkOps.TranslCheck._transl_cache.clear()
+        seq_strs = ['ATGAAATGAAAATAG', 'ATGAAATAG', 'ATGAAATGAAAATAG']
+        profiler = PfOps.enable()
+        try:
+            outcomes = CkOps.TranslCheck.cache_outcomes(seq_strs, 11, 
+                generic_dna)
+            self.assertEqual(sorted(outcomes.keys()), sorted(set(seq_strs)))
+            self.assertEqual(CkOps.TranslCheck.cache_outcomes(seq_strs, 11, 
+                generic_dna), {})
+            features = []
+            for record_id in ['taxon_A', 'taxon_B']:
+                seq_record = SeqRecord(Seq(seq_strs[0], generic_dna), 
+                    id=record_id)
+                feature = SeqFeature.SeqFeature(FeatureLocation(0, 15), 
+                    id='matK', type='CDS')
+                features.append(CkOps.TranslCheck().\
+                    transl_and_quality_of_transl(seq_record, feature, 11, 
+                    outcomes))
+        finally:
+            PfOps.disable()
+        self.assertEqual([str(f.qualifiers['translation']) for f in 
+            features], ['MK', 'MK'])
+        self.assertEqual(sorted(outcomes.keys()), ['ATGAAATAG'])
+        self.assertEqual((profiler.counters['transl_cache_hits'], 
+            profiler.counters['transl_cache_misses']), (1, 2))
 
 
 class QualifierCheckTestCases(unittest.TestCase):
@@ -149,6 +303,18 @@ class QualifierCheckTestCases(unittest.TestCase):
         with self.assertRaises(ME.MyException):
             CkOps.QualifierCheck._label_present(lst_of_dcts, label)
     
+    def test_QualifierCheck__seqnames_present__1(self):
+        ''' Test to evaluate the static method `_seqnames_present` of class 
+            `QualifierCheck`.
+            This test evaluates the situation where a sequence name is not 
+            among the keys of the qualifier index. '''
+        index = {'taxon_A': {'isolate': 'taxon_A'}}
+        self.assertTrue(CkOps.QualifierCheck._seqnames_present(index,
+            ['taxon_A'], 'isolate'))
+        with self.assertRaises(ME.MyException):
+            CkOps.QualifierCheck._seqnames_present(index,
+                ['taxon_A', 'taxon_B'], 'isolate')
+
     def test_QualifierCheck__rm_empty_qual__1(self):
         ''' Test to evaluate the static method `_rm_empty_modifier` of class 
             `QualifierCheck`.
@@ -163,6 +329,35 @@ class QualifierCheckTestCases(unittest.TestCase):
         out_actual = CkOps.QualifierCheck._rm_empty_qual(lst_of_dcts)
         self.assertEqual(out_actual, out_ideal)
     
+    def test_QualifierCheck__to_ASCII__1(self):
+        ''' Test to evaluate the static method `_to_ASCII` of class 
+            `QualifierCheck`.
+            This test evaluates the situation where ASCII and non-ASCII 
+            values are converted; only the latter must be memoized. '''
+        CkOps.QualifierCheck._ascii_memo.clear()
+        value = 'Herbarium Berolinense'
+        self.assertIs(CkOps.QualifierCheck._to_ASCII(value), value)
+        for _ in range(2):
+            self.assertEqual(CkOps.QualifierCheck._to_ASCII(
+                'M\xc3\xbcnchen, T\xc3\xbcrkiye'), 'Munchen, Turkiye')
+        memo = CkOps.QualifierCheck._ascii_memo
+        self.assertEqual((len(memo), memo.hits, memo.misses), (1, 1, 1))
+        memo.clear()
+
+    def test_QualifierCheck__valid_header__1(self):
+        ''' Test to evaluate the static method `_valid_header` of class 
+            `QualifierCheck`.
+            This test evaluates the situation where the column labels of 
+            a csv-file are checked once for all rows. '''
+        self.assertTrue(CkOps.QualifierCheck._valid_header(('isolate',
+            'organism', 'country'), 'isolate'))
+        with self.assertRaises(ME.MyException):
+            CkOps.QualifierCheck._valid_header(('organism', 'country'),
+                'isolate')
+        with self.assertRaises(ME.MyException):
+            CkOps.QualifierCheck._valid_header(('isolate', 'foo'),
+                'isolate')
+
     def test_QualifierCheck__valid_INSDC_quals__1(self):
         ''' Test to evaluate example 1 of function `_valid_INSDC_quals` of 
             class `QualifierCheck`.
@@ -210,6 +405,48 @@ class QualifierCheckTestCases(unittest.TestCase):
 # FUNCTIONS #
 #############
 
+def check_reference(anno_check):
+    ''' Reference implementation of function `check` of class
+        `AnnoCheck`, as it was before the function employed class
+        `TranslEngine`: the coding region is translated directly via
+        Biopython (using "cds=True"); if this fails, it is translated
+        with and without regard to internal stop codons, and the
+        feature location is truncated where necessary. '''
+    import GlobalVariables as GlobVars
+    extract = anno_check.extract
+    transl_table = anno_check.transl_table
+    def transl(to_stop=False, cds=False):
+        transl = extract.translate(table=transl_table, to_stop=to_stop,
+            cds=cds)
+        # Adjustment for non-start codons given the necessary use of
+        # cds=True
+        if not extract.startswith(GlobVars.nex2ena_start_codon):
+            first_aa = extract[0:3].translate(table=transl_table,
+                to_stop=to_stop, cds=False)
+            transl = first_aa + transl[1:]
+        return transl
+    try:
+        transl_out = transl(cds=True)
+        feat_loc = anno_check.feature.location
+    except:
+        try:
+            without_internalStop = transl()
+            transl_out = transl(to_stop=True)
+            feat_loc = anno_check.feature.location
+            if len(without_internalStop) > len(transl_out):
+                feat_loc = CkOps.AnnoCheck._truncate_feat_loc(feat_loc,
+                    len(transl_out) * 3)
+        except:
+            raise ME.MyException('Translation of feature `%s` of '\
+                'sequence `%s` is unsuccessful.' % (anno_check.feature.id,
+                anno_check.record_id))
+    if len(transl_out) < 2:
+        raise ME.MyException('Translation of feature `%s` of '\
+            'sequence `%s` indicates a protein length of only a '\
+            'single amino acid.' % (anno_check.feature.id,
+            anno_check.record_id))
+    return (transl_out, feat_loc)
+
 ########
 # MAIN #
 ########
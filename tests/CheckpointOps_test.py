@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `CheckpointOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import MyExceptions as ME
+import CheckpointOps as CpOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.12.1200'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+###########
+# CLASSES #
+###########
+
+class CheckpointTestCases(unittest.TestCase):
+    ''' Tests for class `Checkpoint` '''
+
+    def setUp(self):
+        import tempfile
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path_to_nex = os.path.join(self.tmp_dir, 'test.nex')
+        with open(self.path_to_nex, 'w') as nex_handle:
+            nex_handle.write('#NEXUS\n')
+        self.path_to_outfile = os.path.join(self.tmp_dir, 'test.embl')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmp_dir)
+
+    def test_1_Checkpoint(self):
+        ''' This test evaluates the case where a conversion is
+        interrupted while a record is written; upon resumption, the
+        partial record must be removed from the outfile and the last
+        sequence name of the checkpoint must be returned. '''
+        checkpoint = CpOps.Checkpoint(self.path_to_outfile,
+            [self.path_to_nex], every=2)
+        with open(self.path_to_outfile, 'a') as outp_handle:
+            for seq_name in ['taxon_A', 'taxon_B', 'taxon_C']:
+                outp_handle.write('ID   %s\n//\n' % (seq_name))
+                checkpoint.completed(seq_name, outp_handle)
+            outp_handle.write('ID   taxon_D\n')
+        # Only the records up to the second one were checkpointed
+        checkpoint = CpOps.Checkpoint(self.path_to_outfile,
+            [self.path_to_nex], every=2)
+        self.assertEqual(checkpoint.restore(), 'taxon_B')
+        self.assertEqual(checkpoint.records, 2)
+        with open(self.path_to_outfile) as outp_handle:
+            self.assertEqual(outp_handle.read(),
+                'ID   taxon_A\n//\nID   taxon_B\n//\n')
+        checkpoint.remove()
+        self.assertFalse(os.path.isfile(self.path_to_outfile + '.ckpt'))
+
+    def test_2_Checkpoint(self):
+        ''' This test evaluates the case where an infile has changed
+        since the checkpoint was written; the conversion must not be
+        resumed. '''
+        checkpoint = CpOps.Checkpoint(self.path_to_outfile,
+            [self.path_to_nex], every=1)
+        with open(self.path_to_outfile, 'a') as outp_handle:
+            outp_handle.write('ID   taxon_A\n//\n')
+            checkpoint.completed('taxon_A', outp_handle)
+        with open(self.path_to_nex, 'a') as nex_handle:
+            nex_handle.write('BEGIN DATA;\n')
+        with self.assertRaises(ME.MyException):
+            checkpoint.restore()
+
+    def test_3_Checkpoint(self):
+        ''' This test evaluates the case where a conversion is
+        interrupted before its first regular checkpoint; upon
+        resumption, the outfile must be truncated to its size before
+        the conversion, and None must be returned. Without checkpoint,
+        a non-empty outfile must not be resumed. '''
+        with open(self.path_to_outfile, 'w') as outp_handle:
+            outp_handle.write('ID   taxon_0\n//\n')
+        checkpoint = CpOps.Checkpoint(self.path_to_outfile,
+            [self.path_to_nex], every=2)
+        with self.assertRaises(ME.MyException):
+            checkpoint.restore()
+        with open(self.path_to_outfile, 'a') as outp_handle:
+            checkpoint.start(outp_handle)
+            outp_handle.write('ID   taxon_A\n//\n')
+            checkpoint.completed('taxon_A', outp_handle)
+            outp_handle.write('ID   taxon_B\n')
+        checkpoint = CpOps.Checkpoint(self.path_to_outfile,
+            [self.path_to_nex], every=2)
+        self.assertIsNone(checkpoint.restore())
+        with open(self.path_to_outfile) as outp_handle:
+            self.assertEqual(outp_handle.read(), 'ID   taxon_0\n//\n')
+
+    def test_4_Checkpoint(self):
+        ''' This test evaluates the case where a conversion is
+        interrupted after a record was written, but before it was
+        registered; the checkpoint written upon the interruption must
+        not include that record. '''
+        checkpoint = CpOps.Checkpoint(self.path_to_outfile,
+            [self.path_to_nex], every=2)
+        with open(self.path_to_outfile, 'a') as outp_handle:
+            checkpoint.start(outp_handle)
+            outp_handle.write('ID   taxon_A\n//\n')
+            checkpoint.completed('taxon_A', outp_handle)
+            outp_handle.write('ID   taxon_B\n//\n')
+            checkpoint.save(outp_handle)
+        checkpoint = CpOps.Checkpoint(self.path_to_outfile,
+            [self.path_to_nex], every=2)
+        self.assertEqual(checkpoint.restore(), 'taxon_A')
+        with open(self.path_to_outfile) as outp_handle:
+            self.assertEqual(outp_handle.read(), 'ID   taxon_A\n//\n')
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
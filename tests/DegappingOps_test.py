@@ -141,6 +141,38 @@ class DegapButMaintainAnnoTestCases(unittest.TestCase):
         out_actual = DgOps.DegapButMaintainAnno(seq, rmchar, charsets).degap()
         self.assertTupleEqual(out_actual, out_ideal)
 
+    def test_9_DegapButMaintainAnno(self):
+        ''' This test evaluates the case where the charsets are not 
+        modified in place by the degapping.
+        '''
+        seq = "A--AT--T"
+        rmchar = "-"
+        charsets = {"gene1":[0,1,2,3,4], "gene2":[4,5,6,7]}
+        out_ideal = {"gene1":[0,1,2,3,4], "gene2":[4,5,6,7]}
+
+        DgOps.DegapButMaintainAnno(seq, rmchar, charsets).degap()
+        self.assertDictEqual(charsets, out_ideal)
+
+    def test_10_DegapButMaintainAnno(self):
+        ''' This test evaluates the case where the output of the 
+        offset-map implementation is compared to that of the reference 
+        implementation (which removes one gap at a time) on random sequences with overlapping charsets.
+        '''
+        import random
+        rand = random.Random(42)
+        rmchar = "-"
+        for _ in range(50):
+            seq = ''.join(rand.choice('ACGT----') for _ in range(60))
+            charsets = {}
+            for gene_name in ["gene1", "gene2", "gene3"]:
+                start = rand.randint(0, 50)
+                stop = rand.randint(start, 60)
+                charsets[gene_name] = range(start, stop)
+            out_ideal = degap_reference(seq, rmchar, charsets)
+            out_actual = DgOps.DegapButMaintainAnno(seq, rmchar,
+                charsets).degap()
+            self.assertTupleEqual(out_actual, out_ideal)
+
 
 class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
     ''' Tests for class `RmAmbigsButMaintainAnno` '''
@@ -153,12 +185,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "NNATGCCCC"
         rmchar = "N"
         charsets = {"gene1":[0,1,2,3],"gene2":[4,5,6,7,8]}
-        out_ideal_step1 = ('ATGCCCC', {'gene1': [0,1], 'gene2': [2,3,4,5,6]})
+        out_ideal = ('ATGCCCC', {'gene1': [0,1], 'gene2': [2,3,4,5,6]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step1)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_2_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where only leading ambiguities
@@ -168,12 +198,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "NNATGCCCC"
         rmchar = "N"
         charsets = {"gene1":[0,1,2,3,4],"gene2":[3,4,5,6,7,8]}
-        out_ideal_step1 = ('ATGCCCC', {'gene1': [0,1,2], 'gene2': [1,2,3,4,5,6]})
+        out_ideal = ('ATGCCCC', {'gene1': [0,1,2], 'gene2': [1,2,3,4,5,6]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step1)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_3_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where only leading ambiguities
@@ -183,12 +211,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "NNATGCCCC"
         rmchar = "N"
         charsets = {"gene1":[2,3,4],"gene2":[3,4,5,6]}
-        out_ideal_step1 = ('ATGCCCC', {'gene1': [0,1,2], 'gene2': [1,2,3,4]})
+        out_ideal = ('ATGCCCC', {'gene1': [0,1,2], 'gene2': [1,2,3,4]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step1)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_4_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where only trailing ambiguities
@@ -198,13 +224,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "AATGCCCNN"
         rmchar = "N"
         charsets = {"gene1":[0,1,2],"gene2":[3,4,5,6,7,8]}
-        out_ideal_step1 = (seq, charsets)
-        out_ideal_step2 = ('AATGCCC', {'gene1': [0,1,2], 'gene2': [3,4,5,6]})
+        out_ideal = ('AATGCCC', {'gene1': [0,1,2], 'gene2': [3,4,5,6]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step2)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_5_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where only trailing ambiguities
@@ -214,13 +237,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "AATGCCCNN"
         rmchar = "N"
         charsets = {"gene1":[0,1,2,3,4],"gene2":[3,4,5,6,7,8]}
-        out_ideal_step1 = (seq, charsets)
-        out_ideal_step2 = ('AATGCCC', {'gene1': [0,1,2,3,4], 'gene2': [3,4,5,6]})
+        out_ideal = ('AATGCCC', {'gene1': [0,1,2,3,4], 'gene2': [3,4,5,6]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step2)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_6_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where only trailing ambiguities
@@ -230,13 +250,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "AATGCCCNN"
         rmchar = "N"
         charsets = {"gene1":[3,4],"gene2":[3,4,5,6,7,8]}
-        out_ideal_step1 = (seq, charsets)
-        out_ideal_step2 = ('AATGCCC', {'gene1': [3,4], 'gene2': [3,4,5,6]})
+        out_ideal = ('AATGCCC', {'gene1': [3,4], 'gene2': [3,4,5,6]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step2)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_7_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where leading (n=2) and 
@@ -247,13 +264,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "NNATGCNNN"
         rmchar = "N"
         charsets = {"gene1":[0,1,2,3],"gene2":[4,5,6,7,8]}
-        out_ideal_step1 = ('ATGCNNN', {'gene1': [0,1], 'gene2': [2,3,4,5,6]})
-        out_ideal_step2 = ('ATGC', {'gene1': [0,1], 'gene2': [2,3]})
+        out_ideal = ('ATGC', {'gene1': [0,1], 'gene2': [2,3]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step2)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_8_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where leading (n=1) and 
@@ -263,13 +277,10 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "NATGCNNN"
         rmchar = "N"
         charsets = {"gene1":[0,1,2],"gene2":[2,3,4,5,6,7]}
-        out_ideal_step1 = ('ATGCNNN', {'gene1': [0,1], 'gene2': [1,2,3,4,5,6]})
-        out_ideal_step2 = ('ATGC', {'gene1': [0,1], 'gene2': [1,2,3]})
+        out_ideal = ('ATGC', {'gene1': [0,1], 'gene2': [1,2,3]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step2)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
     
     def test_9_RmAmbigsButMaintainAnno(self):
         ''' This test evaluates the case where leading (n=1) and 
@@ -280,19 +291,107 @@ class RmAmbigsButMaintainAnnoTestCases(unittest.TestCase):
         seq = "NATGCNNN"
         rmchar = "N"
         charsets = {"gene1":[1,2],"gene2":[2,3,4,5]}
-        out_ideal_step1 = ('ATGCNNN', {'gene1': [0,1], 'gene2': [1,2,3,4]})
-        out_ideal_step2 = ('ATGC', {'gene1': [0,1], 'gene2': [1,2,3]})
+        out_ideal = ('ATGC', {'gene1': [0,1], 'gene2': [1,2,3]})
         
-        out_actual_1 = DgOps.RmAmbigsButMaintainAnno().rm_leadambig(seq, rmchar, charsets)
-        self.assertTupleEqual(out_actual_1, out_ideal_step1)
-        out_actual_2 = DgOps.RmAmbigsButMaintainAnno().rm_trailambig(out_actual_1[0], rmchar, out_actual_1[1])
-        self.assertTupleEqual(out_actual_2, out_ideal_step2)
+        out_actual = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, rmchar, charsets)
+        self.assertTupleEqual(out_actual, out_ideal)
+
+    def test_10_RmAmbigsButMaintainAnno(self):
+        ''' This test evaluates the case where the same charsets are 
+        used for several sequences; the charsets must not be modified.
+        '''
+        charsets = {"gene1":[0,1,2],"gene2":[2,3,4,5,6,7]}
+        for seq in ["NNTGCNNN", "NATGCANN"]:
+            DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq, "N", charsets)
+            self.assertEqual(charsets, {"gene1":[0,1,2],"gene2":[2,3,4,5,6,7]})
+
+class CleanupButMaintainAnnoTestCases(unittest.TestCase):
+    ''' Tests for class `CleanupButMaintainAnno` '''
+
+    def test_1_CleanupButMaintainAnno(self):
+        ''' This test evaluates the case where missing data is converted, 
+        leading and trailing ambiguities are removed and the sequence 
+        is degapped; the sequence type is maintained.
+        '''
+        from Bio.Seq import Seq
+        from Bio.Alphabet import IUPAC
+        seq = Seq("?N?AT-?G--CNN?", IUPAC.IUPACAmbiguousDNA())
+        charsets = {"gene1":[2,3,4,5,6],"gene2":[9,10,11,12,13]}
+        out_actual = DgOps.CleanupButMaintainAnno(seq, charsets).cleanup()
+        self.assertEqual(str(out_actual[0]), 'ATNGC')
+        self.assertIsInstance(out_actual[0].alphabet, IUPAC.IUPACAmbiguousDNA)
+        self.assertEqual(out_actual[1], {'gene1': [0,1,2], 'gene2': [4]})
+
+    def test_2_CleanupButMaintainAnno(self):
+        ''' This test evaluates the case where random sequences are 
+        cleaned up; the result must be identical to that of replacing 
+        missing data, removing leading and trailing ambiguities and 
+        degapping in turn.
+        '''
+        import random
+        rng = random.Random(14)
+        for _ in range(200):
+            seq = ''.join(rng.choice('N?-ACGT') for _ in range(rng.randint(2, 30)))
+            if not seq.strip('N?'):
+                continue
+            charsets = {"gene1":sorted(rng.sample(range(len(seq)), rng.randint(0, len(seq)))),
+                        "gene2":range(rng.randint(0, len(seq)), len(seq))}
+            seq_1, charsets_1 = DgOps.RmAmbigsButMaintainAnno.rm_ltambig(seq.replace('?', 'N'), "N", charsets)
+            out_ideal = DgOps.DegapButMaintainAnno(seq_1, "-", charsets_1).degap()
+            out_actual = DgOps.CleanupButMaintainAnno(seq, charsets).cleanup()
+            self.assertTupleEqual(out_actual, out_ideal)
+
+    def test_3_CleanupButMaintainAnno(self):
+        ''' This test evaluates the case where no character for missing 
+        data is given; gaps between leading ambiguities halt the 
+        trimming, and the charsets must not be modified.
+        '''
+        seq = "NN-NATG--CN-NNN"
+        charsets = {"gene1":[0,1,2,3,4,5],"gene2":[6,7,8,9,10,11,12]}
+        out_ideal = ('NATGCN', {'gene1': [0,1,2], 'gene2': [3,4,5]})
+
+        out_actual = DgOps.CleanupButMaintainAnno(seq, charsets, None, "N", 
+            "-").cleanup()
+        self.assertTupleEqual(out_actual, out_ideal)
+        self.assertEqual(charsets['gene1'], [0,1,2,3,4,5])
+
+    def test_4_CleanupButMaintainAnno(self):
+        ''' This test evaluates the case where the sequence has a gapped 
+        alphabet; the gap character must be removed from the alphabet 
+        of the cleaned sequence.
+        '''
+        from Bio.Seq import Seq
+        from Bio.Alphabet import Gapped, IUPAC
+        seq = Seq("NAT-G", Gapped(IUPAC.IUPACAmbiguousDNA(), "-"))
+        out_actual = DgOps.CleanupButMaintainAnno(seq, {"gene1":[1,2,3,4]}
+            ).cleanup()
+        self.assertEqual(str(out_actual[0]), 'ATG')
+        self.assertIsInstance(out_actual[0].alphabet, IUPAC.IUPACAmbiguousDNA)
 
 
 #############
 # FUNCTIONS #
 #############
 
+def degap_reference(seq, rmchar, charsets):
+    ''' This function degaps a sequence while maintaining the 
+        annotations by removing one gap at a time; it serves as the 
+        reference for function `degap` of class `DegapButMaintainAnno`.
+        Source: http://stackoverflow.com/questions/35233714/
+        maintaining-overlapping-annotations-while-removing-dashes-from-string
+    '''
+    annotations = dict((k, list(v)) for k, v in charsets.items())
+    index = seq.find(rmchar)
+    while index > -1:
+        for gene_name, indices in annotations.items():
+            if index in indices:
+                indices.remove(index)
+            annotations[gene_name] = [e-1 if e > index else e \
+                for e in indices]
+        seq = seq[:index] + seq[index+1:]
+        index = seq.find(rmchar)
+    return seq, annotations
+
 ########
 # MAIN #
 ########
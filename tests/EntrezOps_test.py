@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `EntrezOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import EntrezOps as EnOps
+import ParsingOps as PrOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.08.1000'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class FakeClock:
+    ''' A clock that only advances when slept on '''
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class FakeEntrez:
+    ''' A transport that stands in for Bio.Entrez; the first <n_fail> 
+        requests fail with HTTP status <fail_code>. '''
+
+    products = {'matK': 'maturase K', 'psbI': 'photosystem II protein I'}
+
+    def __init__(self, n_fail=0, fail_code=503):
+        self.n_fail = n_fail
+        self.fail_code = fail_code
+        self.requests = []
+
+    def _respond(self, utility, params):
+        import urllib2
+        self.requests.append((utility, params))
+        if len(self.requests) <= self.n_fail:
+            raise urllib2.HTTPError('http://eutils', self.fail_code, 
+                'Error', {}, None)
+        return (utility, params)
+
+    def esearch(self, **params):
+        return self._respond('esearch', params)
+
+    def epost(self, **params):
+        return self._respond('epost', params)
+
+    def esummary(self, **params):
+        return self._respond('esummary', params)
+
+    def read(self, handle):
+        import re
+        utility, params = handle
+        if utility == 'esearch' and params['db'] == 'gene':
+            syms = re.findall(r'(\w+) \[sym\]', params['term'])
+            return {'IdList': [sym for sym in syms if sym in 
+                FakeEntrez.products]}
+        if utility == 'esearch':
+            return {'IdList': [], 'Count': '0'}
+        if utility == 'epost':
+            return {'WebEnv': params['id'], 'QueryKey': '1'}
+        docs = [FakeDocumentSummary(sym, Name=sym, 
+            Description=FakeEntrez.products[sym]) 
+            for sym in params['webenv'].split(',')]
+        return {'DocumentSummarySet': {'DocumentSummary': docs}}
+
+
+class FakeDocumentSummary(dict):
+    ''' A gene record as parsed by Bio.Entrez, which stores the Entrez 
+        ID as an XML attribute '''
+
+    def __init__(self, uid, **fields):
+        dict.__init__(self, **fields)
+        self.attributes = {'uid': uid}
+
+
+class TokenBucketTestCases(unittest.TestCase):
+    ''' Tests for class `TokenBucket` '''
+
+    def test_1_TokenBucket(self):
+        ''' This test evaluates the case where events exceed the rate; 
+        the events must be spaced evenly. '''
+        clock = FakeClock()
+        bucket = EnOps.TokenBucket(4, clock=clock.time, sleep=clock.sleep)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertEqual(clock.slept, [0.25, 0.25, 0.25, 0.25])
+
+    def test_2_TokenBucket(self):
+        ''' This test evaluates the case where events are sent from 
+        concurrent threads; the time spent on all events must be 
+        determined by the rate. '''
+        import time
+        from multiprocessing.dummy import Pool
+        bucket = EnOps.TokenBucket(100)
+        start = time.time()
+        pool = Pool(8)
+        pool.map(lambda i: bucket.acquire(), range(21))
+        pool.close()
+        self.assertGreaterEqual(time.time() - start, 0.19)
+
+
+class EntrezClientTestCases(unittest.TestCase):
+    ''' Tests for class `EntrezClient` '''
+
+    def test_1_EntrezClient(self):
+        ''' This test evaluates the case where requests fail with HTTP 
+        status 503 and are retried with exponential backoff; requests 
+        that fail with other status codes are not retried. '''
+        import urllib2
+        clock = FakeClock()
+        bucket = EnOps.TokenBucket(1000, clock=clock.time, 
+            sleep=clock.sleep)
+        transport = FakeEntrez(n_fail=2)
+        client = EnOps.EntrezClient(transport=transport, bucket=bucket)
+        out_actual = client.request('esearch', db='gene', term='matK [sym]')
+        self.assertEqual(out_actual, {'IdList': ['matK']})
+        self.assertEqual(len(transport.requests), 3)
+        self.assertEqual([t for t in clock.slept if t >= 0.5], [0.5, 1.0])
+        transport = FakeEntrez(n_fail=1, fail_code=400)
+        client = EnOps.EntrezClient(transport=transport, bucket=bucket)
+        with self.assertRaises(urllib2.HTTPError):
+            client.request('esearch', db='gene', term='matK [sym]')
+
+    def test_2_EntrezClient(self):
+        ''' This test evaluates the case where an API key is given; it 
+        must be sent with each request and raise the rate limit. '''
+        transport = FakeEntrez()
+        client = EnOps.EntrezClient('abc123', transport)
+        client.request('esearch', db='gene', term='matK [sym]')
+        self.assertEqual(transport.requests[0][1]['api_key'], 'abc123')
+        self.assertEqual(client.bucket.rate, 10)
+        self.assertEqual(EnOps.EntrezClient(transport=transport).bucket.rate, 3)
+        self.assertEqual(client.share(4).bucket.rate, 2.5)
+
+    def test_3_EntrezClient(self):
+        ''' This test evaluates the case where gene products are looked 
+        up via an injected transport; each gene symbol is looked up via 
+        its own ESearch, followed by a single EPost/ESummary pair. '''
+        transport = FakeEntrez()
+        EnOps.configure(transport=transport)
+        try:
+            out_actual = PrOps.GetEntrezInfo('a@b.c').obtain_gene_products(
+                ['matK', 'psbI'])
+            self.assertEqual(out_actual, {'matK': 'maturase K', 
+                'psbI': 'photosystem II protein I'})
+            self.assertEqual([r[0] for r in transport.requests], 
+                ['esearch', 'esearch', 'epost', 'esummary'])
+            out_actual = PrOps.GetEntrezInfo._id_lookup_batch(
+                ['matK', 'psbI', 'ycf1'])
+            self.assertEqual(out_actual, {'matK': ['matK'], 
+                'psbI': ['psbI'], 'ycf1': []})
+        finally:
+            EnOps.configure()
+            PrOps.GetEntrezInfo._gene_product_memo.clear()
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `IOOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import MyExceptions as ME
+import IOOps
+import IntervalOps as IvOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.04.1100'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'data', 'input')
+
+###########
+# CLASSES #
+###########
+
+class NexusStreamTestCases(unittest.TestCase):
+    ''' Tests for class `NexusStream` '''
+
+    def test_1_NexusStream(self):
+        ''' This test evaluates the case where a sequential matrix is
+        read; the sequences and charsets must be identical to those
+        parsed by Bio.Nexus. '''
+        from Bio.Nexus import Nexus
+        path_to_nex = os.path.join(data_path, 'TestData_1.nex')
+        aln = Nexus.Nexus()
+        aln.read(path_to_nex)
+        charsets, matrix = IOOps.Inp().stream_nexus_file(path_to_nex)
+        self.assertEqual(matrix.keys(), ['Taxon_1', 'Taxon_2', 'Taxon_3'])
+        for taxon in matrix.keys():
+            self.assertEqual(str(matrix[taxon]), str(aln.matrix[taxon]))
+        for charset_name, ranges in charsets.items():
+            self.assertEqual(list(IvOps.IntervalList(ranges)),
+                aln.charsets[charset_name])
+
+    def test_2_NexusStream(self):
+        ''' This test evaluates the case where an interleaved matrix is
+        read and where charsets contain steps and references to other
+        charsets. '''
+        path_to_nex = os.path.join(data_path, 'TestData_1_interleaved.nex')
+        charsets, matrix = IOOps.Inp().stream_nexus_file(path_to_nex)
+        out_ideal = [('Taxon_1', 'TAAATGGATATATAGAGTCAGCATTCCGGACTTTAACG'),
+                     ('Taxon_2', 'TAAATG---ATATAGAGTC------CC---CTTTAACG'),
+                     ('Taxon_3', '???ATG---ATATAGAGTC------CCTGACTTTAA??')]
+        out_actual = [(t, str(s)) for t, s in matrix.iter_sequences()]
+        self.assertEqual(out_actual, out_ideal)
+        self.assertEqual(charsets['foo_CDS'], [(3,12), (16,25), (27,36)])
+        self.assertEqual(charsets['foo_codon3'], [(3,12), (16,25),
+            (27,36)])
+
+    def test_3_NexusStream(self):
+        ''' This test evaluates the case where the length of a sequence
+        does not match the declared number of characters. '''
+        import tempfile
+        nex_handle = tempfile.NamedTemporaryFile(suffix='.nex',
+            delete=False)
+        nex_handle.write('#NEXUS\nBEGIN DATA;\nDIMENSIONS NTAX=2 NCHAR=5;\n'\
+            'FORMAT DATATYPE=DNA GAP=- MISSING=?;\nMATRIX\nTaxon_1 ACGTA\n'\
+            'Taxon_2 ACGT\n;\nEND;\n')
+        nex_handle.close()
+        try:
+            with self.assertRaises(ME.MyException):
+                IOOps.NexusStream(nex_handle.name)
+        finally:
+            os.remove(nex_handle.name)
+
+    def test_4_NexusStream(self):
+        ''' This test evaluates the case where a matrix contains 
+        characters that are not permitted by its datatype; as in 
+        Bio.Nexus, an error must be raised, whereas lowercase IUPAC 
+        codes and a custom missing character are permitted. '''
+        import tempfile
+        from Bio.Nexus import Nexus
+        header = '#NEXUS\nBEGIN DATA;\nDIMENSIONS NTAX=2 NCHAR=5;\n'\
+            'FORMAT DATATYPE=DNA GAP=- MISSING=%s;\nMATRIX\n'
+        for missing, row, legal in [('?', 'ACGZA', False), 
+            ('?', 'AC-GJ', False), ('?', 'acgtn', True), 
+            ('N', 'AC-?A', False), ('N', 'AC-NA', True)]:
+            nex_handle = tempfile.NamedTemporaryFile(suffix='.nex',
+                delete=False)
+            nex_handle.write(header % (missing) + 'Taxon_1 ACGTA\n'\
+                'Taxon_2 %s\n;\nEND;\n' % (row))
+            nex_handle.close()
+            try:
+                if legal:
+                    matrix = IOOps.NexusStream(nex_handle.name)
+                    self.assertEqual(str(matrix['Taxon_2']), row)
+                else:
+                    with self.assertRaises(Nexus.NexusError):
+                        Nexus.Nexus().read(nex_handle.name)
+                    with self.assertRaises(ME.MyException):
+                        IOOps.NexusStream(nex_handle.name)
+            finally:
+                os.remove(nex_handle.name)
+
+class AlignmentStoreTestCases(unittest.TestCase):
+    ''' Tests for class `AlignmentStore` '''
+
+    def test_1_AlignmentStore(self):
+        ''' This test evaluates the case where a sequential and an 
+        interleaved matrix are read; the sequences must be identical to 
+        those read by NexusStream. '''
+        for nex_name in ['TestData_1.nex', 'TestData_1_interleaved.nex']:
+            path_to_nex = os.path.join(data_path, nex_name)
+            charsets, alignm = IOOps.Inp().load_nexus_file(path_to_nex)
+            nexus_stream = IOOps.NexusStream(path_to_nex)
+            self.assertEqual(alignm.keys(), nexus_stream.keys())
+            self.assertEqual(charsets, nexus_stream.charsets)
+            for (taxon, seq), (_, seq_ideal) in zip(alignm.iter_sequences(),
+                nexus_stream.iter_sequences()):
+                self.assertEqual(str(seq), str(seq_ideal))
+                self.assertEqual(str(alignm[taxon]), str(seq_ideal))
+
+    def test_2_AlignmentStore(self):
+        ''' This test evaluates the case where rows are requested; they 
+        must be views into the store rather than copies. '''
+        path_to_nex = os.path.join(data_path, 'TestData_1_interleaved.nex')
+        charsets, alignm = IOOps.Inp().load_nexus_file(path_to_nex)
+        row = alignm.row('Taxon_3')
+        self.assertIsInstance(row, memoryview)
+        self.assertEqual(row.tobytes(), '???ATG---ATATAGAGTC------CCTGACTTTAA??')
+        self.assertEqual(len(alignm.data), 3*len(row))
+        with self.assertRaises(KeyError):
+            alignm.row('Taxon_4')
+
+class CsvStreamTestCases(unittest.TestCase):
+    ''' Tests for class `CsvStream` '''
+
+    def test_1_CsvStream(self):
+        ''' This test evaluates the case where the rows of the requested 
+        sequences are read; the qualifiers must be identical to those 
+        generated from the full list of dictionaries. '''
+        import CheckingOps as CkOps
+        path_to_csv = os.path.join(data_path, 'Pyrus_trnK_matK.csv')
+        raw_qualifiers = IOOps.Inp().parse_csv_file(path_to_csv)
+        index_ideal = dict((dct['isolate'], dct) for dct in 
+            CkOps.QualifierCheck._enforce_ASCII(CkOps.QualifierCheck.\
+            _rm_empty_qual(raw_qualifiers)))
+        seq_names = sorted(index_ideal.keys())[:3]
+        qualifier_index = IOOps.Inp().stream_csv_file(path_to_csv, 
+            'isolate', seq_names)
+        self.assertEqual(sorted(qualifier_index.keys()), seq_names)
+        self.assertEqual(len(qualifier_index.header), 
+            len(raw_qualifiers[0]))
+        for seq_name in seq_names:
+            self.assertEqual(qualifier_index[seq_name], 
+                index_ideal[seq_name])
+        # Each request hands out a new dictionary
+        qualifier_index[seq_names[0]]['organism'] = 'foo'
+        self.assertEqual(qualifier_index[seq_names[0]], 
+            index_ideal[seq_names[0]])
+
+    def test_2_CsvStream(self):
+        ''' This test evaluates the cases where the column labels are 
+        invalid, where a sequence name occurs more than once (also in 
+        rows that are not stored) and where a sequence name is 
+        missing. '''
+        import tempfile
+        for csv_content in ['isolate,foo\nA,x\n', 'organism\nA\n',
+            'isolate,organism\nA,x\nB,y\nB,z\n', 
+            'isolate,organism\nA,x\n,y\n']:
+            csv_handle = tempfile.NamedTemporaryFile(suffix='.csv',
+                delete=False)
+            csv_handle.write(csv_content)
+            csv_handle.close()
+            try:
+                with self.assertRaises(ME.MyException):
+                    IOOps.CsvStream(csv_handle.name, 'isolate', ['A'])
+            finally:
+                os.remove(csv_handle.name)
+
+class EmblWriterTestCases(unittest.TestCase):
+    ''' Tests for class `EmblWriter` '''
+
+    @staticmethod
+    def _test_record():
+        from Bio.Seq import Seq
+        from Bio.SeqRecord import SeqRecord
+        from Bio.Alphabet import IUPAC
+        from Bio import SeqFeature
+        seq_record = SeqRecord(Seq('ATGAAATTTGGGCCCTAA' * 5, 
+            IUPAC.IUPACAmbiguousDNA()), id='taxon_A.1', name='Pyrus caucasica',
+            description='Pyrus caucasica matK gene, partial cds; trnK '\
+            'intron, partial sequence; chloroplast, isolate taxon_A')
+        seq_record.annotations['topology'] = 'linear'
+        seq_record.annotations['data_file_division'] = 'PLN'
+        source_loc = SeqFeature.FeatureLocation(SeqFeature.ExactPosition(0),
+            SeqFeature.ExactPosition(90))
+        seq_record.features.append(SeqFeature.SeqFeature(source_loc, 
+            type='source', qualifiers={'organism': 'Pyrus caucasica', 
+            'transl_table': 11, 'specimen_voucher': 'B,ERE:Ter-Voskanyan, '\
+            'Akopian, Parolly, Weber P2-3 and a long remainder of the note'}))
+        cds_loc = SeqFeature.CompoundLocation([SeqFeature.FeatureLocation(
+            SeqFeature.BeforePosition(3), SeqFeature.ExactPosition(30)),
+            SeqFeature.FeatureLocation(SeqFeature.ExactPosition(40),
+            SeqFeature.AfterPosition(87))])
+        seq_record.features.append(SeqFeature.SeqFeature(cds_loc, 
+            type='CDS', qualifiers={'note': 'matK', 'translation': 'MKFGP'*20}))
+        return seq_record
+
+    def test_1_EmblWriter(self):
+        ''' This test evaluates the case where a record is written; the 
+        output must be identical to that of Bio.SeqIO. '''
+        from StringIO import StringIO
+        from Bio import SeqIO
+        seq_record = EmblWriterTestCases._test_record()
+        self.assertTrue(IOOps.EmblWriter.is_supported(seq_record))
+        ideal_handle = StringIO()
+        SeqIO.write(seq_record, ideal_handle, 'embl')
+        actual_handle = StringIO()
+        IOOps.EmblWriter(actual_handle).write_record(seq_record)
+        self.assertEqual(actual_handle.getvalue(), ideal_handle.getvalue())
+
+    def test_2_EmblWriter(self):
+        ''' This test evaluates the case where the ID and AC lines are 
+        masked and where a record not supported by the class is written 
+        via Bio.SeqIO instead. '''
+        from StringIO import StringIO
+        seq_record = EmblWriterTestCases._test_record()
+        actual_handle = StringIO()
+        IOOps.Outp().write_EntryUpload(seq_record, actual_handle, True)
+        out_actual = actual_handle.getvalue()
+        self.assertTrue(out_actual.startswith('\nID   XXX; XXX; linear; '\
+            'XXX; XXX; XXX; XXX\nXX\nAC   XXX;\nXX\nDE   Pyrus'))
+        self.assertTrue(out_actual.endswith('\n//'))
+        seq_record.annotations['comment'] = 'foo'
+        self.assertFalse(IOOps.EmblWriter.is_supported(seq_record))
+        actual_handle = StringIO()
+        IOOps.Outp().write_EntryUpload(seq_record, actual_handle, True)
+        self.assertEqual(actual_handle.getvalue().replace('CC   foo\nXX\n',
+            ''), out_actual)
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
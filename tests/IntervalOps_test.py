@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `IntervalOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import IntervalOps as IvOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.05.1000'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+###########
+# CLASSES #
+###########
+
+class IntervalListTestCases(unittest.TestCase):
+    ''' Tests for class `IntervalList` '''
+
+    def test_1_IntervalList(self):
+        ''' This test evaluates the case where overlapping and adjacent
+        intervals are merged and where an interval list is generated
+        from a list of positions. '''
+        intervals = IvOps.IntervalList([(7,9), (0,3), (2,4), (4,5), (6,6)])
+        self.assertEqual(intervals.ranges(), [(0,5), (7,9)])
+        self.assertEqual(intervals, [0,1,2,3,4,7,8])
+        self.assertEqual(len(intervals), 7)
+        self.assertEqual(IvOps.IntervalList.from_indices([8,7,0,1,2,3,4]),
+            intervals)
+        self.assertFalse(IvOps.IntervalList.from_indices([]))
+
+    def test_2_IntervalList(self):
+        ''' This test evaluates the shifting, clipping and truncation
+        of an interval list. '''
+        intervals = IvOps.IntervalList([(1,4), (7,10)])
+        self.assertEqual(intervals.shift(-2).ranges(), [(-1,2), (5,8)])
+        self.assertEqual(intervals.clip(2, 8).ranges(), [(2,4), (7,8)])
+        self.assertEqual(intervals.head(4).ranges(), [(1,4), (7,8)])
+        self.assertEqual(intervals.extract('ACGTACGTACGT'), 'CGTTAC')
+
+    def test_3_IntervalList(self):
+        ''' This test evaluates the case where an interval list is
+        remapped through the cumulative position map of a gapped
+        sequence and where it is pickled. '''
+        import pickle
+        import DegappingOps as DgOps
+        cum_map = DgOps.DegapButMaintainAnno._offset_map('AT--GC-', '-')
+        self.assertEqual(list(cum_map), [0,1,2,2,2,3,4,4])
+        intervals = IvOps.IntervalList([(1,5), (6,7)])
+        self.assertEqual(intervals.remap(cum_map).ranges(), [(1,3)])
+        self.assertEqual(pickle.loads(pickle.dumps(intervals)), intervals)
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,6 +42,16 @@ __version__ = '2017.02.01.1400'
 
 class ParseCharsetNameTestCases(unittest.TestCase):
     ''' Tests to evaluate class `ParseCharsetName` '''
+
+    def setUp(self):
+        # Note: The memos are shared by all instances of class 
+        # `GetEntrezInfo`; each test must start and end with empty memos
+        PrOps.GetEntrezInfo._gene_product_memo.clear()
+        PrOps.GetEntrezInfo._taxon_memo.clear()
+
+    def tearDown(self):
+        PrOps.GetEntrezInfo._gene_product_memo.clear()
+        PrOps.GetEntrezInfo._taxon_memo.clear()
     
     def test_ParseCharsetName__parse__1(self):
         ''' This test evaluates the function `parse` of the class 
@@ -122,6 +132,16 @@ class ParseCharsetNameTestCases(unittest.TestCase):
 
 class GetEntrezInfoTestCases(unittest.TestCase):
     ''' Tests to evaluate class `GetEntrezInfo` '''
+
+    def setUp(self):
+        # Note: The memos are shared by all instances of class 
+        # `GetEntrezInfo`; each test must start and end with empty memos
+        PrOps.GetEntrezInfo._gene_product_memo.clear()
+        PrOps.GetEntrezInfo._taxon_memo.clear()
+
+    def tearDown(self):
+        PrOps.GetEntrezInfo._gene_product_memo.clear()
+        PrOps.GetEntrezInfo._taxon_memo.clear()
     
     def test_GetEntrezInfo__does_taxon_exist__1(self):
         ''' This test evaluates function `does_taxon_exist` of class `GetEntrezInfo`.
@@ -141,6 +161,126 @@ class GetEntrezInfoTestCases(unittest.TestCase):
         handle = PrOps.GetEntrezInfo(email_addr).does_taxon_exist(taxon_name)
         self.assertTrue(handle)
 
+    def test_GetEntrezInfo__parse_gene_products_batch__1(self):
+        ''' This test evaluates function `_parse_gene_products_batch` of 
+            class `GetEntrezInfo`. This test evaluates the case where the
+            records of a batch lookup are assigned to gene symbols via 
+            their Entrez IDs, so that the gene product of each symbol 
+            is the most common description among its own hits only. '''
+        docs = [FakeDocumentSummary('1', Description='maturase K'),
+                FakeDocumentSummary('2', Description='maturase K'),
+                FakeDocumentSummary('3', 
+                    Description='hypothetical protein'),
+                FakeDocumentSummary('4', 
+                    Description='photosystem II protein Z'),
+                FakeDocumentSummary('5', 
+                    Description='hypothetical protein')]
+        entrez_rec_list = {'DocumentSummarySet': {'DocumentSummary': docs}}
+        entrez_ids = {'matK': ['1', '2', '3'], 'psbZ': ['4'], 
+                      'ycf1': ['3', '5'], 'psbI': []}
+        out_ideal = {'matK': 'maturase K', 
+                     'psbZ': 'photosystem II protein Z',
+                     'ycf1': 'hypothetical protein'}
+        out_actual = PrOps.GetEntrezInfo._parse_gene_products_batch(
+            entrez_rec_list, entrez_ids)
+        self.assertDictEqual(out_actual, out_ideal)
+
+    def test_GetEntrezInfo__obtain_gene_products__1(self):
+        ''' This test evaluates function `obtain_gene_products` of class
+            `GetEntrezInfo`. This test evaluates the case where all gene 
+            symbols are present in an offline cache, so that Entrez is 
+            not queried. '''
+        import shutil, tempfile
+        import CachingOps as CaOps
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = CaOps.EntrezCache(cache_dir, offline=True)
+            cache.set('gene_product', 'matK', 'maturase K')
+            cache.set('gene_product', 'psbI', 'photosystem II protein I')
+            email_addr = 'm.gruenstaeudl@fu-berlin.de'
+            out_actual = PrOps.GetEntrezInfo(email_addr, cache).\
+                obtain_gene_products(['matK', 'psbI', 'matK'])
+            out_ideal = {'matK': 'maturase K', 
+                         'psbI': 'photosystem II protein I'}
+            self.assertDictEqual(out_actual, out_ideal)
+            cache.close()
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_GetEntrezInfo__does_taxon_exist__3(self):
+        ''' This test evaluates function `does_taxon_exist` of class 
+            `GetEntrezInfo`. This test evaluates the case where the hit 
+            counts of taxon names are present in an offline cache, so 
+            that Entrez is not queried and the results are memoized. '''
+        import shutil, tempfile
+        import CachingOps as CaOps
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = CaOps.EntrezCache(cache_dir, offline=True)
+            cache.set('taxon_hitcount', 'Pyrus tamamaschjanae', '0')
+            cache.set('taxon_hitcount', 'Pyrus caucasica', '1')
+            email_addr = 'm.gruenstaeudl@fu-berlin.de'
+            handle = PrOps.GetEntrezInfo(email_addr, cache)
+            handle.prefetch_taxon_names(['Pyrus caucasica',
+                'Pyrus tamamaschjanae', 'Pyrus communis'])
+            self.assertFalse(handle.does_taxon_exist('Pyrus tamamaschjanae'))
+            self.assertTrue(handle.does_taxon_exist('Pyrus caucasica'))
+            self.assertEqual(PrOps.GetEntrezInfo._taxon_memo[
+                'Pyrus caucasica'], '1')
+            with self.assertRaises(ME.MyException):
+                handle.does_taxon_exist('Pyrus communis')
+            cache.close()
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_GetEntrezInfo__prefetch_taxon_names__1(self):
+        ''' This test evaluates function `prefetch_taxon_names` of class 
+            `GetEntrezInfo`. This test evaluates the case where a taxon 
+            name has more than one hit (e.g., a homonym); its hit count 
+            must be memoized as such, so that `does_taxon_exist` does not 
+            confirm it, and the hit count of its genus name must be 
+            looked up as well. '''
+        import EntrezOps as EnOps
+        transport = FakeTaxonomy({'Pyrus caucasica': '1', 
+            'Pyrus communis': '2', 'Pyrus': '1'})
+        EnOps.configure(transport=transport, max_workers=1)
+        try:
+            handle = PrOps.GetEntrezInfo('m.gruenstaeudl@fu-berlin.de')
+            handle.prefetch_taxon_names(['Pyrus communis', 
+                'Pyrus caucasica', 'Pyrus communis'])
+            self.assertEqual(sorted(transport.terms), ['Pyrus', 
+                'Pyrus caucasica', 'Pyrus communis'])
+            self.assertTrue(handle.does_taxon_exist('Pyrus caucasica'))
+            self.assertIsNone(handle.does_taxon_exist('Pyrus communis'))
+            self.assertEqual(len(transport.terms), 3)
+        finally:
+            EnOps.configure()
+
+
+class FakeDocumentSummary(dict):
+    ''' A gene record as parsed by Bio.Entrez, which stores the Entrez 
+        ID as an XML attribute '''
+
+    def __init__(self, uid, **fields):
+        dict.__init__(self, **fields)
+        self.attributes = {'uid': uid}
+
+
+class FakeTaxonomy:
+    ''' A transport that stands in for Bio.Entrez and returns the hit 
+        count of each taxon name upon an ESearch of NCBI Taxonomy. '''
+
+    def __init__(self, hitcounts):
+        self.hitcounts = hitcounts
+        self.terms = []
+
+    def esearch(self, **params):
+        self.terms.append(params['term'])
+        return params['term']
+
+    def read(self, handle):
+        return {'IdList': [], 'Count': self.hitcounts.get(handle, '0')}
+
 #############
 # FUNCTIONS #
 #############
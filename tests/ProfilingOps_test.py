@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `ProfilingOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import ProfilingOps as PfOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.07.1500'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+###########
+# CLASSES #
+###########
+
+class ProfilerTestCases(unittest.TestCase):
+    ''' Tests for class `Profiler` '''
+
+    def test_1_Profiler(self):
+        ''' This test evaluates the case where steps are timed 
+        explicitly and as laps; the steps must be reported in the order 
+        of their numbering. '''
+        profiler = PfOps.Profiler()
+        profiler.start('2. Parse NEXUS file')
+        profiler.stop('2. Parse NEXUS file')
+        for i in range(3):
+            profiler.lap('6.10. Format output')
+            profiler.lap('6.9. Introduce fuzzy ends')
+            profiler.lap(None)
+        profiler.count('entrez_requests')
+        profiler.count('bytes_written', 250)
+        report = profiler.report()
+        self.assertEqual([(row['step'], row['calls']) for row in 
+            report['steps']], [('2. Parse NEXUS file', 1), 
+            ('6.9. Introduce fuzzy ends', 3), ('6.10. Format output', 3)])
+        self.assertEqual(report['counters'], {'entrez_requests': 1, 
+            'bytes_written': 250})
+
+    def test_2_Profiler(self):
+        ''' This test evaluates the case where the data of a worker 
+        process is transferred to the parent process. '''
+        parent, worker = PfOps.Profiler(), PfOps.Profiler()
+        parent.count('records_written')
+        worker.lap('6.1. Select sequence and qualifiers')
+        worker.lap(None)
+        worker.count('entrez_requests', 2)
+        parent.merge(worker.snapshot())
+        parent.merge(worker.snapshot())
+        self.assertEqual(parent.calls, 
+            {'6.1. Select sequence and qualifiers': 1})
+        self.assertEqual(parent.counters, {'records_written': 1, 
+            'entrez_requests': 2})
+
+    def test_3_Profiler(self):
+        ''' This test evaluates the case where profiling is deactivated; 
+        the active profiler must then record nothing. '''
+        PfOps.disable()
+        self.assertFalse(PfOps.profiler.enabled)
+        PfOps.profiler.count('entrez_requests')
+        try:
+            self.assertTrue(PfOps.enable().enabled)
+            self.assertEqual(PfOps.profiler.counters, {})
+        finally:
+            PfOps.disable()
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()
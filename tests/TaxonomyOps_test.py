@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+'''
+Unit Tests for the classes of the module `TaxonomyOps`
+'''
+
+#####################
+# IMPORT OPERATIONS #
+#####################
+
+import unittest
+
+# Add specific directory to sys.path in order to import its modules
+# NOTE: THIS RELATIVE IMPORTING IS AMATEURISH.
+# NOTE: COULD THE FOLLOWING IMPORT BE REPLACED WITH 'import annonex2embl'?
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'annonex2embl'))
+
+import MyExceptions as ME
+import ParsingOps as PrOps
+import TaxonomyOps as TxOps
+
+###############
+# AUTHOR INFO #
+###############
+
+__author__ = 'Michael Gruenstaeudl <m.gruenstaeudl@fu-berlin.de>'
+__copyright__ = 'Copyright (C) 2016-2017 Michael Gruenstaeudl'
+__info__ = 'nex2embl'
+__version__ = '2017.02.06.1100'
+
+#############
+# DEBUGGING #
+#############
+
+#import pdb
+#pdb.set_trace()
+
+####################
+# GLOBAL VARIABLES #
+####################
+
+taxdump_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'data', 'input', 'taxdump')
+
+###########
+# CLASSES #
+###########
+
+class TaxdumpIndexTestCases(unittest.TestCase):
+    ''' Tests for class `TaxdumpIndex` '''
+
+    def setUp(self):
+        import tempfile
+        self.index_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.index_dir, 'names.dmp.sqlite')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.index_dir)
+
+    def test_1_TaxdumpIndex(self):
+        ''' This test evaluates the case where taxon names (incl. 
+        synonyms and homonyms) are checked against the fixture 
+        taxdump. '''
+        index = TxOps.TaxdumpIndex(taxdump_path, self.index_path)
+        self.assertTrue(index.does_taxon_exist('Pyrus caucasica'))
+        self.assertTrue(index.does_taxon_exist('pyrus COMMUNIS'))
+        self.assertTrue(index.does_taxon_exist('Pyrus amygdaliformis'))
+        self.assertFalse(index.does_taxon_exist('Pyrus tamamaschjanae'))
+        self.assertEqual(index.hitcount('Bacillus'), '2')
+        self.assertIsNone(index.does_taxon_exist('Bacillus'))
+        index.close()
+
+    def test_2_TaxdumpIndex(self):
+        ''' This test evaluates the case where the index is reused by a 
+        second instance and where a taxon name is checked via class 
+        `ConfirmAdjustTaxonName`. '''
+        from Bio.Seq import Seq
+        from Bio.SeqRecord import SeqRecord
+        from Bio.SeqFeature import SeqFeature, FeatureLocation
+        TxOps.TaxdumpIndex(taxdump_path, self.index_path).close()
+        index = TxOps.TaxdumpIndex(taxdump_path, self.index_path)
+        seq_record = SeqRecord(Seq('ACGT'), id='PYR053.1', 
+            name='Pyrus tamamaschjanae', 
+            description='Pyrus tamamaschjanae foo, isolate PYR053')
+        seq_record.features.append(SeqFeature(FeatureLocation(0, 4), 
+            type='source', qualifiers={'organism': 'Pyrus tamamaschjanae'}))
+        seq_record = PrOps.ConfirmAdjustTaxonName().go(seq_record, 
+            'm.gruenstaeudl@fu-berlin.de', None, index)
+        self.assertEqual(seq_record.name, 'Pyrus sp. tamamaschjanae')
+        index.close()
+
+    def test_3_TaxdumpIndex(self):
+        ''' This test evaluates the case where the taxdump file does not
+        exist. '''
+        with self.assertRaises(ME.MyException):
+            TxOps.TaxdumpIndex(os.path.join(self.index_dir, 'names.dmp'))
+
+    def test_4_TaxdumpIndex(self):
+        ''' This test evaluates the case where the directory of the 
+        taxdump is not writable; the index must be placed in the cache 
+        directory, unless an up-to-date index exists next to the 
+        taxdump. '''
+        import shutil
+        taxdump_dir = os.path.join(self.index_dir, 'taxdump')
+        cache_dir = os.path.join(self.index_dir, 'cache')
+        os.mkdir(taxdump_dir)
+        shutil.copy(os.path.join(taxdump_path, 'names.dmp'), taxdump_dir)
+        access = os.access
+        os.access = lambda path, mode: path != taxdump_dir and \
+            access(path, mode)
+        try:
+            with self.assertRaises(ME.MyException):
+                TxOps.TaxdumpIndex(taxdump_dir)
+            index = TxOps.TaxdumpIndex(taxdump_dir, cache_dir=cache_dir)
+            self.assertEqual(os.path.dirname(index.path_to_index), 
+                cache_dir)
+            self.assertTrue(index.does_taxon_exist('Pyrus caucasica'))
+            self.assertEqual(index.reopen().path_to_index, 
+                index.path_to_index)
+            index.close()
+            self.assertEqual(os.listdir(taxdump_dir), ['names.dmp'])
+            os.access = access
+            TxOps.TaxdumpIndex(taxdump_dir).close()
+            os.access = lambda path, mode: path != taxdump_dir and \
+                access(path, mode)
+            index = TxOps.TaxdumpIndex(taxdump_dir, cache_dir=cache_dir)
+            self.assertEqual(index.path_to_index, os.path.join(taxdump_dir,
+                'names.dmp.sqlite'))
+            index.close()
+        finally:
+            os.access = access
+
+#############
+# FUNCTIONS #
+#############
+
+########
+# MAIN #
+########
+
+if __name__ == '__main__':
+    unittest.main()